@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Şirket Adı Normalizasyonu
+=========================
+Kodsuz (BIST kodu henüz açıklanmamış) halka arzları ada göre eşleştirmek için.
+halkarz.com, KAP ve manuel veri aynı şirketi farklı yazabiliyor:
+
+  "EMPA ELEKTRONİK SAN. VE TİC. A.Ş."
+  "Empa Elektronik Sanayi ve Ticaret AŞ"    → "empa elektronik"
+
+  normalize(ad)   Türkçe küçük harf (İ/I/ı/i aynı), aksansız, noktalama ve
+                  hukuki ekler (A.Ş., San. ve Tic., Ltd. Şti. ...) atılmış ad
+  parmak_izi(ad)  normalize edilmiş kelimelerin sıralı kümesi — kelime sırası
+                  ve tekrarları farklı yazımlar için ikinci anahtar
+
+ipo_deposu bu iki değeri indeksli sütunlarda tutar; eşleşme O(1) indeks aramasıdır.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Türkçe büyük/küçük harf: İ→i, I→ı; ardından hepsi ASCII'ye katlanır (ı→i, ş→s ...)
+_TR_KUCUK = str.maketrans({"İ": "i", "I": "ı"})
+_ASCII = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ü": "u", "ö": "o", "ç": "c"})
+
+# Ayırt edici olmayan hukuki/ticari ekler (noktalama atıldıktan sonraki halleriyle)
+EKLER = frozenset({
+    "as", "a", "s", "anonim", "sirketi", "sirket",
+    "san", "sanayi", "sanayii", "ve", "tic", "ticaret",
+    "ltd", "limited", "sti", "t",
+})
+_AYIRICI = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=4096)
+def _kelimeler(ad: str) -> tuple[str, ...]:
+    ad = ad.translate(_TR_KUCUK).lower().translate(_ASCII)
+    if not ad.isascii():  # Kalan aksanlar (â, î, é ...) — çoğu adda gerekmez
+        ad = "".join(c for c in unicodedata.normalize("NFKD", ad) if not unicodedata.combining(c))
+    ad = ad.replace(".", "")                      # "A.Ş." → "as", "San." → "san"
+    return tuple(k for k in _AYIRICI.split(ad) if k and k not in EKLER)
+
+
+def normalize(ad: str) -> str:
+    return " ".join(_kelimeler(ad or ""))
+
+
+def parmak_izi(ad: str) -> str:
+    return " ".join(sorted(set(_kelimeler(ad or ""))))
+
+
+def anahtarlar(ad: str) -> tuple[str, str]:
+    """(normalize, parmak_izi) — tek geçişte."""
+    kelimeler = _kelimeler(ad or "")
+    return " ".join(kelimeler), " ".join(sorted(set(kelimeler)))
+
+
+def gecici_kod_mu(kod: str) -> bool:
+    """Eski scraper.py'nin ürettiği "TAS_xxxx" anahtarları gerçek BIST kodu değildir."""
+    return (kod or "").upper().startswith("TAS_")
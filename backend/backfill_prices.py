@@ -11,9 +11,13 @@ import json, os, sys, time
 from datetime import datetime, timedelta
 
 import requests
-import yfinance as yf
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+
+import bist_takvimi
+import fiyat_serisi
+import fs_kodek
+import fs_maliyet
+import olcum
+from fiyat_saglayici import get_provider
 
 # ─── Yapılandırma ────────────────────────────────────────
 FIREBASE_PROJECT_ID = os.environ.get("FIREBASE_PROJECT_ID", "")
@@ -29,7 +33,10 @@ AY_MAP = {
 
 
 # ─── Firebase Auth ───────────────────────────────────────
+@olcum.asama("auth")
 def get_token():
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import Request
     sa = json.loads(FIREBASE_SA_KEY_JSON)
     creds = service_account.Credentials.from_service_account_info(
         sa, scopes=["https://www.googleapis.com/auth/datastore"]
@@ -42,25 +49,11 @@ def _fs_url(path):
     return f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/{path}"
 
 
-def _from_fv(fv):
-    if "stringValue" in fv: return fv["stringValue"]
-    if "integerValue" in fv: return int(fv["integerValue"])
-    if "doubleValue" in fv: return fv["doubleValue"]
-    if "booleanValue" in fv: return fv["booleanValue"]
-    if "mapValue" in fv: return {k: _from_fv(v) for k, v in fv.get("mapValue", {}).get("fields", {}).items()}
-    return None
-
-
-def _to_fv(val):
-    if isinstance(val, bool): return {"booleanValue": val}
-    if isinstance(val, int): return {"integerValue": str(val)}
-    if isinstance(val, float): return {"doubleValue": val}
-    if isinstance(val, str): return {"stringValue": val}
-    if isinstance(val, dict): return {"mapValue": {"fields": {k: _to_fv(v) for k, v in val.items()}}}
-    return {"stringValue": str(val)}
+HISSE_ALANLARI = ("durum", "sirket_adi", "bist_ilk_islem_tarihi", "tarih", fiyat_serisi.HARITA, fiyat_serisi.SERI)
 
 
 # ─── Firestore Okuma ─────────────────────────────────────
+@olcum.asama("firestore")
 def get_islem_hisseleri(token):
     docs, pt = [], None
     while True:
@@ -72,11 +65,12 @@ def get_islem_hisseleri(token):
             print(f"  Firestore hata: {r.status_code}")
             break
         res = r.json()
+        fs_maliyet.yanit_say("okuma", r, max(len(res.get("documents", [])), 1))
         for doc in res.get("documents", []):
-            p = {k: _from_fv(v) for k, v in doc.get("fields", {}).items()}
+            p = fs_kodek.HALKA_ARZ.coz(doc.get("fields", {}), HISSE_ALANLARI)
             p["_doc_id"] = doc["name"].split("/")[-1]
             if p.get("durum") == "islem":
-                docs.append(p)
+                docs.append(fiyat_serisi.cozulmus(p))
         pt = res.get("nextPageToken")
         if not pt: break
     return docs
@@ -132,36 +126,34 @@ def parse_turkish_tarih(s):
     return None
 
 
-# ─── Yahoo Finance Geçmiş ───────────────────────────────
+# ─── Fiyat Geçmişi ──────────────────────────────────────
+@olcum.asama("yahoo")
 def fetch_history(kod, start_date):
-    """Yahoo Finance'ten günlük kapanış fiyatlarını çeker."""
-    sym = f"{kod}.IS"
+    """Günlük kapanış fiyatlarını çeker (varsayılan Yahoo, bkz. fiyat_saglayici)."""
     try:
-        tk = yf.Ticker(sym)
-        hist = tk.history(start=start_date.strftime("%Y-%m-%d"),
-                          end=(datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"))
-        if hist.empty:
+        bars = get_provider().history(kod, start=start_date,
+                                      end=datetime.now() + timedelta(days=1))
+        if not bars:
             print(f"    {kod}: Veri yok")
             return {}
-        result = {}
-        for date, row in hist.iterrows():
-            key = date.strftime("%Y-%m-%d")
-            result[key] = round(float(row["Close"]), 2)
-        return result
+        return {b.tarih: round(b.kapanis, 2) for b in bars}
     except Exception as e:
         print(f"    {kod}: Yahoo hata — {e}")
         return {}
 
 
 # ─── Firestore Yazma ────────────────────────────────────
+@olcum.asama("firestore")
 def write_fiyat_gecmisi(token, doc_id, fiyat_gecmisi):
-    """fiyat_gecmisi alanını merge ile günceller."""
+    """Fiyat geçmişini HALKARZ_FIYAT_BICIMI biçiminde merge ile yazar (diğer biçimin alanı silinir)."""
     url = _fs_url(f"{COLLECTION}/{doc_id}")
-    body = {"fields": {"fiyat_gecmisi": _to_fv(fiyat_gecmisi)}}
-    fp = "updateMask.fieldPaths=fiyat_gecmisi"
+    data = fiyat_serisi.yazilacak(fiyat_gecmisi)
+    body = {"fields": fs_kodek.HALKA_ARZ.kodla(data)}
+    fp = "&".join(f"updateMask.fieldPaths={k}" for k in data)
     r = requests.patch(f"{url}?{fp}", json=body,
                        headers={"Authorization": f"Bearer {token}",
                                 "Content-Type": "application/json"}, timeout=15)
+    fs_maliyet.yanit_say("yazma", r)
     return r.status_code == 200
 
 
@@ -179,6 +171,7 @@ def main():
 
     # 1. İşlem gören hisseleri çek
     print("\n[1/3] Firestore'dan islem hisseleri çekiliyor...")
+    olcum.adim("hisseler")
     hisseler = get_islem_hisseleri(token)
     print(f"  {len(hisseler)} hisse bulundu.")
 
@@ -188,7 +181,9 @@ def main():
 
     # 2. Her hisse için Yahoo Finance geçmişini çek
     print("\n[2/3] Yahoo Finance'ten geçmiş fiyatlar çekiliyor...")
+    olcum.adim("backfill")
     toplam = 0
+    son_kapanis = bist_takvimi.son_kapanis_gunu()
 
     for h in hisseler:
         kod = h["_doc_id"]
@@ -204,9 +199,17 @@ def main():
             print(f"  {kod} ({adi}): tarih parse edilemedi ('{tarih_str}') → atlanıyor")
             continue
 
-        # İşleme başlama tarihi ≈ talep toplama bitişinden ~3 gün sonra
-        # Ama Yahoo zaten sadece işlem günlerinde veri döndürür
-        start_date = son_talep_tarihi + timedelta(days=1)
+        # İşleme başlama tarihi ≈ talep toplama bitişinden sonraki işlem günü
+        ilk_gun = bist_takvimi.sonraki_islem_gunu(son_talep_tarihi)
+
+        # Beklenen işlem günlerinin hepsi zaten kayıtlıysa Yahoo'ya gitme;
+        # eksik varsa sadece ilk eksik günden itibaren çek
+        eksik = [g for g in bist_takvimi.islem_gunleri(ilk_gun, son_kapanis)
+                 if g.isoformat() not in mevcut_gecmis]
+        if not eksik:
+            print(f"  {kod} ({adi}): güncel ({len(mevcut_gecmis)} gün) → atlanıyor")
+            continue
+        start_date = datetime.combine(eksik[0], datetime.min.time())
 
         print(f"  {kod} ({adi}): talep={tarih_str} → yahoo start={start_date.strftime('%d.%m.%Y')}...")
         yeni_fiyatlar = fetch_history(kod, start_date)
@@ -239,4 +242,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("backfill_prices"):
+        try:
+            main()
+        finally:
+            fs_maliyet.gunluk_ozet_yaz("backfill_prices", FIREBASE_PROJECT_ID, get_token)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+FCM Gönderici Benchmark'ı — Yerel Sahte Uç Nokta
+=================================================
+127.0.0.1'de FCM v1 gibi davranan bir HTTP/1.1 sunucusu (istek başına --gecikme
+ms, varsayılan 40) açar ve --mesaj (varsayılan 40) bildirimi iki yoldan gönderir:
+
+  eski    her mesaj için requests.post — yeni bağlantı, sıralı (eski send_fcm)
+  yeni    fcm_gonderici.FcmGonderici.toplu — havuzlu kalıcı bağlantı, PARALEL
+          eşzamanlı istek, hız sınırı kapalı (--hiz ile açılır)
+
+--429 N verilirse sunucu ilk N isteğe "429 + Retry-After: 0.2" döner; yeni yol
+bunları bekleyip yeniden dener, eski yol mesajı kaybeder. Yeni bağlantı sayısı
+sunucu tarafında sayılır. httpx yüklüyse bile yerel sunucu HTTP/1.1 konuşur;
+ölçülen fark bağlantı yeniden kullanımı + eşzamanlılıktır.
+
+Kullanım:
+  python backend/benchmarks/fcm_gonderici.py
+  python backend/benchmarks/fcm_gonderici.py --mesaj 200 --gecikme 80 --429 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import requests  # noqa: E402
+
+import fcm_gonderici  # noqa: E402
+
+
+class _Sunucu(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, gecikme, reddet):
+        self.gecikme, self.reddet = gecikme, reddet
+        self.baglanti = self.istek = 0
+        self.kilit = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _Isleyici)
+
+    def sifirla(self, reddet):
+        with self.kilit:
+            self.baglanti = self.istek = 0
+            self.reddet = reddet
+
+
+class _Isleyici(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.kilit:
+            self.server.baglanti += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.gecikme)
+        with self.server.kilit:
+            self.server.istek += 1
+            reddet = self.server.reddet > 0
+            if reddet:
+                self.server.reddet -= 1
+        if reddet:
+            govde, durum, ek = b'{"error": {"status": "RESOURCE_EXHAUSTED"}}', 429, {"Retry-After": "0.2"}
+        else:
+            govde, durum, ek = json.dumps({"name": "projects/p/messages/1"}).encode(), 200, {}
+        self.send_response(durum)
+        for k, v in {"Content-Type": "application/json", "Content-Length": str(len(govde)), **ek}.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def log_message(self, *a):
+        pass
+
+
+def eski(url, mesajlar):
+    tamam = 0
+    for m in mesajlar:
+        try:
+            r = requests.post(url, json=fcm_gonderici.mesaj_govdesi(*m),
+                              headers={"Authorization": "Bearer t", "Content-Type": "application/json; UTF-8"}, timeout=10)
+            tamam += r.status_code == 200
+        except requests.RequestException:
+            pass
+    return tamam
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FCM gönderici: sıralı tek bağlantı vs havuzlu eşzamanlı")
+    parser.add_argument("--mesaj", type=int, default=40)
+    parser.add_argument("--gecikme", type=float, default=40, help="Sunucu istek gecikmesi (ms)")
+    parser.add_argument("--hiz", type=float, default=1e9, help="Yeni yolun hız sınırı (istek/sn)")
+    parser.add_argument("--429", dest="reddet", type=int, default=0, help="İlk N isteğe 429 dön")
+    args = parser.parse_args(argv)
+
+    sunucu = _Sunucu(args.gecikme / 1000, args.reddet)
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    sablon = f"http://127.0.0.1:{sunucu.server_address[1]}/v1/projects/{{project_id}}/messages:send"
+    mesajlar = [(f"Başlık {i}", f"Gövde {i}", {"type": "tavan_yapti", "ticker": f"K{i:04d}"},
+                 f"'ticker_K{i:04d}' in topics || 'halka_arz' in topics") for i in range(args.mesaj)]
+
+    print(f"{args.mesaj} mesaj, sunucu gecikmesi {args.gecikme:.0f} ms"
+          + (f", ilk {args.reddet} istek 429" if args.reddet else "") + "\n")
+    t0 = time.perf_counter()
+    tamam = eski(sablon.format(project_id="p"), mesajlar)
+    sure_eski = time.perf_counter() - t0
+    print(f"  eski  {sure_eski:7.3f} sn  {tamam}/{args.mesaj} teslim  "
+          f"{sunucu.istek} istek, {sunucu.baglanti} bağlantı")
+
+    sunucu.sifirla(args.reddet)
+    gonderici = fcm_gonderici.FcmGonderici("p", lambda: "t", hiz=args.hiz, url=sablon, bekleme=0.05)
+    t0 = time.perf_counter()
+    sonuclar = gonderici.toplu(mesajlar)
+    sure_yeni = time.perf_counter() - t0
+    print(f"  yeni  {sure_yeni:7.3f} sn  {sum(s.basarili for s in sonuclar)}/{args.mesaj} teslim  "
+          f"{sunucu.istek} istek, {sunucu.baglanti} bağlantı  ({sure_eski / sure_yeni:.1f}×)")
+    sunucu.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
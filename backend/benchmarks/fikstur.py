@@ -0,0 +1,292 @@
+"""
+Benchmark Fikstürleri
+=====================
+Ağsız, deterministik girdiler:
+  - liste_sayfasi(n)     → halkarz.html'in kabuğu + n adet halka arz (ilk listedeki
+                           gerçek <li>'lerden çoğaltılır, kod/ad/tarih değiştirilir)
+  - detay_sayfasi(kod)   → aynı site kabuğunda sentetik detay sayfası
+  - SahteFirestore       → fs_get/fs_set/fs_delete/fs_collection yerine geçen bellek içi
+                           depo; veriyi gerçek REST kodlayıcısından geçirir
+  - fiyat_yollari(...)   → tavan/taban motoru için seed'li gün içi fiyat yolları
+  - en_iyi(fn, tekrar)   → mikro benchmark'ların ortak zamanlayıcısı (en iyi süre, ms)
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import fs_kodek  # noqa: E402
+
+KAYIT_HTML = os.path.join(BACKEND_DIR, "halkarz.html")
+SITE = "https://halkarz.com"
+
+_AYLAR = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz",
+          "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
+
+
+def _kayit():
+    with open(KAYIT_HTML, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _kabuk():
+    """Kayıtlı sayfanın ilk halka-arz-list öncesi ve son listeden sonrası (menü, footer, script'ler)."""
+    html = _kayit()
+    bas = html.find('<ul class="halka-arz-list')
+    son = html.rfind("</ul>", 0, html.find("</body>"))
+    return html[:bas], html[son + len("</ul>"):]
+
+
+def _ornek_li():
+    html = _kayit()
+    bas = html.find('<ul class="halka-arz-list"')
+    bas = html.find(">", bas) + 1
+    son = html.find("</ul>", bas)
+    return re.findall(r"<li>.*?</li>", html[bas:son], flags=re.S)
+
+
+def kod_uret(i: int) -> str:
+    harfler = "ABCDEFGHIJKLMNOPRSTUVYZ"
+    kod = ""
+    n = i
+    for _ in range(4):
+        kod = harfler[n % len(harfler)] + kod
+        n //= len(harfler)
+    return "B" + kod
+
+
+def sirket_adi(i: int) -> str:
+    return f"Benchmark {kod_uret(i).title()} Sanayi ve Ticaret A.Ş."
+
+
+def tarih_araligi(i: int, bugun: date) -> str:
+    """Listenin başı talep toplayan/taslak, gerisi geçmişte işlem görmeye başlamış arzlar."""
+    if i % 10 == 3:
+        return "Hazırlanıyor..."
+    bas = bugun - timedelta(days=1) if i < 3 else bugun - timedelta(days=7 + 3 * i)
+    bit = bas + timedelta(days=2)
+    if bas.month == bit.month:
+        return f"{bas.day}-{bit.day} {_AYLAR[bit.month - 1]} {bit.year}"
+    return f"{bas.day} {_AYLAR[bas.month - 1]}-{bit.day} {_AYLAR[bit.month - 1]} {bit.year}"
+
+
+def detay_url(i: int) -> str:
+    return f"{SITE}/benchmark-{kod_uret(i).lower()}-a-s/"
+
+
+def liste_sayfasi(n: int, bugun: date) -> str:
+    """n halka arzlı ana sayfa (tek liste)."""
+    ust, alt = _kabuk()
+    ornekler = _ornek_li()
+    li_listesi = []
+    for i in range(n):
+        li = ornekler[i % len(ornekler)]
+        adi, kod, tarih = sirket_adi(i), kod_uret(i), tarih_araligi(i, bugun)
+        li = re.sub(r'href="[^"]*"', f'href="{detay_url(i)}"', li)
+        li = re.sub(r'title="[^"]*"', f'title="{adi}"', li)
+        li = re.sub(r'(<h3 class="il-halka-arz-sirket"><a[^>]*>)[^<]*(</a>)', rf"\g<1>{adi}\g<2>", li)
+        li = re.sub(r'<span class="il-bist-kod">[^<]*</span>', f'<span class="il-bist-kod">{kod}</span>', li)
+        li = re.sub(r"<time[^>]*>[^<]*</time>",
+                    f'<time datetime="{tarih}" pubdate="pubdate" title="{tarih}">{tarih}</time>', li)
+        li_listesi.append(li)
+    return f'{ust}<ul class="halka-arz-list">\n' + "\n".join(li_listesi) + "\n</ul>" + alt
+
+
+def detay_sayfasi(i: int) -> str:
+    """Kayıtlı sitenin kabuğunda, ayrıştırıcıların aradığı tüm bölümleri içeren detay sayfası."""
+    ust, alt = _kabuk()
+    rng = random.Random(i)
+    fiyat = f"{rng.randint(10, 90)},{rng.choice(['00', '50', '25'])} TL"
+    lot = f"{rng.randint(5, 200) * 1_000_000:,}".replace(",", ".")
+    bireysel = f"{rng.randint(1, 50) * 1_000_000:,}".replace(",", ".")
+    aciklama = " ".join(rng.choice(["Şirket", "üretim", "ihracat", "enerji", "yazılım", "lojistik",
+                                    "gıda", "faaliyet", "yatırım", "kapasite"]) for _ in range(80))
+    fin = "".join(f"<tr><td>{k}</td><td>{rng.randint(10, 999)}.{rng.randint(100, 999)}</td>"
+                  f"<td>{rng.randint(10, 999)}.{rng.randint(100, 999)}</td></tr>"
+                  for k in ["Hasılat", "Brüt Kar", "Faaliyet Karı", "Net Kar", "Özkaynaklar", "Toplam Varlık"])
+    govde = f"""
+<div class="single-content">
+<h1>{sirket_adi(i)}</h1>
+<table class="sp-table"><tbody>
+<tr><td>Halka Arz Tarihi :</td><td>{tarih_araligi(i, date(2026, 1, 1))}</td></tr>
+<tr><td>Halka Arz Fiyatı/Aralığı :</td><td>{fiyat}</td></tr>
+<tr><td>Dağıtım Yöntemi :</td><td>{rng.choice(['Eşit Dağıtım', 'Oransal Dağıtım'])}</td></tr>
+<tr><td>Pay :</td><td>{lot} Lot</td></tr>
+<tr><td>Aracı Kurum :</td><td>{rng.choice(['Halk Yatırım', 'Ziraat Yatırım', 'Gedik Yatırım'])}</td></tr>
+<tr><td>Kişi Başı Lot :</td><td>{rng.randint(10, 500)} Lot</td></tr>
+<tr><td>Pazar :</td><td>Yıldız Pazar</td></tr>
+<tr><td>Bist İlk İşlem Tarihi :</td><td>-</td></tr>
+</tbody></table>
+<h5>Halka Arz Şekli</h5><p>Sermaye artırımı ve ortak satışı.</p>
+<h5>Fonun Kullanım Yeri</h5><ul><li>%40 Yatırım</li><li>%35 İşletme sermayesi</li><li>%25 Borç ödeme</li></ul>
+<h5>Halka Arz Satış Yöntemi</h5><p>Borsa'da Satış — Sabit Fiyatla Talep Toplama</p>
+<h5>Tahsisat Grupları</h5><p>{bireysel} Lot (%{rng.randint(30, 70)}) Yurt İçi Bireysel Yatırımcılar</p>
+<h5>Katılım Endeksi</h5><p>Katılım endeksine uygun{'dur' if i % 2 else ' değildir'}.</p>
+<h2>({kod_uret(i)}) {sirket_adi(i)}</h2><p>{aciklama}</p>
+<table class="fin-table"><tr><th>Kalem</th><th>2024</th><th>2025</th></tr>{fin}</table>
+<h5>Özet Bilgiler</h5><p>-</p>
+</div>
+"""
+    return ust + govde + alt
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SAHTE HTTP
+# ═══════════════════════════════════════════════════════════════════
+class SahteYanit:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode("utf-8")
+
+
+class SahteSite:
+    """URL → HTML; safe_get yerine geçer (bekleme yok)."""
+
+    def __init__(self, n: int, bugun: date):
+        self.sayfalar = {SITE: liste_sayfasi(n, bugun), SITE + "/": None}
+        self.sayfalar[SITE + "/"] = self.sayfalar[SITE]
+        self.indeks = {kod_uret(i).lower(): i for i in range(n)}
+        self.istek = 0
+
+    def safe_get(self, url, timeout=15):
+        self.istek += 1
+        if url not in self.sayfalar:
+            m = re.match(rf"{SITE}/benchmark-([a-z]+)-a-s/", url)
+            if not m:
+                return None
+            i = self.indeks.get(m.group(1))
+            if i is None:
+                return None
+            self.sayfalar[url] = detay_sayfasi(i)
+        return SahteYanit(self.sayfalar[url])
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SAHTE FIRESTORE
+# ═══════════════════════════════════════════════════════════════════
+class SahteFirestore:
+    """
+    main.py fs_* yardımcılarıyla aynı sözleşme. Dokümanlar REST kodlanmış halde
+    (fields → Value) saklanır; okuma/yazma gerçek _to_fv/_from_fv maliyetini içerir.
+    sema verilirse (fs_kodek.Sema) kodlama/çözme onun üzerinden yapılır ve
+    fs_get/fs_collection'ın alanlar= süzgeci gerçekteki gibi uygulanır.
+    """
+
+    def __init__(self, to_fv, from_fv, sema=None):
+        self.to_fv, self.from_fv, self.sema = to_fv, from_fv, sema
+        self.belgeler: dict[str, dict] = {}
+        self.sayac = {"okuma": 0, "yazma": 0, "silme": 0}
+
+    def _coz(self, alanlar, istenen=None):
+        if self.sema is not None:
+            return self.sema.coz(alanlar, istenen)
+        if istenen is not None:
+            alanlar = {k: alanlar[k] for k in istenen if k in alanlar}
+        return {k: self.from_fv(v) for k, v in alanlar.items()}
+
+    def _kodla(self, data):
+        if self.sema is not None:
+            return self.sema.kodla(data)
+        return {k: self.to_fv(v) for k, v in data.items() if v is not fs_kodek.SIL}
+
+    def fs_get(self, doc_path, alanlar=None):
+        self.sayac["okuma"] += 1
+        kayit = self.belgeler.get(doc_path)
+        return self._coz(kayit, alanlar) if kayit is not None else {}
+
+    def fs_set(self, doc_path, data, merge=False):
+        self.sayac["yazma"] += 1
+        kodlu = self._kodla(data)
+        if merge and doc_path in self.belgeler:
+            for k in data.keys() - kodlu.keys():  # fs_kodek.SIL: updateMask'te var, gövdede yok → silinir
+                self.belgeler[doc_path].pop(k, None)
+            self.belgeler[doc_path].update(kodlu)
+        else:
+            self.belgeler[doc_path] = kodlu
+        return True
+
+    def fs_delete(self, doc_path):
+        self.sayac["silme"] += 1
+        return self.belgeler.pop(doc_path, None) is not None
+
+    def fs_collection(self, col, alanlar=None):
+        sonuc = []
+        for yol, kayit in list(self.belgeler.items()):
+            ust, _, doc_id = yol.rpartition("/")
+            if ust == col:
+                self.sayac["okuma"] += 1
+                d = self._coz(kayit, alanlar)
+                d["_doc_id"] = doc_id
+                sonuc.append(d)
+        return sonuc
+
+    def halka_arzlar_doldur(self, n: int, bugun: date, gecmis_gun: int = 60):
+        """n 'islem' dokümanı; her biri gecmis_gun günlük fiyat_gecmisi ile."""
+        for i in range(n):
+            rng = random.Random(i)
+            fiyat = rng.uniform(10, 90)
+            gecmis = {}
+            for g in range(gecmis_gun, 0, -1):
+                fiyat *= 1 + rng.uniform(-0.1, 0.1)
+                gecmis[(bugun - timedelta(days=g)).isoformat()] = round(fiyat, 2)
+            self.belgeler[f"halka_arzlar/{kod_uret(i)}"] = self._kodla({
+                "sirket_kodu": kod_uret(i), "sirket_adi": sirket_adi(i), "durum": "islem",
+                "tarih": tarih_araligi(i, bugun), "arz_fiyati": round(rng.uniform(10, 90), 2),
+                "fiyat_gecmisi": gecmis,
+            })
+
+
+@contextmanager
+def yamala(modul, **degerler):
+    """modul.ad = deger atamalarını blok süresince uygular."""
+    eski = {ad: getattr(modul, ad) for ad in degerler}
+    for ad, deger in degerler.items():
+        setattr(modul, ad, deger)
+    try:
+        yield
+    finally:
+        for ad, deger in eski.items():
+            setattr(modul, ad, deger)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FİYAT YOLLARI
+# ═══════════════════════════════════════════════════════════════════
+def fiyat_yollari(n: int, tur: int, seed: int = 0):
+    """[(kod, onceki_kapanis, [tur fiyatı, ...]), ...] — ~%15 tavana, ~%5 tabana dokunur."""
+    sonuc = []
+    for i in range(n):
+        rng = random.Random(f"{seed}|{i}")
+        onceki = round(rng.uniform(8, 120), 2)
+        hedef = rng.choice([1.10] * 3 + [0.90] + [1.0] * 16) * onceki
+        fiyat, yol = onceki, []
+        for t in range(tur):
+            fiyat += (hedef - fiyat) / max(tur - t, 1) + rng.gauss(0, onceki * 0.004)
+            fiyat = min(max(fiyat, onceki * 0.90), onceki * 1.10)
+            yol.append(round(fiyat, 2))
+        sonuc.append((kod_uret(i), onceki, yol))
+    return sonuc
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ZAMANLAMA
+# ═══════════════════════════════════════════════════════════════════
+def en_iyi(fn, tekrar):
+    """fn'i tekrar kez çalıştırır; en iyi süre (ms) — gürültüye en az duyarlı ölçü."""
+    sureler = []
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        fn()
+        sureler.append(time.perf_counter() - t0)
+    return min(sureler) * 1000
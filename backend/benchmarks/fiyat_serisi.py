@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Fiyat Geçmişi Biçimleri Benchmark'ı
+====================================
+fiyat_gecmisi haritasını fiyat_serisi.py'nin sütun ve paket biçimleriyle
+karşılaştırır:
+
+  boyut   Firestore depolama ve REST JSON baytı (alan adı dahil)
+  süre    REST Value JSON → {tarih: fiyat}: HALKA_ARZ.coz (+ sutundan / paketten);
+          "yanıt" sütunu REST gövdesinin json.loads'unu da içerir (r.json() + çözme)
+
+Veri kümeleri:
+  ipos.json   data/ipos.json'daki sparkline + sparkline_dates serileri (mevcut veri;
+              Yahoo'dan yuvarlanmamış float'lar → paket ham float64 moduna düşer)
+  kuruş       aynı seriler 2 basamağa yuvarlanmış — Firestore'a yazılan fiyatlar
+              (main/price_tracker/backfill round(…, 2) yazar)
+  --gun       tek hisse, --gun işlem günü (varsayılan 2.000) sentetik seri
+
+Kullanım:
+  python backend/benchmarks/fiyat_serisi.py
+  python backend/benchmarks/fiyat_serisi.py --gun 5000 --tekrar 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import bist_takvimi  # noqa: E402
+from fikstur import en_iyi  # noqa: E402
+import fiyat_serisi  # noqa: E402
+import fs_kodek  # noqa: E402
+
+IPOS_FILE = os.path.join(BACKEND_DIR, "data", "ipos.json")
+
+
+def ipos_serileri() -> list:
+    with open(IPOS_FILE, "r", encoding="utf-8") as f:
+        kayitlar = json.load(f)
+    return [dict(zip(k["sparkline_dates"], k["sparkline"])) for k in kayitlar
+            if k.get("sparkline") and k.get("sparkline_dates")]
+
+
+def sentetik(gun: int) -> dict:
+    rng = random.Random(0)
+    gunler = bist_takvimi.islem_gunleri(date.today() - timedelta(days=gun * 7 // 5 + 30), date.today())[-gun:]
+    fiyat, gecmis = 25.0, {}
+    for g in gunler:
+        fiyat = round(max(fiyat * (1 + rng.uniform(-0.1, 0.1)), 0.01), 2)
+        gecmis[g.isoformat()] = fiyat
+    return gecmis
+
+
+def olc(ad: str, seriler: list, tekrar: int):
+    gun = sum(len(s) for s in seriler)
+    toplam = {b: [0, 0] for b in fiyat_serisi.BICIMLER}
+    for s in seriler:
+        for b, (depolama, rest) in fiyat_serisi.boyutlar(s).items():
+            toplam[b][0] += depolama
+            toplam[b][1] += rest
+
+    sema = fs_kodek.HALKA_ARZ
+    kodlu = {b: [sema.kodla({k: v for k, v in fiyat_serisi.yazilacak(s, b).items() if v is not fs_kodek.SIL})
+                 for s in seriler] for b in fiyat_serisi.BICIMLER}
+    for b, alanlar in kodlu.items():  # Doğruluk: her biçim orijinal sözlüğe döner
+        assert [fiyat_serisi.oku(sema.coz(a)) for a in alanlar] == seriler, b
+    sure = {b: en_iyi(lambda a=alanlar: [fiyat_serisi.oku(sema.coz(x)) for x in a], tekrar)
+            for b, alanlar in kodlu.items()}
+    govdeler = {b: [json.dumps({"fields": a}).encode("utf-8") for a in alanlar] for b, alanlar in kodlu.items()}
+    yanit = {b: en_iyi(lambda g=g: [fiyat_serisi.oku(sema.coz(json.loads(x)["fields"])) for x in g], tekrar)
+             for b, g in govdeler.items()}
+
+    print(f"  {ad}: {len(seriler)} seri, {gun} gün")
+    taban_d, taban_r = toplam["harita"]
+    taban_s, taban_y = sure["harita"], yanit["harita"]
+    for b in fiyat_serisi.BICIMLER:
+        depolama, rest = toplam[b]
+        print(f"    {b:<8} depolama {depolama:>9,} B ({depolama / taban_d:>4.0%})  "
+              f"REST {rest:>9,} B ({rest / taban_r:>4.0%})  "
+              f"çözme {sure[b]:>7.3f} ms ({taban_s / sure[b]:>4.1f}×)  "
+              f"yanıt {yanit[b]:>7.3f} ms ({taban_y / yanit[b]:>4.1f}×)")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fiyat geçmişi biçimleri boyut/süre karşılaştırması")
+    parser.add_argument("--gun", type=int, default=2000, help="Sentetik serinin işlem günü sayısı")
+    parser.add_argument("--tekrar", type=int, default=20, help="Ölçüm başına tekrar (en iyisi raporlanır)")
+    args = parser.parse_args(argv)
+
+    mevcut = ipos_serileri()
+    print(f"En iyi {args.tekrar} tekrar\n")
+    olc("ipos.json", mevcut, args.tekrar)
+    olc("ipos.json (kuruş)", [{t: round(f, 2) for t, f in s.items()} for s in mevcut], args.tekrar)
+    olc(f"sentetik {args.gun} gün", [sentetik(args.gun)], args.tekrar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
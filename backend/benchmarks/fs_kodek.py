@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Firestore Değer Kodlayıcı Benchmark'ı
+======================================
+--gun günlük (varsayılan 2.000) fiyat_gecmisi haritalı bir halka_arzlar
+dokümanında eski kopyalanmış _to_fv / _from_fv'yi fs_kodek ile karşılaştırır:
+
+  kodla   eski _to_fv            | fs_kodek.to_fv (genel) | HALKA_ARZ.kodla (şemalı)
+  çöz     eski _from_fv          | fs_kodek.from_fv       | HALKA_ARZ.coz   | coz(alanlar=("durum", "sirket_adi"))
+
+Her yolun çıktısı eskisiyle karşılaştırılır; fark varsa benchmark hata verir.
+
+Kullanım:
+  python backend/benchmarks/fs_kodek.py
+  python backend/benchmarks/fs_kodek.py --gun 5000 --tekrar 50
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from fikstur import en_iyi  # noqa: E402
+import fs_kodek  # noqa: E402
+
+
+# ─── Taban: main.py / price_tracker.py'deki eski kopya ───
+def eski_to_fv(val):
+    if val is None: return {"nullValue": None}
+    if isinstance(val, bool): return {"booleanValue": val}
+    if isinstance(val, int): return {"integerValue": str(val)}
+    if isinstance(val, float): return {"doubleValue": val}
+    if isinstance(val, str): return {"stringValue": val}
+    if isinstance(val, list): return {"arrayValue": {"values": [eski_to_fv(v) for v in val]}}
+    if isinstance(val, dict): return {"mapValue": {"fields": {k: eski_to_fv(v) for k, v in val.items()}}}
+    return {"stringValue": str(val)}
+
+
+def eski_from_fv(fv):
+    if "stringValue" in fv: return fv["stringValue"]
+    if "integerValue" in fv: return int(fv["integerValue"])
+    if "doubleValue" in fv: return fv["doubleValue"]
+    if "booleanValue" in fv: return fv["booleanValue"]
+    if "nullValue" in fv: return None
+    if "arrayValue" in fv: return [eski_from_fv(v) for v in fv.get("arrayValue", {}).get("values", [])]
+    if "mapValue" in fv: return {k: eski_from_fv(v) for k, v in fv.get("mapValue", {}).get("fields", {}).items()}
+    return None
+
+
+def dokuman(gun: int) -> dict:
+    rng = random.Random(0)
+    bugun = date.today()
+    fiyat, gecmis = 25.0, {}
+    for g in range(gun, 0, -1):
+        fiyat *= 1 + rng.uniform(-0.1, 0.1)
+        gecmis[(bugun - timedelta(days=g)).isoformat()] = round(fiyat, 2)
+    return {
+        "sirket_kodu": "ORNEK", "sirket_adi": "Örnek Teknoloji A.Ş.", "durum": "islem",
+        "tarih": "3-4-5 Mart 2026", "arz_fiyati": 25.0, "toplam_lot": 40_000_000,
+        "dagitim_sekli": "Eşit", "konsorsiyum_lideri": "Örnek Yatırım",
+        "katilim_endeksine_uygun": True, "kisi_basi_lot": "1", "bireysel_lot": 20_000_000,
+        "bireysel_yuzde": 50, "pazar": "Yıldız Pazar", "bist_ilk_islem_tarihi": "2026-03-10",
+        "guncelleme_zamani": "2026-03-10T18:00:00", "son_fiyat": round(fiyat, 2),
+        "fiyat_gecmisi": gecmis,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Firestore Value JSON kodlayıcı benchmark'ı")
+    parser.add_argument("--gun", type=int, default=2000, help="fiyat_gecmisi gün sayısı")
+    parser.add_argument("--tekrar", type=int, default=20, help="Ölçüm başına tekrar (en iyisi raporlanır)")
+    args = parser.parse_args(argv)
+
+    doc = dokuman(args.gun)
+    sema = fs_kodek.HALKA_ARZ
+    fields = {k: eski_to_fv(v) for k, v in doc.items()}
+    alt = ("durum", "sirket_adi")
+
+    # Doğruluk: hepsi eski kopyayla aynı çıktıyı vermeli
+    assert {k: fs_kodek.to_fv(v) for k, v in doc.items()} == fields
+    assert sema.kodla(doc) == fields
+    assert {k: fs_kodek.from_fv(v) for k, v in fields.items()} == doc
+    assert sema.coz(fields) == doc
+    assert sema.coz(fields, alt) == {k: doc[k] for k in alt}
+
+    sonuc = {
+        "kodla": {
+            "eski _to_fv": en_iyi(lambda: {k: eski_to_fv(v) for k, v in doc.items()}, args.tekrar),
+            "fs_kodek.to_fv": en_iyi(lambda: {k: fs_kodek.to_fv(v) for k, v in doc.items()}, args.tekrar),
+            "HALKA_ARZ.kodla": en_iyi(lambda: sema.kodla(doc), args.tekrar),
+        },
+        "çöz": {
+            "eski _from_fv": en_iyi(lambda: {k: eski_from_fv(v) for k, v in fields.items()}, args.tekrar),
+            "fs_kodek.from_fv": en_iyi(lambda: {k: fs_kodek.from_fv(v) for k, v in fields.items()}, args.tekrar),
+            "HALKA_ARZ.coz": en_iyi(lambda: sema.coz(fields), args.tekrar),
+            f"coz(alanlar={alt})": en_iyi(lambda: sema.coz(fields, alt), args.tekrar),
+        },
+    }
+
+    print(f"{len(doc)} alanlı doküman, fiyat_gecmisi {args.gun} gün | en iyi {args.tekrar} tekrar\n")
+    for grup, olcumler in sonuc.items():
+        print(f"  {grup.capitalize()}")
+        taban = next(iter(olcumler.values()))
+        for ad, ms in olcumler.items():
+            print(f"    {ad:<44} {ms:>8.3f} ms  ({taban / ms:>6.1f}×)")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
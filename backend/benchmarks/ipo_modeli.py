@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+IPO Kayıt Modeli Benchmark'ı
+=============================
+data/ipos.json kayıtlarını (--carpan ile büyütülmüş) serbest sözlük ve
+ipo_modeli.Ipo olarak bellekte tutar ve karşılaştırır:
+
+  bellek   tracemalloc: json.loads sözlükleri | Ipo.from_dict
+  çevirme  Ipo.from_dict / to_dict, to_fields / from_fields
+           (Value JSON için taban: main._to_fv / _from_fv ile aynı genel kodlayıcı)
+
+Kullanım:
+  python backend/benchmarks/ipo_modeli.py
+  python backend/benchmarks/ipo_modeli.py --carpan 20    # ~4.400 kayıtlık arşiv ölçeği
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from fikstur import en_iyi  # noqa: E402
+import ipo_modeli  # noqa: E402
+from ipo_modeli import Ipo  # noqa: E402
+
+IPOS_FILE = os.path.join(BACKEND_DIR, "data", "ipos.json")
+
+
+def bellek(fn):
+    gc.collect()
+    tracemalloc.start()
+    nesne = fn()
+    boyut = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nesne
+    return boyut
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IPO kayıt modeli bellek/çevirme benchmark'ı")
+    parser.add_argument("--tekrar", type=int, default=10, help="Ölçüm başına tekrar (en iyisi raporlanır)")
+    parser.add_argument("--carpan", type=int, default=1, help="Veriyi N kat büyüt (arşiv ölçeği)")
+    args = parser.parse_args(argv)
+
+    with open(IPOS_FILE, "rb") as f:
+        ham = f.read()
+    ornek = json.loads(ham)
+    n = len(ornek) * args.carpan
+
+    bayt = {
+        "dict (json.loads)": bellek(lambda: [kayit for _ in range(args.carpan) for kayit in json.loads(ham)]),
+        "Ipo (from_dict)": bellek(lambda: [Ipo.from_dict(k) for _ in range(args.carpan) for k in json.loads(ham)]),
+    }
+
+    sozlukler = ornek * args.carpan
+    ipolar = [Ipo.from_dict(k) for k in sozlukler]
+    alanlar = [i.to_fields() for i in ipolar]
+    cevirme = {
+        "from_dict": en_iyi(lambda: [Ipo.from_dict(k) for k in sozlukler], args.tekrar),
+        "to_dict": en_iyi(lambda: [i.to_dict() for i in ipolar], args.tekrar),
+        "genel _to_fv (sözlük)": en_iyi(lambda: [ipo_modeli._to_fv(k) for k in sozlukler], args.tekrar),
+        "to_fields": en_iyi(lambda: [i.to_fields() for i in ipolar], args.tekrar),
+        "genel _from_fv (sözlük)": en_iyi(lambda: [ipo_modeli._from_fv({"mapValue": {"fields": a}}) for a in alanlar],
+                                          args.tekrar),
+        "from_fields": en_iyi(lambda: [Ipo.from_fields(a) for a in alanlar], args.tekrar),
+    }
+
+    print(f"ipos.json × {args.carpan} = {n} kayıt | en iyi {args.tekrar} tekrar\n")
+    print("  Bellek")
+    taban = next(iter(bayt.values()))
+    for ad, b in bayt.items():
+        print(f"    {ad:<26} {b / 1024:>9.1f} KB  ({b / n:>6.0f} B/kayıt, {taban / b:.1f}×)")
+    print("\n  Çevirme")
+    for ad, ms in cevirme.items():
+        print(f"    {ad:<26} {ms:>9.2f} ms  ({ms * 1000 / n:>5.1f} µs/kayıt)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+ipos.json Okuma/Yazma Benchmark'ı
+==================================
+Mevcut data/ipos.json üzerinde eski yolu (json.load / json.dump(indent=2)
+doğrudan hedefe) veri_dosyasi ile karşılaştırır:
+
+  oku   json.load (girintili)  | veri_dosyasi.ipos_oku (girintili) | ipos.min.json.gz
+  yaz   json.dump(indent=2)    | veri_dosyasi.json_yaz (atomik)   | ipos_kaydet (atomik + .min.json.gz)
+
+orjson kuruluysa veri_dosyasi onu kullanır; --orjsonsuz ile json yedeği ölçülür.
+Yazma ölçümleri geçici dizinde yapılır, data/ dosyalarına dokunulmaz.
+
+Kullanım:
+  python backend/benchmarks/ipos_json.py
+  python backend/benchmarks/ipos_json.py --tekrar 50 --carpan 10   # 10× büyütülmüş veri
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from fikstur import en_iyi  # noqa: E402
+import veri_dosyasi  # noqa: E402
+
+IPOS_FILE = os.path.join(BACKEND_DIR, "data", "ipos.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ipos.json okuma/yazma benchmark'ı")
+    parser.add_argument("--tekrar", type=int, default=20, help="Ölçüm başına tekrar (en iyisi raporlanır)")
+    parser.add_argument("--carpan", type=int, default=1, help="Veriyi N kat büyüt (büyüme senaryosu)")
+    parser.add_argument("--orjsonsuz", action="store_true", help="orjson kurulu olsa da json yedeğini ölç")
+    args = parser.parse_args(argv)
+
+    if args.orjsonsuz:
+        veri_dosyasi.orjson = None
+    with open(IPOS_FILE, "r", encoding="utf-8") as f:
+        ipos = json.load(f) * args.carpan
+
+    with tempfile.TemporaryDirectory() as dizin:
+        eski = os.path.join(dizin, "eski.json")
+        yeni = os.path.join(dizin, "ipos.json")
+
+        def eski_yaz():
+            with open(eski, "w", encoding="utf-8") as f:
+                json.dump(ipos, f, ensure_ascii=False, indent=2)
+
+        def eski_oku():
+            with open(eski, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        yazma = {
+            "json.dump(indent=2)": en_iyi(eski_yaz, args.tekrar),
+            "json_yaz (atomik)": en_iyi(lambda: veri_dosyasi.json_yaz(yeni, ipos), args.tekrar),
+            "ipos_kaydet (+gz)": en_iyi(lambda: veri_dosyasi.ipos_kaydet(yeni, ipos), args.tekrar),
+        }
+        gz = veri_dosyasi.sikistirilmis_yol(yeni)
+        okuma = {
+            "json.load": en_iyi(eski_oku, args.tekrar),
+            "ipos_oku (girintili)": en_iyi(lambda: veri_dosyasi.ipos_oku(yeni), args.tekrar),
+            "ipos_oku (.min.json.gz)": en_iyi(lambda: veri_dosyasi.ipos_oku(gz), args.tekrar),
+        }
+        boyut = {"girintili": os.path.getsize(yeni), "min.json.gz": os.path.getsize(gz),
+                 "min.json": len(veri_dosyasi.dumps(ipos, girintili=False))}
+
+    motor = "orjson" if veri_dosyasi.orjson is not None else "json"
+    print(f"ipos.json: {len(ipos)} kayıt | veri_dosyasi motoru: {motor} | en iyi {args.tekrar} tekrar\n")
+    for baslik, tablo in (("Okuma", okuma), ("Yazma", yazma)):
+        taban = next(iter(tablo.values()))
+        print(f"  {baslik}")
+        for ad, ms in tablo.items():
+            print(f"    {ad:<26} {ms:>8.2f} ms  ({taban / ms:.1f}×)")
+    print("\n  Boyut")
+    for ad, bayt in boyut.items():
+        print(f"    {ad:<26} {bayt / 1024:>8.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
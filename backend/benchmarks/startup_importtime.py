@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Başlangıç (import) Süresi Benchmark'ı
+======================================
+Her giriş betiğini ayrı bir yorumlayıcıda `python -X importtime -c "import X"`
+ile yükler ve şunları kontrol eder:
+  - Kümülatif yükleme süresi (en iyi N tekrar) startup_budget.json bütçesini aşmıyor
+  - Yasaklı ağır bağımlılıklar (yfinance/pandas/google-auth…) başlangıçta yüklenmiyor
+
+Kullanım:
+  python backend/benchmarks/startup_importtime.py            # rapor + bütçe kontrolü
+  python backend/benchmarks/startup_importtime.py --json     # makine okunur çıktı
+  python backend/benchmarks/startup_importtime.py --ilk 15   # en ağır 15 modülü listele
+
+Bütçe aşılırsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+BUTCE_DOSYASI = os.path.join(BENCH_DIR, "startup_budget.json")
+
+
+def importtime_olc(modul: str) -> list[tuple[str, int, int]]:
+    """Modülü temiz bir yorumlayıcıda yükler; [(modül, self_us, kümülatif_us), ...] döner."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{modul} yüklenemedi:\n{proc.stderr[-2000:]}")
+    satirlar = []
+    for satir in proc.stderr.splitlines():
+        if not satir.startswith("import time:") or "self [us]" in satir:
+            continue
+        try:
+            self_us, kum_us, ad = satir.split(":", 1)[1].split("|")
+        except ValueError:
+            continue
+        satirlar.append((ad.strip(), int(self_us), int(kum_us)))
+    return satirlar
+
+
+def modul_raporu(modul: str, tekrar: int, ilk: int) -> dict:
+    en_iyi = None
+    for _ in range(tekrar):
+        satirlar = importtime_olc(modul)
+        toplam = next((kum for ad, _, kum in satirlar if ad == modul), 0)
+        if en_iyi is None or toplam < en_iyi[0]:
+            en_iyi = (toplam, satirlar)
+    toplam, satirlar = en_iyi
+    yuklenen = {ad for ad, _, _ in satirlar}
+    agir = sorted(((kum, ad) for ad, _, kum in satirlar if ad != modul), reverse=True)
+    return {
+        "modul": modul,
+        "toplam_ms": round(toplam / 1000, 1),
+        "modul_sayisi": len(yuklenen),
+        "en_agir": [{"modul": ad, "ms": round(kum / 1000, 1)} for kum, ad in agir[:ilk]],
+        "_yuklenen": yuklenen,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giriş betiklerinin import süresi benchmark'ı")
+    parser.add_argument("--json", action="store_true", help="JSON çıktı")
+    parser.add_argument("--ilk", type=int, default=5, help="Listelenecek en ağır modül sayısı")
+    parser.add_argument("--tekrar", type=int, help="Modül başına tekrar (en iyisi alınır)")
+    args = parser.parse_args(argv)
+
+    with open(BUTCE_DOSYASI, "r", encoding="utf-8") as f:
+        butce = json.load(f)
+    tekrar = args.tekrar or butce.get("tekrar", 5)
+
+    raporlar, ihlaller = [], []
+    for modul, kural in butce["moduller"].items():
+        r = modul_raporu(modul, tekrar, args.ilk)
+        yuklenen = r.pop("_yuklenen")
+        yasakli = sorted(m for m in kural.get("yasakli", []) if m in yuklenen)
+        r["butce_ms"] = kural["butce_ms"]
+        r["yasakli_yuklenen"] = yasakli
+        if r["toplam_ms"] > kural["butce_ms"]:
+            ihlaller.append(f"{modul}: {r['toplam_ms']} ms > bütçe {kural['butce_ms']} ms")
+        if yasakli:
+            ihlaller.append(f"{modul}: başlangıçta yüklenmemeli → {', '.join(yasakli)}")
+        raporlar.append(r)
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "sonuclar": raporlar, "ihlaller": ihlaller},
+                         ensure_ascii=False, indent=2))
+    else:
+        print(f"Python {sys.version.split()[0]} | en iyi {tekrar} tekrar\n")
+        for r in raporlar:
+            durum = "✓" if r["toplam_ms"] <= r["butce_ms"] and not r["yasakli_yuklenen"] else "✗"
+            print(f"[{durum}] {r['modul']:<16} {r['toplam_ms']:>7.1f} ms / {r['butce_ms']} ms  ({r['modul_sayisi']} modül)")
+            for a in r["en_agir"]:
+                print(f"      {a['ms']:>7.1f} ms  {a['modul']}")
+        print()
+        for i in ihlaller:
+            print(f"[HATA] {i}")
+        if not ihlaller:
+            print("[✓] Tüm giriş betikleri bütçe içinde.")
+    return 1 if ihlaller else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
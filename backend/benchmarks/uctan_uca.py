@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Uçtan Uca Benchmark — Ağsız, Kayıtlı Fikstürlerle
+==================================================
+halkarz.com HTML'i (halkarz.html kabuğu + sentetik detay sayfaları), replay
+fiyat sağlayıcısı ve bellek içi Firestore ile şu yolları 20 / 200 / 2000
+halka arz ölçeğinde ölçer:
+
+  scrape_first_20      main.scrape_first_20 — n kalemli ana sayfayı ayrıştırma
+  fetch_all_details    kap_scraper.fetch_all_details — n detay sayfası
+  merge_scraped_data   halkarz_scraper.merge_scraped_data — n kayıtlı bellek içi IPO deposu × n kazınan (%10 kodsuz)
+  tavan_taban          price_tracker.check_tavan_taban — n hisse × 100 tur
+  main                 main.main() — n dokümanlı Firestore, ilk 20 arz, temizlik dahil
+
+Sonuçlar benchmarks/sonuclar/<tarih>_<commit>.json'a yazılır ve bir önceki
+sonuç dosyasıyla karşılaştırılır.
+
+Kullanım:
+  python backend/benchmarks/uctan_uca.py
+  python backend/benchmarks/uctan_uca.py --boyutlar 20,200 --tekrar 5
+  python backend/benchmarks/uctan_uca.py --sadece main,merge_scraped_data --esik 25
+"""
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import fikstur
+from fikstur import BENCH_DIR, BACKEND_DIR, SahteFirestore, SahteSite, kod_uret, sirket_adi, yamala
+
+SONUC_DIZINI = os.path.join(BENCH_DIR, "sonuclar")
+TT_TUR = 100  # tavan/taban: seans boyunca 5 dk'lık tur sayısı (~8.5 saat)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SENARYOLAR — her biri (hazırla(n) → bağlam, çalıştır(bağlam)) çifti
+# ═══════════════════════════════════════════════════════════════════
+def _scrape_hazirla(n):
+    import main
+    return main, SahteSite(n, date.today())
+
+
+def _scrape_calistir(ctx):
+    main, site = ctx
+    with yamala(main, safe_get=site.safe_get):
+        sonuc = main.scrape_first_20()
+    assert sonuc, "scrape_first_20 boş döndü"
+
+
+def _detay_hazirla(n):
+    import kap_scraper
+    site = SahteSite(n, date.today())
+    urller = [fikstur.detay_url(i) for i in range(n)]
+    for url in urller:  # Sayfa üretimi ölçüme girmesin
+        site.safe_get(url)
+    return kap_scraper, site, urller
+
+
+def _detay_calistir(ctx):
+    kap_scraper, site, urller = ctx
+    with yamala(kap_scraper, safe_get=site.safe_get):
+        for url in urller:
+            kap_scraper.fetch_all_details(url)
+
+
+def _merge_hazirla(n):
+    import halkarz_scraper as hs
+    from ipo_deposu import IpoDeposu
+    mevcut = [hs.create_new_ipo_entry({"sirket_kodu": kod_uret(i), "sirket_adi": sirket_adi(i), "durum": "islem_goruyor"})
+              for i in range(n)]
+    kazinan = []
+    for i in range(n // 2, n + n // 2):
+        kod = "" if i % 10 == 0 else kod_uret(i)  # Kodsuz kayıtlar ada göre eşleşir
+        kazinan.append({"sirket_kodu": kod, "sirket_adi": sirket_adi(i),
+                        "durum": "talep_topluyor" if i % 3 == 0 else "islem_goruyor",
+                        "talep_baslangic": "2026-01-05", "talep_bitis": "2026-01-07",
+                        "arz_fiyati": 25.5, "toplam_lot": 1_000_000, "dagitim_sekli": "Eşit"})
+    return hs, IpoDeposu.listeden(mevcut), kazinan
+
+
+def _merge_calistir(ctx):
+    hs, depo, kazinan = ctx
+    hs.merge_scraped_data(depo, kazinan)
+
+
+def _tt_hazirla(n):
+    import price_tracker
+    return price_tracker, fikstur.fiyat_yollari(n, TT_TUR)
+
+
+def _tt_calistir(ctx):
+    pt, yollar = ctx
+    gonderilen = []
+    with yamala(pt, send_fcm=lambda *a, **k: gonderilen.append(a) or True):
+        state = {}
+        for tur in range(TT_TUR):
+            kutu = pt.bildirim_kutusu.BildirimKutusu(pt.send_fcm)  # takip_turu gibi: tur başına bir kutu
+            for kod, onceki, yol in yollar:
+                state = pt.check_tavan_taban(kod, kod, yol[tur], onceki, state, kutu)
+            kutu.gonder()
+    assert gonderilen, "tavan/taban bildirimi üretilmedi"
+
+
+def _main_hazirla(n):
+    import main
+    from fiyat_saglayici import ReplayProvider
+    from bist_takvimi import TR_TZ
+    bugun = date.today()
+    fs = SahteFirestore(main._to_fv, main._from_fv, main.FS_SEMA)
+    fs.halka_arzlar_doldur(n, bugun)
+    saglayici = ReplayProvider(seed=0, gun_sayisi=30, simdi=datetime.now(TR_TZ))
+    return main, SahteSite(max(n, 20), bugun), fs, saglayici
+
+
+def _main_calistir(ctx):
+    import fiyat_saglayici
+    main, site, fs, saglayici = ctx
+    onceki = fiyat_saglayici._provider
+    fiyat_saglayici.set_provider(saglayici)
+    try:
+        with yamala(main, safe_get=site.safe_get, fs_get=fs.fs_get, fs_set=fs.fs_set,
+                    fs_delete=fs.fs_delete, fs_collection=fs.fs_collection,
+                    send_fcm=lambda *a, **k: True):
+            main.main()
+    finally:
+        fiyat_saglayici.set_provider(onceki)
+
+
+SENARYOLAR = {
+    "scrape_first_20": (_scrape_hazirla, _scrape_calistir),
+    "fetch_all_details": (_detay_hazirla, _detay_calistir),
+    "merge_scraped_data": (_merge_hazirla, _merge_calistir),
+    "tavan_taban": (_tt_hazirla, _tt_calistir),
+    "main": (_main_hazirla, _main_calistir),
+}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ÖLÇÜM
+# ═══════════════════════════════════════════════════════════════════
+def olc(ad, n, tekrar):
+    hazirla, calistir = SENARYOLAR[ad]
+    sureler = []
+    sessiz = io.StringIO()
+    for _ in range(tekrar):
+        with contextlib.redirect_stdout(sessiz):
+            ctx = hazirla(n)
+            gc.collect()
+            t0 = time.perf_counter()
+            calistir(ctx)
+            sureler.append(time.perf_counter() - t0)
+        sessiz.seek(0)
+        sessiz.truncate()
+    return {"n": n, "tekrar": tekrar, "min_s": round(min(sureler), 4),
+            "medyan_s": round(statistics.median(sureler), 4)}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "bilinmiyor"
+
+
+def _onceki_sonuc(haric):
+    dosyalar = sorted(f for f in glob.glob(os.path.join(SONUC_DIZINI, "*.json")) if f != haric)
+    return dosyalar[-1] if dosyalar else None
+
+
+def karsilastir(yeni, eski_yolu, esik):
+    with open(eski_yolu, "r", encoding="utf-8") as f:
+        eski = json.load(f)
+    print(f"\nKarşılaştırma: {os.path.basename(eski_yolu)} ({eski.get('commit')}) → {yeni['commit']}")
+    gerileme = []
+    for anahtar, s in yeni["sonuclar"].items():
+        o = eski.get("sonuclar", {}).get(anahtar)
+        if not o:
+            continue
+        degisim = (s["min_s"] - o["min_s"]) / o["min_s"] * 100 if o["min_s"] else 0.0
+        isaret = "✗" if degisim > esik else " "
+        print(f"  [{isaret}] {anahtar:<26} {o['min_s']:>9.4f} → {s['min_s']:>9.4f} sn  ({degisim:+.1f}%)")
+        if degisim > esik:
+            gerileme.append(anahtar)
+    return gerileme
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ağsız uçtan uca benchmark")
+    parser.add_argument("--boyutlar", default="20,200,2000", help="Halka arz sayıları (virgülle)")
+    parser.add_argument("--tekrar", type=int, default=3, help="Senaryo başına tekrar (en iyisi raporlanır)")
+    parser.add_argument("--sadece", help="Sadece bu senaryolar (virgülle)")
+    parser.add_argument("--karsilastir", help="Karşılaştırılacak sonuç dosyası (varsayılan: en son)")
+    parser.add_argument("--esik", type=float, default=20.0, help="Gerileme eşiği (%%); aşılırsa çıkış kodu 1")
+    parser.add_argument("--kaydetme", action="store_true", help="Sonucu dosyaya yazma")
+    args = parser.parse_args(argv)
+
+    boyutlar = [int(b) for b in args.boyutlar.split(",")]
+    adlar = args.sadece.split(",") if args.sadece else list(SENARYOLAR)
+
+    sonuclar = {}
+    for ad in adlar:
+        for n in boyutlar:
+            s = olc(ad, n, args.tekrar)
+            sonuclar[f"{ad}@{n}"] = s
+            print(f"  {ad:<20} n={n:<5} min {s['min_s']:>9.4f} sn | medyan {s['medyan_s']:>9.4f} sn")
+
+    rapor = {
+        "commit": _commit(),
+        "tarih": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sonuclar": sonuclar,
+    }
+    yol = None
+    if not args.kaydetme:
+        os.makedirs(SONUC_DIZINI, exist_ok=True)
+        yol = os.path.join(SONUC_DIZINI, f"{datetime.now():%Y%m%d-%H%M%S}_{rapor['commit']}.json")
+        with open(yol, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"\n[✓] Sonuçlar: {yol}")
+
+    eski = args.karsilastir or _onceki_sonuc(yol)
+    if eski and karsilastir(rapor, eski, args.esik):
+        print(f"\n[HATA] %{args.esik:g} üzeri gerileme var.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bildirim Konuları — Hisse ve Olay Bazlı FCM Hedefleme
+======================================================
+Her mesaj tek "halka_arz" konusuna gidiyordu: her kurulum her hissenin her
+tavan/taban bildirimini alıyor, uygulama istemeseydi de FCM kotası ve pil
+harcanıyordu. Artık mesaj bir FCM koşul ifadesiyle ilgili konulara gider:
+
+  ticker_{KOD}      hisseyi takip eden (portföyünde tutan) cihazlar
+  event_{olay}      o olay türünün tamamına abone cihazlar (OLAY_KONULARI)
+  halka_arz         eski uygulama sürümleri — her koşula VEYA ile eklenir
+
+  'event_tavan' in topics || 'ticker_ABCDE' in topics || 'halka_arz' in topics
+
+FCM cihaz başına tek teslim yapar; birden çok konuya uyan cihaz mesajı bir kez
+alır. Koşulda en fazla MAKS_KONU konu olabilir: sığmazsa önce hisse konuları
+düşer (olay konusu aboneleri yine alır).
+
+Yönlendirme tablosu çalıştırma başına bir kez kurulur (rota_tablosu): mesaj
+kimliği → koşul; aynı tür/hisse birleşimi için ifade tekrar üretilmez.
+HALKARZ_FCM_HEDEF=yayin ile eski davranış (sadece halka_arz konusu). Konulara
+geçen uygulama sürümü halka_arz aboneliğini bıraktığından, o sürüm yayıldıktan
+sonra yayin moduna dönülmemelidir.
+"""
+
+import os
+import re
+
+YAYIN = "halka_arz"
+MAKS_KONU = 5  # FCM koşul ifadesindeki en fazla konu sayısı
+
+OLAY_KONULARI = {
+    "tavan_yapti": "event_tavan",
+    "tavan_bozdu": "event_tavan",
+    "taban_yapti": "event_taban",
+    "taban_bozdu": "event_taban",
+    "yeni_arz": "event_yeni_arz",
+    "durum_degisim": "event_talep",
+    "sure_bitiyor": "event_sure",
+    "islem_basladi": "event_islem",
+}
+
+_GECERSIZ = re.compile(r"[^A-Za-z0-9_.~%-]")  # FCM konu adı: [a-zA-Z0-9-_.~%]+
+
+
+def hedefli() -> bool:
+    return os.environ.get("HALKARZ_FCM_HEDEF", "konu").lower() != "yayin"
+
+
+def hisse_konusu(kod: str) -> str:
+    return f"ticker_{_GECERSIZ.sub('', kod.upper())}"
+
+
+def _liste(deger) -> list:
+    return [p for p in str(deger or "").split(",") if p]
+
+
+def konular(veri: dict) -> list:
+    """Mesaj verisi (type/types, ticker/tickers) → konu listesi; YAYIN her zaman sonda."""
+    olaylar = []
+    for tur in _liste(veri.get("types")) or _liste(veri.get("type")):
+        konu = OLAY_KONULARI.get(tur)
+        if konu and konu not in olaylar:
+            olaylar.append(konu)
+    hisseler = [hisse_konusu(k) for k in _liste(veri.get("ticker")) or _liste(veri.get("tickers"))]
+    if len(olaylar) + len(hisseler) + 1 > MAKS_KONU:
+        hisseler = []
+    return (olaylar + hisseler)[:MAKS_KONU - 1] + [YAYIN]
+
+
+def kosul(konular_: list) -> str:
+    return " || ".join(f"'{k}' in topics" for k in konular_)
+
+
+def rota_tablosu(mesajlar) -> dict:
+    """{mesaj kimliği: koşul ifadesi}; hedefleme kapalıysa boş (gönderici YAYIN'a yollar)."""
+    if not hedefli():
+        return {}
+    ifadeler, tablo = {}, {}
+    for m in mesajlar:
+        v = m.veri or {}
+        anahtar = (v.get("types") or v.get("type"), v.get("ticker") or v.get("tickers"))
+        if anahtar not in ifadeler:
+            ifadeler[anahtar] = kosul(konular(v))
+        tablo[m.kimlik] = ifadeler[anahtar]
+    return tablo
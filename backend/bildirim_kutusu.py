@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Bildirim Giden Kutusu — Birleştirme, Tekilleştirme, Toplu Gönderim
+==================================================================
+main.py her yeni arz için ayrı, price_tracker.check_tavan_taban ve
+price_checker.process_islem_gorenler aynı hisse için arka arkaya ("Taban Bozdu"
++ "Tavan Yaptı") FCM çağrısı yapıyordu; her çağrı token alıp tek tek,
+engelleyerek POST ediyordu.
+
+Çalıştırma boyunca olaylar kutuya atılır, sonda tek seferde gönderilir:
+
+  kutu = BildirimKutusu(send_fcm, state=state)
+  kutu.ekle("yeni_arz", "🆕 Yeni Halka Arz!", f"{adi} — ₺{fiyat}", kod=kod,
+            anahtar=f"yeni_arz_{kod}", deger=bugun.isoformat(), ozet="🆕 {n} Yeni Halka Arz!")
+  kutu.ekle("tavan_yapti", "🚀 Tavan Yaptı!", f"{adi} tavan yaptı! ...", kod=kod)
+  kutu.gonder()                     # → gönderilen mesaj sayısı
+
+  - Tekilleştirme: anahtar state'te varsa (daha önce gönderilmiş) ya da aynı
+    olay bu çalıştırmada zaten kutudaysa olay atılır. anahtar state'e ancak
+    mesaj teslim edilince yazılır; gönderilemeyen bildirim sonraki
+    çalıştırmada yeniden denenir.
+  - Çalıştırma özeti: ozet verilmiş aynı türden ≥ 2 olay tek mesaj olur
+    (başlık ozet.format(n=...), gövde satır satır, en fazla OZET_SATIR satır).
+  - Hisse birleştirme: kalan olaylardan aynı koda ait birden çoksa tek mesaj
+    ("📈 Taban Bozdu! → 🚀 Tavan Yaptı!"); veri son olayınki, "types" hepsi.
+  - Gönderim: gonderici toplu() sunuyorsa (fcm_gonderici.FcmGonderici)
+    mesajlar tek çağrıda ona verilir — eşzamanlılık, hız sınırı ve yeniden
+    deneme orada. Düz fonksiyon göndericide mesajlar süreç boyunca açık
+    PARALEL iş parçacıklı havuzda eşzamanlı; başarısız olan DENEME kez, üstel
+    bekleme + rastgele sapmayla yeniden denenir. Her mesaj
+    islem_gunlugu.yap("fcm:<kimlik>") ile günlüğe girer (devralınan
+    çalıştırmada gönderilmiş olanlar atlanır); tek olaylı mesajın kimliği
+    olayınkiyle aynıdır ("fcm:yeni_arz:KOD").
+  - Hedef: gönderimden önce bildirim_konulari.rota_tablosu ile her mesajın FCM
+    koşulu bir kez hesaplanır; gonderici(baslik, govde, veri, kosul=...) alır.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import bildirim_konulari
+import islem_gunlugu
+
+PARALEL = 4
+DENEME = 3
+BEKLEME_SN = 1.0   # İlk yeniden deneme beklemesi; her denemede iki katı
+OZET_SATIR = 8     # Özet mesajında gösterilen en fazla olay
+
+Olay = namedtuple("Olay", "kimlik tur baslik govde veri kod anahtar deger ozet")
+Mesaj = namedtuple("Mesaj", "kimlik baslik govde veri olaylar")
+
+_havuzlar = {}  # paralel → ThreadPoolExecutor; daemon turları her gönderimde iş parçacığı açmasın
+_havuz_kilit = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GÖNDERİM
+# ═══════════════════════════════════════════════════════════════════
+def _havuz(paralel) -> ThreadPoolExecutor:
+    with _havuz_kilit:
+        havuz = _havuzlar.get(paralel)
+        if havuz is None:
+            havuz = _havuzlar[paralel] = ThreadPoolExecutor(max_workers=paralel, thread_name_prefix="fcm")
+        return havuz
+
+
+def _dene(gonderici, mesaj, kosul, deneme, bekleme, uyu) -> bool:
+    ek = {"kosul": kosul} if kosul else {}
+    for i in range(deneme):
+        try:
+            if gonderici(mesaj.baslik, mesaj.govde, mesaj.veri, **ek):
+                return True
+        except Exception as e:
+            print(f"  [UYARI] Bildirim gönderilemedi ({mesaj.kimlik}): {e}")
+        if i + 1 < deneme:
+            uyu(bekleme * 2 ** i * random.uniform(0.5, 1.5))
+    print(f"  [HATA] Bildirim {deneme} denemede gönderilemedi: {mesaj.baslik}")
+    return False
+
+
+def _toplu_gonder(gonderici, mesajlar, rota) -> list:
+    bekleyen = [m for m in mesajlar if not islem_gunlugu.tamam_mi(f"fcm:{m.kimlik}")]
+    sonuclar = gonderici.toplu([(m.baslik, m.govde, m.veri, rota.get(m.kimlik)) for m in bekleyen])
+    basarili = {m.kimlik: s.basarili for m, s in zip(bekleyen, sonuclar)}
+    # Günlük: gönderilmiş olanlar "tamam", devralınan çalıştırmada tamamlanmışlar atlanır
+    return [bool(islem_gunlugu.yap(f"fcm:{m.kimlik}", basarili.get, m.kimlik)) for m in mesajlar]
+
+
+def gonder_hepsi(gonderici, mesajlar, paralel=PARALEL, deneme=DENEME, bekleme=BEKLEME_SN, uyu=time.sleep) -> list:
+    """Mesajları eşzamanlı gönderir (konu yönlendirmeli, yeniden denemeli, günlüklü). Dönüş: mesaj başına bool."""
+    if not mesajlar:
+        return []
+    rota = bildirim_konulari.rota_tablosu(mesajlar)
+    if hasattr(gonderici, "toplu"):
+        return _toplu_gonder(gonderici, mesajlar, rota)
+
+    def teslim(m):
+        return bool(islem_gunlugu.yap(f"fcm:{m.kimlik}", _dene, gonderici, m, rota.get(m.kimlik),
+                                      deneme, bekleme, uyu))
+
+    if paralel <= 1 or len(mesajlar) == 1:
+        return [teslim(m) for m in mesajlar]
+    return list(_havuz(paralel).map(teslim, mesajlar))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# KUTU
+# ═══════════════════════════════════════════════════════════════════
+class BildirimKutusu:
+    """Bir çalıştırmanın bildirim olayları; gonder() ile birleştirilip gönderilir."""
+
+    def __init__(self, gonderici, state=None, paralel=PARALEL, deneme=DENEME, bekleme=BEKLEME_SN, uyu=time.sleep):
+        """gonderici(baslik, govde, veri, kosul=None) → bool (send_fcm). state: tekilleştirme deposu (dict / DurumDeposu)."""
+        self.gonderici = gonderici
+        self.state = state
+        self.paralel, self.deneme, self.bekleme, self.uyu = paralel, deneme, bekleme, uyu
+        self._olaylar: dict[str, Olay] = {}
+
+    def __len__(self) -> int:
+        return len(self._olaylar)
+
+    def ekle(self, tur, baslik, govde, veri=None, kod=None, anahtar=None, deger=True, ozet=None, kimlik=None) -> bool:
+        """
+        Olayı kutuya atar. anahtar state'te varsa ya da olay zaten kutudaysa False.
+        anahtar/deger: teslimde state'e yazılır. ozet: çalıştırma özeti başlığı ("{n}" yer tutuculu).
+        """
+        if anahtar is not None and self.state is not None and anahtar in self.state:
+            return False
+        kimlik = kimlik or (f"{tur}:{kod}" if kod else tur)
+        if kimlik in self._olaylar:
+            return False
+        veri = {"type": tur, **({"ticker": kod} if kod else {}), **(veri or {})}
+        self._olaylar[kimlik] = Olay(kimlik, tur, baslik, govde, veri, kod, anahtar, deger, ozet)
+        return True
+
+    def mesajlar(self) -> list:
+        """Kutudaki olaylar → birleştirilmiş mesajlar (özetler önce, sonra ilk görülme sırasıyla)."""
+        olaylar = list(self._olaylar.values())
+        turler = {}
+        for o in olaylar:
+            if o.ozet:
+                turler.setdefault(o.tur, []).append(o)
+
+        sonuc, ozetlenen = [], set()
+        for tur, grup in turler.items():
+            if len(grup) < 2:
+                continue
+            ozetlenen.update(o.kimlik for o in grup)
+            satirlar = [o.govde for o in grup[:OZET_SATIR]]
+            if len(grup) > OZET_SATIR:
+                satirlar.append(f"… ve {len(grup) - OZET_SATIR} tane daha")
+            kodlar = [o.kod for o in grup if o.kod]
+            sonuc.append(Mesaj(f"{tur}:{'+'.join(kodlar) or len(grup)}", grup[0].ozet.format(n=len(grup)),
+                               "\n".join(satirlar), {"type": tur, "tickers": ",".join(kodlar)}, grup))
+
+        hisseler = {}
+        for o in olaylar:
+            if o.kimlik not in ozetlenen:
+                hisseler.setdefault(o.kod or o.kimlik, []).append(o)
+        for grup in hisseler.values():
+            if len(grup) == 1:
+                o = grup[0]
+                sonuc.append(Mesaj(o.kimlik, o.baslik, o.govde, o.veri, grup))
+                continue
+            son = grup[-1]
+            tipler = [o.tur for o in grup]
+            sonuc.append(Mesaj(f"{'+'.join(tipler)}:{son.kod}", " → ".join(o.baslik for o in grup),
+                               "\n".join(o.govde for o in grup), {**son.veri, "types": ",".join(tipler)}, grup))
+        return sonuc
+
+    def gonder(self) -> int:
+        """Kutuyu boşaltır: mesajları eşzamanlı gönderir, teslim edilenlerin anahtarlarını state'e yazar."""
+        if not self._olaylar:
+            return 0
+        mesajlar = self.mesajlar()
+        olay_sayisi = len(self._olaylar)
+        self._olaylar = {}
+        sonuclar = gonder_hepsi(self.gonderici, mesajlar, self.paralel, self.deneme, self.bekleme, self.uyu)
+        for m, ok in zip(mesajlar, sonuclar):
+            if ok and self.state is not None:
+                for o in m.olaylar:
+                    if o.anahtar is not None:
+                        self.state[o.anahtar] = o.deger
+        gonderilen = sum(sonuclar)
+        print(f"[BİLGİ] Bildirim: {olay_sayisi} olay → {len(mesajlar)} mesaj, {gonderilen} gönderildi.")
+        return gonderilen
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Borsa İstanbul İşlem Takvimi
+=============================
+Pay piyasasının tatil günleri, yarım günleri (arife) ve seans saatleri.
+
+Tablo import anında bir kez hesaplanır; sorgular O(1) dict aramasıdır.
+Dini bayram tarihleri Diyanet takviminden alınmıştır ve her yıl
+_DINI_BAYRAMLAR'a yeni yıl eklenmelidir. Tablonun kapsamadığı yıllarda
+sadece hafta sonu kuralı uygulanır.
+
+Kullanım:
+  from bist_takvimi import islem_gunu_mu, seans, onceki_islem_gunu
+  seans(date(2026, 3, 19))  → (09:30, 12:40)  # Ramazan Bayramı arifesi
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+# TR saat dilimi (UTC+3)
+TR_TZ = timezone(timedelta(hours=3))
+
+# Seans saatleri (TR)
+BORSA_ACILIS = (9, 30)         # 09:30
+BORSA_KAPANIS = (18, 10)       # 18:10
+YARIM_GUN_KAPANIS = (12, 40)   # Arife günleri 12:30 + kapanış seansı
+
+# Her yıl aynı gün kapalı olan resmi tatiller
+_SABIT_TATILLER = {
+    (1, 1): "Yılbaşı",
+    (4, 23): "Ulusal Egemenlik ve Çocuk Bayramı",
+    (5, 1): "Emek ve Dayanışma Günü",
+    (5, 19): "Atatürk'ü Anma, Gençlik ve Spor Bayramı",
+    (7, 15): "Demokrasi ve Milli Birlik Günü",
+    (8, 30): "Zafer Bayramı",
+    (10, 29): "Cumhuriyet Bayramı",
+}
+_SABIT_YARIM_GUNLER = {
+    (10, 28): "Cumhuriyet Bayramı Arifesi",
+}
+
+# (bayram adı, ilk gün, gün sayısı) — arife = ilk günden bir önceki gün (yarım gün)
+_DINI_BAYRAMLAR = {
+    2024: [("Ramazan Bayramı", date(2024, 4, 10), 3), ("Kurban Bayramı", date(2024, 6, 16), 4)],
+    2025: [("Ramazan Bayramı", date(2025, 3, 30), 3), ("Kurban Bayramı", date(2025, 6, 6), 4)],
+    2026: [("Ramazan Bayramı", date(2026, 3, 20), 3), ("Kurban Bayramı", date(2026, 5, 27), 4)],
+    2027: [("Ramazan Bayramı", date(2027, 3, 9), 3), ("Kurban Bayramı", date(2027, 5, 16), 4)],
+    2028: [("Ramazan Bayramı", date(2028, 2, 26), 3), ("Kurban Bayramı", date(2028, 5, 5), 4)],
+}
+
+KAPSANAN_YILLAR = tuple(sorted(_DINI_BAYRAMLAR))
+
+
+def _tablo_olustur():
+    tatiller, yarim_gunler = {}, {}
+    for yil in KAPSANAN_YILLAR:
+        for (ay, gun), ad in _SABIT_TATILLER.items():
+            tatiller[date(yil, ay, gun)] = ad
+        for (ay, gun), ad in _SABIT_YARIM_GUNLER.items():
+            yarim_gunler[date(yil, ay, gun)] = ad
+        for ad, ilk_gun, gun_sayisi in _DINI_BAYRAMLAR[yil]:
+            yarim_gunler[ilk_gun - timedelta(days=1)] = f"{ad} Arifesi"
+            for i in range(gun_sayisi):
+                tatiller[ilk_gun + timedelta(days=i)] = ad
+    # Tatile denk gelen arife tam gün kapalıdır
+    for gun in tatiller:
+        yarim_gunler.pop(gun, None)
+    return tatiller, yarim_gunler
+
+
+TATILLER, YARIM_GUNLER = _tablo_olustur()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SORGULAR
+# ═══════════════════════════════════════════════════════════════════
+def _gun(g) -> date:
+    return g.date() if isinstance(g, datetime) else g
+
+
+def tatil_adi(gun) -> Optional[str]:
+    """Gün kapalıysa nedenini döner (hafta sonu dahil), açıksa None."""
+    gun = _gun(gun)
+    if gun in TATILLER:
+        return TATILLER[gun]
+    if gun.weekday() >= 5:
+        return "Hafta sonu"
+    return None
+
+
+def islem_gunu_mu(gun) -> bool:
+    return tatil_adi(gun) is None
+
+
+def yarim_gun_mu(gun) -> bool:
+    return _gun(gun) in YARIM_GUNLER
+
+
+def seans(gun) -> Optional[tuple[datetime, datetime]]:
+    """Günün (açılış, kapanış) zamanları, TR saatiyle. Kapalı günde None."""
+    gun = _gun(gun)
+    if not islem_gunu_mu(gun):
+        return None
+    kapanis = YARIM_GUN_KAPANIS if gun in YARIM_GUNLER else BORSA_KAPANIS
+    return (
+        datetime.combine(gun, time(*BORSA_ACILIS), tzinfo=TR_TZ),
+        datetime.combine(gun, time(*kapanis), tzinfo=TR_TZ),
+    )
+
+
+def seans_acilis(gun) -> Optional[datetime]:
+    s = seans(gun)
+    return s[0] if s else None
+
+
+def seans_kapanis(gun) -> Optional[datetime]:
+    s = seans(gun)
+    return s[1] if s else None
+
+
+def sonraki_islem_gunu(gun) -> date:
+    """gun'den SONRAKİ ilk işlem günü."""
+    gun = _gun(gun) + timedelta(days=1)
+    while not islem_gunu_mu(gun):
+        gun += timedelta(days=1)
+    return gun
+
+
+def onceki_islem_gunu(gun) -> date:
+    """gun'den ÖNCEKİ son işlem günü."""
+    gun = _gun(gun) - timedelta(days=1)
+    while not islem_gunu_mu(gun):
+        gun -= timedelta(days=1)
+    return gun
+
+
+def islem_gunleri(baslangic, bitis) -> list[date]:
+    """[baslangic, bitis] aralığındaki işlem günleri (iki uç dahil)."""
+    gun, bitis = _gun(baslangic), _gun(bitis)
+    sonuc = []
+    while gun <= bitis:
+        if islem_gunu_mu(gun):
+            sonuc.append(gun)
+        gun += timedelta(days=1)
+    return sonuc
+
+
+def borsa_acik_mi(an: Optional[datetime] = None) -> bool:
+    """Verilen anda (varsayılan: şimdi) seans açık mı?"""
+    an = an or datetime.now(TR_TZ)
+    if an.tzinfo is None:
+        an = an.replace(tzinfo=TR_TZ)
+    s = seans(an.astimezone(TR_TZ))
+    return bool(s) and s[0] <= an <= s[1]
+
+
+def son_kapanis_gunu(an: Optional[datetime] = None) -> date:
+    """Seansı kapanmış en son işlem günü (= Yahoo'daki son kesin kapanış)."""
+    an = an or datetime.now(TR_TZ)
+    if an.tzinfo is None:
+        an = an.replace(tzinfo=TR_TZ)
+    an = an.astimezone(TR_TZ)
+    kapanis = seans_kapanis(an)
+    if kapanis and an >= kapanis:
+        return an.date()
+    return onceki_islem_gunu(an)
+
+
+if __name__ == "__main__":
+    bugun = datetime.now(TR_TZ).date()
+    print(f"Bugün: {bugun} | {'işlem günü' if islem_gunu_mu(bugun) else tatil_adi(bugun)}")
+    s = seans(bugun)
+    if s:
+        print(f"Seans: {s[0]:%H:%M}–{s[1]:%H:%M}{' (yarım gün)' if yarim_gun_mu(bugun) else ''}")
+    print(f"Önceki işlem günü: {onceki_islem_gunu(bugun)} | Sonraki: {sonraki_islem_gunu(bugun)}")
+    print(f"Kapsanan yıllar: {KAPSANAN_YILLAR[0]}–{KAPSANAN_YILLAR[-1]}")
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Dayanıklı HTTP — Sınıflandırılmış Yeniden Deneme, Devre Kesici, Gecikme Histogramı
+==================================================================================
+Kazıyıcıların safe_get'i ilk hatada None dönüyor, main.fetch_detail de bunu
+varsayılan değerlerle (arz_fiyati 0.0) dolduruyordu: tek bir zaman aşımı
+Firestore'a bozuk doküman yazdırıyordu. safe_get/safe_request http_kaset.get'i
+artık buradan çağırır; Yahoo çağrıları (fiyat_saglayici) cagir() ile sarılır:
+
+  r = dayanikli_http.getir(url, headers=HEADERS, timeout=15)   # → Response ya da RequestException
+  df = dayanikli_http.cagir(dayanikli_http.YAHOO, yf.download, semboller, ...)
+
+  - Sınıflandırma: bağlantı hatası (baglanti), okuma zaman aşımı / yarım gövde
+    (okuma), 5xx (sunucu) ve 429 (kota) yeniden denenir; diğer 4xx ve
+    sınıflanamayan istisnalar denenmez. requests dışı istisnalar (curl_cffi,
+    yfinance) sınıf adından sınıflanır: …RateLimit…, …Timeout…, …Connection…/Curl….
+    Hatayı sonuçta bildiren çağrılar (yf.download boş tablo döner) için
+    cagir(dogrula=...) sonucu sınıflar.
+  - Bekleme: en fazla DENEME deneme; i. yeniden denemeden önce
+    [0, BEKLEME_SN · 2^i] aralığında rastgele (tam sapmalı üstel bekleme),
+    429'da Retry-After varsa o kadar; hepsi en fazla MAKS_BEKLEME_SN.
+    Bekleme http_kaset.bekle ile yapılır (tekrar modunda atlanır).
+  - Devre kesici (host başına): art arda ESIK başarısız denemede açılır;
+    SOGUMA_SN boyunca o hosta istek gitmez, DevreAcik (requests.ConnectionError)
+    hemen fırlar. Süre dolunca yarı açık: tek sonda isteği geçer; başarılıysa
+    devre kapanır, değilse yeniden açılır. 4xx yanıtı host sağlığını bozmaz.
+  - Ölçüm: host başına deneme gecikmesi histogramı (KOVALAR, ms), yeniden
+    deneme / hata sınıfı / kesilen istek sayıları; olcum raporuna
+    "dayaniklilik" bölümü olarak eklenir.
+
+Yeniden denemeler tükenince getir() son hatayı fırlatır ya da son 5xx/429
+yanıtını döner; çağıranın raise_for_status'u ve except RequestException'ı
+olduğu gibi çalışır. HALKARZ_HTTP_MODE=replay'de getir() doğrudan
+http_kaset.get'tir (kasette olmayan URL'yi yeniden denemenin anlamı yok).
+"""
+
+import bisect
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+import http_kaset
+import olcum
+
+DENEME = 3
+BEKLEME_SN = 1.0        # İlk yeniden deneme beklemesinin üst sınırı; her denemede iki katı
+MAKS_BEKLEME_SN = 30.0
+ESIK = 5                # Art arda bu kadar başarısız deneme → devre açılır
+SOGUMA_SN = 120.0       # Açık devrenin sonda isteğine izin vermeden önce beklediği süre
+KOVALAR = (50, 100, 250, 500, 1000, 2500, 5000, 10000)  # ms üst sınırları; sonrası "+∞" kovası
+YAHOO = "query1.finance.yahoo.com"  # yfinance çağrılarının devre/histogram anahtarı
+
+BAGLANTI, OKUMA, SUNUCU, KOTA = "baglanti", "okuma", "sunucu", "kota"
+
+
+class DevreAcik(requests.ConnectionError):
+    """Hostun devresi açık: istek yapılmadan reddedildi."""
+
+
+def retry_after(deger) -> float:
+    """Retry-After başlığı (saniye ya da HTTP tarihi) → saniye; yoksa/bozuksa 0."""
+    if not deger:
+        return 0.0
+    try:
+        return max(float(deger), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(deger).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def sinifla(hata=None, durum=None):
+    """İstisna ya da HTTP durum kodu → yeniden denenecek hata sınıfı; denenmeyecekse None."""
+    if hata is None:
+        if durum == 429:
+            return KOTA
+        if durum is not None and durum >= 500:
+            return SUNUCU
+        return None
+    if isinstance(hata, DevreAcik):
+        return None
+    if isinstance(hata, requests.ConnectTimeout):  # Hem ConnectionError hem Timeout
+        return BAGLANTI
+    if isinstance(hata, (requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return OKUMA
+    if isinstance(hata, requests.ConnectionError):
+        return BAGLANTI
+    if isinstance(hata, requests.RequestException):
+        return None
+    return metin_sinifla(" ".join(t.__name__ for t in type(hata).__mro__))
+
+
+def metin_sinifla(metin: str):
+    """Hata sınıf adı ya da kayıtlı hata metni (yfinance) → hata sınıfı; tanınmıyorsa None."""
+    metin = metin.lower()
+    if "ratelimit" in metin or "rate limit" in metin or "too many requests" in metin:
+        return KOTA
+    if "timeout" in metin or "timed out" in metin:
+        return OKUMA
+    if "connection" in metin or "curl" in metin or "dnserror" in metin or "resolve host" in metin:
+        return BAGLANTI
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HISTOGRAM VE DEVRE
+# ═══════════════════════════════════════════════════════════════════
+class Histogram:
+    """Sabit kovalı gecikme histogramı (ms)."""
+
+    def __init__(self, kovalar=KOVALAR):
+        self.kovalar = kovalar
+        self.sayilar = [0] * (len(kovalar) + 1)
+        self.adet = 0
+        self.toplam_ms = 0.0
+        self.maks_ms = 0.0
+
+    def ekle(self, ms: float):
+        self.sayilar[bisect.bisect_left(self.kovalar, ms)] += 1
+        self.adet += 1
+        self.toplam_ms += ms
+        self.maks_ms = max(self.maks_ms, ms)
+
+    def yuzdelik(self, p: float) -> float:
+        """p. yüzdelik: düştüğü kovanın üst sınırı (gözlenen en büyük değeri aşmaz)."""
+        if not self.adet:
+            return 0.0
+        hedef, birikimli = p / 100 * self.adet, 0
+        for i, n in enumerate(self.sayilar):
+            birikimli += n
+            if birikimli >= hedef:
+                return min(float(self.kovalar[i]), self.maks_ms) if i < len(self.kovalar) else self.maks_ms
+        return self.maks_ms
+
+    def kovalar_sozluk(self) -> dict:
+        etiketler = [f"≤{k}" for k in self.kovalar] + [f">{self.kovalar[-1]}"]
+        return {e: n for e, n in zip(etiketler, self.sayilar) if n}
+
+
+class Devre:
+    """kapali → (ESIK ardışık hata) → acik → (SOGUMA_SN) → yari_acik → (sonda) kapali | acik."""
+
+    def __init__(self, esik=ESIK, soguma=SOGUMA_SN, saat=time.monotonic):
+        self.esik, self.soguma, self.saat = esik, soguma, saat
+        self.durum = "kapali"
+        self.ardisik = 0
+        self.acilma = 0
+        self._acildi = 0.0
+        self._sonda = False
+        self._kilit = threading.Lock()
+
+    def izin(self) -> bool:
+        with self._kilit:
+            if self.durum == "kapali":
+                return True
+            if self.durum == "acik" and self.saat() - self._acildi >= self.soguma:
+                self.durum, self._sonda = "yari_acik", False
+            if self.durum == "yari_acik" and not self._sonda:
+                self._sonda = True
+                return True
+            return False
+
+    def basarili(self):
+        with self._kilit:
+            self.durum, self.ardisik, self._sonda = "kapali", 0, False
+
+    def birak(self):
+        """Host sağlığı hakkında bilgi vermeyen sonuç: sonda hakkı geri verilir."""
+        with self._kilit:
+            self._sonda = False
+
+    def basarisiz(self) -> bool:
+        """Başarısız denemeyi sayar; devre bu denemeyle açıldıysa True."""
+        with self._kilit:
+            self.ardisik += 1
+            if self.durum == "yari_acik" or (self.durum == "kapali" and self.ardisik >= self.esik):
+                self.durum, self._acildi, self._sonda = "acik", self.saat(), False
+                self.acilma += 1
+                return True
+            return False
+
+
+class _Host:
+    def __init__(self):
+        self.devre = Devre()
+        self.gecikme = Histogram()
+        self.yeniden = self.basarisiz = self.kesilen = 0
+        self.hatalar: dict[str, int] = {}
+        self.kilit = threading.Lock()
+
+    def ozet(self) -> dict:
+        g = self.gecikme
+        return {
+            "deneme": g.adet, "yeniden": self.yeniden, "basarisiz": self.basarisiz, "kesilen": self.kesilen,
+            "hatalar": dict(self.hatalar), "devre": self.devre.durum, "devre_acilma": self.devre.acilma,
+            "ort_ms": round(g.toplam_ms / g.adet, 1) if g.adet else 0.0,
+            "p50_ms": round(g.yuzdelik(50), 1), "p95_ms": round(g.yuzdelik(95), 1), "maks_ms": round(g.maks_ms, 1),
+            "histogram": g.kovalar_sozluk(),
+        }
+
+
+_hostlar: dict[str, _Host] = {}
+_kilit = threading.Lock()
+
+
+def host(ad: str) -> _Host:
+    with _kilit:
+        h = _hostlar.get(ad)
+        if h is None:
+            h = _hostlar[ad] = _Host()
+        return h
+
+
+# ═══════════════════════════════════════════════════════════════════
+# YENİDEN DENEME
+# ═══════════════════════════════════════════════════════════════════
+def _calistir(ad, fn, etiket, deneme, uyu, dogrula=None):
+    h = host(ad)
+    sonuc = hata = None
+    for i in range(deneme):
+        if not h.devre.izin():
+            with h.kilit:
+                h.kesilen += 1
+            raise DevreAcik(f"{ad} devresi açık, istek yapılmadı: {etiket}")
+        t0 = time.perf_counter()
+        sonuc = hata = None
+        try:
+            sonuc = fn()
+        except Exception as e:
+            hata = e
+        ms = (time.perf_counter() - t0) * 1000
+        if hata is not None:
+            sinif = sinifla(hata=hata)
+        else:
+            sinif = sinifla(durum=getattr(sonuc, "status_code", None)) or (dogrula(sonuc) if dogrula else None)
+        with h.kilit:
+            h.gecikme.ekle(ms)
+            if sinif:
+                h.hatalar[sinif] = h.hatalar.get(sinif, 0) + 1
+        if sinif is None:
+            if hata is None:
+                h.devre.basarili()
+                return sonuc
+            h.devre.birak()
+            raise hata
+        if h.devre.basarisiz():
+            print(f"  [UYARI] {ad} devresi açıldı ({h.devre.ardisik} ardışık hata); "
+                  f"{h.devre.soguma:.0f} sn istek gönderilmeyecek.")
+            break
+        if i + 1 >= deneme:
+            break
+        bekle = retry_after(sonuc.headers.get("Retry-After")) if sinif == KOTA and sonuc is not None else 0.0
+        bekle = min(bekle or random.uniform(0, BEKLEME_SN * 2 ** i), MAKS_BEKLEME_SN)
+        if hata is not None:
+            neden = type(hata).__name__
+        else:
+            neden = f"HTTP {sonuc.status_code}" if hasattr(sonuc, "status_code") else "hatalı sonuç"
+        print(f"  [UYARI] {etiket}: {sinif} ({neden}), {bekle:.1f} sn sonra yeniden ({i + 2}/{deneme})")
+        with h.kilit:
+            h.yeniden += 1
+        uyu(bekle)
+    with h.kilit:
+        h.basarisiz += 1
+    if hata is not None:
+        raise hata
+    return sonuc  # Son 5xx/429 yanıtı ya da hatalı sonuç: çağıran ele alır (raise_for_status, boş tablo)
+
+
+def getir(url, headers=None, timeout=15, deneme=DENEME, uyu=None) -> requests.Response:
+    """http_kaset.get + sınıflandırılmış yeniden deneme + host devresi."""
+    if http_kaset.mod() == "replay":
+        return http_kaset.get(url, headers=headers, timeout=timeout)
+    return _calistir(urlparse(url).hostname or "?",
+                     lambda: http_kaset.get(url, headers=headers, timeout=timeout),
+                     url, deneme, uyu or http_kaset.bekle)
+
+
+def cagir(ad, fn, *args, deneme=DENEME, uyu=time.sleep, dogrula=None, **kwargs):
+    """
+    fn(*args, **kwargs)'ı ad hostunun devresi ve yeniden deneme kurallarıyla çalıştırır (yfinance vb.).
+    dogrula(sonuc) → hata sınıfı | None: hatayı istisna yerine sonuçta bildiren çağrılar için
+    (yf.download ağ hatasında boş tablo döner); sınıf dönerse deneme başarısız sayılır.
+    """
+    etiket = getattr(fn, "__qualname__", None) or type(fn).__name__
+    return _calistir(ad, lambda: fn(*args, **kwargs), etiket, deneme, uyu, dogrula)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# RAPOR
+# ═══════════════════════════════════════════════════════════════════
+def rapor() -> dict:
+    with _kilit:
+        hostlar = sorted(_hostlar.items())
+    return {ad: h.ozet() for ad, h in hostlar if h.gecikme.adet or h.kesilen}
+
+
+def _markdown(r) -> str:
+    satirlar = ["| Host | Deneme | Yeniden | Başarısız | Kesilen | p50 ms | p95 ms | Maks ms | Devre |",
+                "|---|---:|---:|---:|---:|---:|---:|---:|---|"]
+    for ad, s in r.items():
+        devre = s["devre"] + (f" ({s['devre_acilma']}× açıldı)" if s["devre_acilma"] else "")
+        satirlar.append(f"| {ad} | {s['deneme']} | {s['yeniden']} | {s['basarisiz']} | {s['kesilen']} | "
+                        f"{s['p50_ms']:.0f} | {s['p95_ms']:.0f} | {s['maks_ms']:.0f} | {devre} |")
+    return "\n".join(satirlar) + "\n"
+
+
+olcum.rapor_bolumu("dayaniklilik", rapor, _markdown)
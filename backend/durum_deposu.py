@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Bildirim Durum Deposu — Anahtar Başına Süre, Sadece Değişenleri Yazma
+======================================================================
+main.py (meta/notification_state), price_tracker.py (meta/price_tracker_state),
+price_checker.py ve scraper.py (ortak data/notification_state.json) "bu bildirim gönderildi mi"
+durumunu düz bir sözlükte tutuyordu: her çalıştırmada tamamı okunur, her
+anahtar datetime.fromisoformat ile taranıp 7 günden eskiler atılır ve doküman
+baştan yazılırdı.
+
+DurumDeposu sözlük gibi kullanılır; her anahtarın kendi son kullanma anı vardır:
+
+  state = DurumDeposu(FirestoreArkaUcu(STATE_DOC_PATH, fs_get, fs_set), ttl=7 * GUN)
+  if f"yeni_arz_{kod}" not in state:
+      state[f"yeni_arz_{kod}"] = bugun.isoformat()     # varsayılan ttl
+  state.koy(f"tt_{kod}", "tavan", ttl=None)            # süresiz
+  state.kaydet()                                        # sadece değişen/silinen anahtarlar
+
+  - Süre indeksi: (son_kullanma, anahtar) min-heap'i. temizle() sadece süresi
+    dolmuşları çıkarır — O(dolan · log n), tüm anahtarlar taranmaz. Aynı anahtar
+    yeniden yazılınca eski heap girdisi tembelce geçersiz sayılır.
+  - Okuma süre farkındadır: süresi dolmuş ama henüz atılmamış anahtar yok sayılır.
+  - kaydet() değişen anahtarları ve silinenleri arka uca verir:
+      FirestoreArkaUcu  alan düzeyinde merge PATCH (updateMask), silinen alanlar
+                        fs_kodek.SIL ile; değişiklik yoksa istek yok
+      DosyaArkaUcu      dosyada alan güncellemesi olmadığından değişiklik varsa
+                        atomik yeniden yazım (veri_dosyasi.json_yaz), yoksa dokunulmaz
+
+Kayıt biçimi (doküman alanı / JSON anahtarı başına):
+  {"deger": ..., "son_kullanma": <epoch sn> | null}
+Eski düz değerler yüklenirken çevrilir: ISO tarih/zaman ise o an + ttl, değilse
+süresiz; çevrilen anahtarlar bir kez yeni biçimde yazılır.
+"""
+
+import heapq
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+import fs_kodek
+import veri_dosyasi
+
+GUN = 24 * 3600
+_VARSAYILAN = object()  # koy(ttl=...) verilmedi → deponun ttl'si
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ARKA UÇLAR
+# ═══════════════════════════════════════════════════════════════════
+class FirestoreArkaUcu:
+    """Tek doküman; anahtarlar doküman alanları. fs_get/fs_set çağıranın modülünden verilir."""
+
+    def __init__(self, doc_path: str, fs_get, fs_set):
+        self.doc_path = doc_path
+        self.fs_get, self.fs_set = fs_get, fs_set
+
+    def oku(self) -> dict:
+        return self.fs_get(self.doc_path) or {}
+
+    def yaz(self, degisen: dict, silinen) -> bool:
+        data = {**degisen, **{k: fs_kodek.SIL for k in silinen}}
+        return self.fs_set(self.doc_path, data, merge=True)
+
+
+class DosyaArkaUcu:
+    """JSON dosyası; değişiklik olduğunda atomik olarak yeniden yazılır."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._veri = {}
+
+    def oku(self) -> dict:
+        try:
+            veri = veri_dosyasi.json_oku(self.path)
+        except (OSError, ValueError):
+            veri = {}
+        self._veri = dict(veri) if isinstance(veri, dict) else {}
+        return self._veri
+
+    def yaz(self, degisen: dict, silinen) -> bool:
+        self._veri.update(degisen)
+        for k in silinen:
+            self._veri.pop(k, None)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            veri_dosyasi.json_yaz(self.path, self._veri)
+            return True
+        except OSError as e:
+            print(f"[UYARI] Durum dosyası yazılamadı: {e}")
+            return False
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DEPO
+# ═══════════════════════════════════════════════════════════════════
+def _eski_son_kullanma(deger, ttl: Optional[float]) -> Optional[float]:
+    """Eski düz değer (gönderim zamanı) → son kullanma epoch'u; zaman değilse None (süresiz)."""
+    if ttl is None or not isinstance(deger, str):
+        return None
+    try:
+        return datetime.fromisoformat(deger).timestamp() + ttl  # "2026-01-02" → gece yarısı
+    except ValueError:
+        return None
+
+
+class DurumDeposu:
+    """Anahtar → (değer, son_kullanma) sözlüğü; süre indeksi ve kirli anahtar takibiyle."""
+
+    def __init__(self, arka_uc, ttl: Optional[float] = None, ham: Optional[dict] = None, saat=time.time):
+        """
+        ttl: varsayılan ömür (sn); None → süresiz. ham: arka uçtan önceden okunmuş
+        içerik (işlem günlüğünden devralınan); verilmezse arka_uc.oku().
+        """
+        self.arka_uc = arka_uc
+        self.ttl = ttl
+        self.saat = saat
+        self._kayitlar: dict[str, tuple[object, Optional[float]]] = {}
+        self._indeks: list[tuple[float, str]] = []
+        self._degisen: set[str] = set()
+        self._silinen: set[str] = set()
+        self._yukle(arka_uc.oku() if ham is None else ham)
+
+    def _yukle(self, ham: dict):
+        for k, v in ham.items():
+            if isinstance(v, dict) and "son_kullanma" in v:
+                sk = v["son_kullanma"]
+                self._kayitlar[k] = (v.get("deger"), float(sk) if sk is not None else None)
+            else:
+                self._kayitlar[k] = (v, _eski_son_kullanma(v, self.ttl))
+                self._degisen.add(k)  # Yeni biçimde bir kez yazılsın
+        self._indeks = [(sk, k) for k, (_, sk) in self._kayitlar.items() if sk is not None]
+        heapq.heapify(self._indeks)
+        self.temizle()
+
+    # ── Sözlük arayüzü ──
+    def _gecerli(self, anahtar):
+        kayit = self._kayitlar.get(anahtar)
+        if kayit is None or (kayit[1] is not None and kayit[1] <= self.saat()):
+            return None
+        return kayit
+
+    def __contains__(self, anahtar) -> bool:
+        return self._gecerli(anahtar) is not None
+
+    def __getitem__(self, anahtar):
+        kayit = self._gecerli(anahtar)
+        if kayit is None:
+            raise KeyError(anahtar)
+        return kayit[0]
+
+    def get(self, anahtar, varsayilan=None):
+        kayit = self._gecerli(anahtar)
+        return varsayilan if kayit is None else kayit[0]
+
+    def __setitem__(self, anahtar, deger):
+        self.koy(anahtar, deger)
+
+    def __delitem__(self, anahtar):
+        if self._kayitlar.pop(anahtar, None) is None:
+            raise KeyError(anahtar)
+        self._degisen.discard(anahtar)
+        self._silinen.add(anahtar)
+
+    def __len__(self) -> int:
+        return len(self._kayitlar)
+
+    def items(self):
+        simdi = self.saat()
+        return [(k, d) for k, (d, sk) in self._kayitlar.items() if sk is None or sk > simdi]
+
+    def koy(self, anahtar: str, deger, ttl=_VARSAYILAN):
+        """ttl verilmezse deponun ttl'si; None → süresiz. Değer ve süre aynıysa kirletmez."""
+        ttl = self.ttl if ttl is _VARSAYILAN else ttl
+        sk = self.saat() + ttl if ttl is not None else None
+        if sk is None and self._kayitlar.get(anahtar) == (deger, None):
+            return  # Süresiz ve aynı değer: yazacak bir şey yok
+        self._kayitlar[anahtar] = (deger, sk)
+        if sk is not None:
+            heapq.heappush(self._indeks, (sk, anahtar))
+        self._degisen.add(anahtar)
+        self._silinen.discard(anahtar)
+
+    # ── Süre ──
+    def temizle(self) -> int:
+        """Süresi dolan anahtarları atar (silinecek olarak işaretler). Dönüş: atılan sayısı."""
+        simdi, indeks, atilan = self.saat(), self._indeks, 0
+        while indeks and indeks[0][0] <= simdi:
+            sk, k = heapq.heappop(indeks)
+            kayit = self._kayitlar.get(k)
+            if kayit is not None and kayit[1] == sk:  # Güncel girdi (yeniden yazılmış anahtarın eskisi değil)
+                del self._kayitlar[k]
+                self._degisen.discard(k)
+                self._silinen.add(k)
+                atilan += 1
+        if len(indeks) > 2 * len(self._kayitlar) + 64:  # Geçersiz girdiler birikti: yeniden kur
+            self._indeks = [(sk, k) for k, (_, sk) in self._kayitlar.items() if sk is not None]
+            heapq.heapify(self._indeks)
+        return atilan
+
+    # ── Kalıcılık ──
+    def kirli_mi(self) -> bool:
+        return bool(self._degisen or self._silinen)
+
+    def kaydet(self) -> bool:
+        """Süresi dolanları atar, değişen/silinen anahtarları arka uca yazar. Yazacak yoksa True."""
+        self.temizle()
+        if not self.kirli_mi():
+            return True
+        degisen = {k: {"deger": self._kayitlar[k][0], "son_kullanma": self._kayitlar[k][1]}
+                   for k in self._degisen}
+        if not self.arka_uc.yaz(degisen, sorted(self._silinen)):
+            return False
+        print(f"[BİLGİ] Durum: {len(degisen)} anahtar yazıldı, {len(self._silinen)} silindi "
+              f"({len(self._kayitlar)} kayıt).")
+        self._degisen.clear()
+        self._silinen.clear()
+        return True
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+FCM Gönderici — Kalıcı Bağlantı, Hız Sınırı, Eşzamanlı Toplu Gönderim
+=====================================================================
+main.send_fcm, price_tracker.send_fcm ve price_checker.send_fcm_notification
+her mesaj için yeni bağlantı açıp (TLS el sıkışması) tek tek, 10 sn zaman
+aşımıyla POST ediyordu; 429/503'te mesaj sessizce kayboluyordu.
+
+  send_fcm = FcmGonderici(FIREBASE_PROJECT_ID, get_fcm_token)
+  send_fcm("🚀 Tavan Yaptı!", govde, {"ticker": kod})          # → bool (eski imza)
+  send_fcm.toplu([(baslik, govde, veri, kosul), ...])          # → [Sonuc] (mesaj sırasıyla)
+
+  - Bağlantı: fcm.googleapis.com'a süreç boyunca tek istemci. httpx ve h2
+    yüklüyse HTTP/2 (tek bağlantıda çoklanmış eşzamanlı istekler), değilse
+    requests.Session + PARALEL bağlantılık havuz (HTTP/1.1 keep-alive).
+  - Eşzamanlılık: toplu() mesajları PARALEL iş parçacığında gönderir; token
+    toplu çağrı başına bir kez alınır.
+  - Hız sınırı: HIZ istek/sn jeton kovası (tüm iş parçacıkları ortak).
+  - Yeniden deneme: bağlantı hatası, 429 ve 5xx DENEME kez; Retry-After varsa
+    o kadar (tüm gönderici durur — kota projeye ait), yoksa üstel bekleme +
+    rastgele sapma. 4xx (400/401/403/404) yeniden denenmez.
+  - Sonuç: Sonuc(basarili, durum, ad, hata, deneme) — ad FCM'in mesaj adı
+    ("projects/.../messages/..."), durum HTTP kodu (bağlantı hatasında 0).
+
+HTTP/2 istekleri requests dışından gittiği için olcum'un host sayımına girmez;
+süreleri "fcm" aşamasına yansır.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import olcum
+from dayanikli_http import retry_after
+
+FCM_V1_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+PARALEL = 8
+HIZ = 20.0              # İstek/sn (FCM proje kotası dakikada 600.000; burada nezaket sınırı)
+DENEME = 4
+BEKLEME_SN = 1.0        # İlk yeniden deneme beklemesi; her denemede iki katı
+MAKS_BEKLEME_SN = 60.0
+ZAMAN_ASIMI = 10
+YENIDEN_DENE = {429, 500, 502, 503, 504}
+
+Sonuc = namedtuple("Sonuc", "basarili durum ad hata deneme")
+
+
+def mesaj_govdesi(baslik, govde, veri=None, kosul=None) -> dict:
+    """FCM v1 mesajı; kosul (bildirim_konulari) yoksa halka_arz konusuna."""
+    return {
+        "message": {
+            **({"condition": kosul} if kosul else {"topic": "halka_arz"}),
+            "notification": {"title": baslik, "body": govde},
+            "android": {"priority": "high", "notification": {"sound": "default", "channel_id": "halka_arz_channel", "click_action": "FLUTTER_NOTIFICATION_CLICK"}},
+            "apns": {"payload": {"aps": {"sound": "default", "badge": 1}}},
+            "data": {k: str(v) for k, v in (veri or {}).items()},
+        }
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HIZ SINIRI
+# ═══════════════════════════════════════════════════════════════════
+class HizSiniri:
+    """Jeton kovası: saniyede hiz jeton, en fazla kapasite birikir. ertele() herkesi bekletir."""
+
+    def __init__(self, hiz, kapasite=None, saat=time.monotonic, uyu=time.sleep):
+        self.hiz = hiz
+        self.kapasite = kapasite or max(hiz, 1.0)
+        self.saat, self.uyu = saat, uyu
+        self._jeton = self.kapasite
+        self._son = saat()
+        self._ertele = 0.0
+        self._kilit = threading.Lock()
+
+    def al(self):
+        while True:
+            with self._kilit:
+                simdi = self.saat()
+                self._jeton = min(self.kapasite, self._jeton + (simdi - self._son) * self.hiz)
+                self._son = simdi
+                if self._ertele > simdi:
+                    bekle = self._ertele - simdi
+                elif self._jeton >= 1:
+                    self._jeton -= 1
+                    return
+                else:
+                    bekle = (1 - self._jeton) / self.hiz
+            self.uyu(bekle)
+
+    def ertele(self, sn):
+        with self._kilit:
+            self._ertele = max(self._ertele, self.saat() + sn)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GÖNDERİCİ
+# ═══════════════════════════════════════════════════════════════════
+def _istemci_olustur(paralel, zaman_asimi):
+    """(istemci, protokol): httpx + h2 varsa HTTP/2, yoksa bağlantı havuzlu requests.Session."""
+    try:
+        import httpx
+        limitler = httpx.Limits(max_connections=paralel, max_keepalive_connections=paralel)
+        return httpx.Client(http2=True, limits=limitler, timeout=zaman_asimi), "HTTP/2"
+    except ImportError:  # httpx ya da h2 yüklü değil
+        import requests
+        from requests.adapters import HTTPAdapter
+        oturum = requests.Session()
+        adaptor = HTTPAdapter(pool_connections=1, pool_maxsize=paralel)
+        oturum.mount("https://", adaptor)
+        oturum.mount("http://", adaptor)
+        return oturum, "HTTP/1.1"
+
+
+class FcmGonderici:
+    """Süreç boyunca yaşayan FCM v1 göndericisi; çağrılabilir (send_fcm imzası) ve toplu()."""
+
+    def __init__(self, proje_id, token_al, paralel=PARALEL, hiz=HIZ, deneme=DENEME, bekleme=BEKLEME_SN,
+                 zaman_asimi=ZAMAN_ASIMI, istemci=None, url=FCM_V1_URL, uyu=time.sleep):
+        """
+        token_al() → OAuth erişim token'ı (None → gönderim yok).
+        istemci: post() sunan HTTP istemcisi, url: uç nokta şablonu (benchmark/test için).
+        """
+        self.proje_id = proje_id
+        self.url = url
+        self.token_al = token_al
+        self.paralel, self.deneme, self.bekleme = paralel, deneme, bekleme
+        self.zaman_asimi = zaman_asimi
+        self.uyu = uyu
+        self.hiz = HizSiniri(hiz, uyu=uyu)
+        self._istemci = istemci
+        self._havuz = None
+        self._kilit = threading.Lock()
+
+    def __call__(self, baslik, govde, veri=None, kosul=None) -> bool:
+        return self.toplu([(baslik, govde, veri, kosul)])[0].basarili
+
+    def istemci(self):
+        with self._kilit:
+            if self._istemci is None:
+                self._istemci, protokol = _istemci_olustur(self.paralel, self.zaman_asimi)
+                print(f"  [BİLGİ] FCM istemcisi: {protokol}")
+            return self._istemci
+
+    def toplu(self, mesajlar) -> list:
+        """[(baslik, govde, veri, kosul)] → [Sonuc]; mesajlar eşzamanlı, hız sınırı altında gider."""
+        mesajlar = list(mesajlar)
+        if not mesajlar:
+            return []
+        if not self.proje_id:
+            for baslik, govde, *_ in mesajlar:
+                print(f"  [SİMÜLE] {baslik} — {govde}")
+            return [Sonuc(False, 0, None, "FIREBASE_PROJECT_ID yok", 0)] * len(mesajlar)
+        with olcum.asama("fcm"):
+            token = self.token_al()
+            if not token:
+                return [Sonuc(False, 0, None, "token alınamadı", 0)] * len(mesajlar)
+            url = self.url.format(project_id=self.proje_id)
+            basliklar = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; UTF-8"}
+            istemci = self.istemci()
+
+            def gonder(m):
+                return self._gonder(istemci, url, basliklar, mesaj_govdesi(*m))
+
+            if len(mesajlar) == 1 or self.paralel <= 1:
+                sonuclar = [gonder(m) for m in mesajlar]
+            else:
+                with self._kilit:
+                    if self._havuz is None:
+                        self._havuz = ThreadPoolExecutor(max_workers=self.paralel, thread_name_prefix="fcm")
+                sonuclar = list(self._havuz.map(gonder, mesajlar))
+        # Günlük satırları mesaj sırasıyla, çağıran iş parçacığından (eşzamanlı print'ler karışmasın)
+        for (baslik, *_), s in zip(mesajlar, sonuclar):
+            if s.basarili:
+                print(f"  [FCM ✓] {baslik}" + (f" ({s.deneme}. denemede)" if s.deneme > 1 else ""))
+            else:
+                print(f"  [FCM HATA] {s.durum or 'bağlantı'}: {(s.hata or '')[:100]} — {baslik}")
+        return sonuclar
+
+    def _gonder(self, istemci, url, basliklar, govde) -> Sonuc:
+        durum, hata = 0, None
+        for i in range(self.deneme):
+            self.hiz.al()
+            bekle = 0.0
+            try:
+                r = istemci.post(url, json=govde, headers=basliklar, timeout=self.zaman_asimi)
+            except Exception as e:  # Bağlantı / okuma zaman aşımı: yeniden denenir
+                durum, hata = 0, f"{type(e).__name__}: {e}"
+            else:
+                durum = r.status_code
+                if durum == 200:
+                    try:
+                        ad = r.json().get("name")
+                    except ValueError:
+                        ad = None
+                    return Sonuc(True, 200, ad, None, i + 1)
+                hata = r.text[:200]
+                if durum not in YENIDEN_DENE:
+                    break
+                bekle = retry_after(r.headers.get("Retry-After"))
+                if bekle:
+                    self.hiz.ertele(min(bekle, MAKS_BEKLEME_SN))  # Kota projeye ait: tüm gönderimler bekler
+            if i + 1 < self.deneme and not bekle:
+                self.uyu(min(self.bekleme * 2 ** i, MAKS_BEKLEME_SN) * random.uniform(0.5, 1.5))
+        return Sonuc(False, durum, None, hata, i + 1)
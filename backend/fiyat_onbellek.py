@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Fiyat Önbelleği — Çalıştırmalar Arası Kalıcı Kotasyon/Geçmiş Önbelleği
+=======================================================================
+main.py, price_tracker.py, price_checker.py ve scraper.py aynı hisseler için
+dakikalar arayla aynı Yahoo verisini çeker. OnbellekliSaglayici herhangi bir
+PriceProvider'ı sarar ve sonuçları (sembol, aralık, dönem) anahtarıyla saklar:
+
+  "EMPAE|quote|now"        → 72.4
+  "EMPAE|1d|5d"            → [[tarih, o, h, l, c], ...]
+  "EMPAE|1d|2025-01-02~"   → ...
+
+Süre (TTL) seans saatlerine göre belirlenir:
+  - Seans içinde (ve Yahoo gecikmesi için kapanıştan sonraki 20 dk) kısa:
+    kotasyon 60 sn, günlük geçmiş 5 dk.
+  - Seans dışında veri değişmez → bir sonraki seans açılışına kadar geçerli.
+  - Bitişi son kesin kapanıştan önce olan sabit aralıklar 7 gün geçerli.
+
+Kayıt sayısı HALKARZ_QUOTE_CACHE_MAX ile sınırlıdır (en eski kullanılan atılır).
+Aynı anahtarı aynı anda isteyen thread'ler tek bir isteği paylaşır (single-flight).
+Önbellek süreç sonunda data/cache/quotes.json'a yazılır; Actions'ta bu dizin
+actions/cache ile çalıştırmalar arasında taşınır.
+
+Kapatmak için: HALKARZ_QUOTE_CACHE=0
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+import bist_takvimi
+from bist_takvimi import TR_TZ
+from fiyat_saglayici import Bar, PriceProvider
+
+VARSAYILAN_DOSYA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "quotes.json")
+VARSAYILAN_MAKS_KAYIT = 5000
+
+# Seans içi TTL'ler (sn)
+KISA_TTL = {"quote": 60, "history": 5 * 60}
+KESIN_TTL = 7 * 24 * 3600
+YAHOO_GECIKME = timedelta(minutes=20)   # Kapanıştan sonra verinin kesinleşme payı
+BEKLEME_ZAMAN_ASIMI = 120               # Başka thread'in isteğini bekleme sınırı (sn)
+
+
+def ttl_sn(tur: str, simdi: Optional[datetime] = None) -> float:
+    """tur ("quote" | "history") verisinin şu an çekilirse kaç saniye geçerli olacağı."""
+    simdi = simdi or datetime.now(TR_TZ)
+    kisa = KISA_TTL[tur]
+    s = bist_takvimi.seans(simdi)
+    if s and s[0] <= simdi < s[1] + YAHOO_GECIKME:
+        return kisa
+    if s and simdi < s[0]:
+        sonraki_acilis = s[0]
+    else:
+        sonraki_acilis = bist_takvimi.seans_acilis(bist_takvimi.sonraki_islem_gunu(simdi))
+    return max((sonraki_acilis - simdi).total_seconds(), kisa)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DEPO (LRU + TTL + SINGLE-FLIGHT)
+# ═══════════════════════════════════════════════════════════════════
+class OnbellekDeposu:
+    """Thread-safe anahtar → (son_kullanma_epoch, değer) deposu, JSON'a kalıcı."""
+
+    def __init__(self, path: Optional[str] = None, maks_kayit: int = VARSAYILAN_MAKS_KAYIT):
+        self.path = path
+        self.maks_kayit = maks_kayit
+        self._kayitlar: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._ucusta: dict[str, threading.Event] = {}
+        self._kilit = threading.Lock()
+        self._degisti = False
+        self.isabet = 0
+        self.iskalama = 0
+        if path:
+            self._yukle()
+
+    def _yukle(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                veri = json.load(f)
+        except (OSError, ValueError):
+            return
+        simdi = time.time()
+        for anahtar, son_kullanma, deger in veri.get("kayitlar", []):
+            if son_kullanma > simdi:
+                self._kayitlar[anahtar] = (son_kullanma, deger)
+
+    def kaydet(self):
+        """Değişiklik varsa dosyaya atomik olarak yazar."""
+        if not self.path:
+            return
+        simdi = time.time()
+        with self._kilit:  # Bayrak kilit altında okunup temizlenir (başka thread'in _koy'u kaybolmasın)
+            if not self._degisti:
+                return
+            kayitlar = [[a, sk, d] for a, (sk, d) in self._kayitlar.items() if sk > simdi]
+            self._degisti = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        gecici = f"{self.path}.tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump({"v": 1, "kayitlar": kayitlar}, f, separators=(",", ":"))
+        os.replace(gecici, self.path)
+
+    def _koy(self, anahtar, deger, son_kullanma):
+        self._kayitlar[anahtar] = (son_kullanma, deger)
+        self._kayitlar.move_to_end(anahtar)
+        while len(self._kayitlar) > self.maks_kayit:
+            self._kayitlar.popitem(last=False)
+        self._degisti = True
+
+    def getir(self, anahtarlar: dict[str, str], ttl: float, cek) -> dict[str, object]:
+        """
+        anahtarlar: {anahtar: kod}. Geçerli kayıtlar önbellekten, eksikler tek bir
+        cek(kodlar) → {kod: değer} çağrısıyla gelir. Başka thread'in şu an çektiği
+        anahtarlar için o istek beklenir. Sonuç: {kod: değer} (alınamayanlar hariç).
+        """
+        sonuc, bekle, benim = {}, {}, {}
+        simdi = time.time()
+        with self._kilit:
+            for anahtar, kod in anahtarlar.items():
+                kayit = self._kayitlar.get(anahtar)
+                if kayit and kayit[0] > simdi:
+                    self._kayitlar.move_to_end(anahtar)
+                    sonuc[kod] = kayit[1]
+                    self.isabet += 1
+                elif anahtar in self._ucusta:
+                    bekle[anahtar] = (kod, self._ucusta[anahtar])
+                    self.isabet += 1
+                else:
+                    self._ucusta[anahtar] = threading.Event()
+                    benim[anahtar] = kod
+                    self.iskalama += 1
+
+        if benim:
+            gelen = {}
+            try:
+                gelen = cek(list(benim.values())) or {}
+            finally:
+                with self._kilit:
+                    son_kullanma = time.time() + ttl
+                    for anahtar, kod in benim.items():
+                        if kod in gelen:
+                            self._koy(anahtar, gelen[kod], son_kullanma)
+                        self._ucusta.pop(anahtar).set()
+            for kod in benim.values():
+                if kod in gelen:
+                    sonuc[kod] = gelen[kod]
+
+        for anahtar, (kod, olay) in bekle.items():
+            olay.wait(BEKLEME_ZAMAN_ASIMI)
+            with self._kilit:  # LRU sırası/çıkarma başka thread'de sürüyor olabilir
+                kayit = self._kayitlar.get(anahtar)
+            if kayit:
+                sonuc[kod] = kayit[1]
+        return sonuc
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SAĞLAYICI SARMALAYICI
+# ═══════════════════════════════════════════════════════════════════
+def _aralik(start, end, period):
+    if start:
+        return f"{start:%Y-%m-%d}~{end:%Y-%m-%d}" if end else f"{start:%Y-%m-%d}~"
+    return period or "1mo"
+
+
+class OnbellekliSaglayici(PriceProvider):
+    """Bir PriceProvider'ı OnbellekDeposu ile sarar. latest()'in yedek yolu da önbellekten geçer."""
+
+    def __init__(self, ic: PriceProvider, depo: OnbellekDeposu):
+        self.ic = ic
+        self.depo = depo
+        self.ad = f"{ic.ad}+onbellek"
+
+    def quotes(self, kodlar):
+        kodlar = list(kodlar)
+        return self.depo.getir({f"{k}|quote|now": k for k in kodlar}, ttl_sn("quote"), self.ic.quotes)
+
+    def _history_ttl(self, end):
+        if end and end.strftime("%Y-%m-%d") <= bist_takvimi.son_kapanis_gunu().isoformat():
+            return KESIN_TTL
+        return ttl_sn("history")
+
+    def history(self, kod, start=None, end=None, period=None):
+        return self.batch_history([kod], start=start, end=end, period=period).get(kod, [])
+
+    def batch_history(self, kodlar, start=None, end=None, period=None):
+        aralik = _aralik(start, end, period)
+
+        def cek(eksik):
+            gelen = self.ic.batch_history(eksik, start=start, end=end, period=period)
+            return {k: [list(b) for b in bars] for k, bars in gelen.items()}
+
+        ham = self.depo.getir({f"{k}|1d|{aralik}": k for k in kodlar}, self._history_ttl(end), cek)
+        return {k: [Bar(*b) for b in bars] for k, bars in ham.items() if bars}
+
+
+def onbellekle(ic: PriceProvider, path: Optional[str] = None) -> PriceProvider:
+    """ic'i kalıcı önbellekle sarar; süreç sonunda önbellek diske yazılır."""
+    depo = OnbellekDeposu(
+        path=path or os.environ.get("HALKARZ_QUOTE_CACHE_FILE") or VARSAYILAN_DOSYA,
+        maks_kayit=int(os.environ.get("HALKARZ_QUOTE_CACHE_MAX", VARSAYILAN_MAKS_KAYIT)),
+    )
+
+    def _kapanista():
+        try:
+            depo.kaydet()
+        except OSError as e:
+            print(f"[UYARI] Fiyat önbelleği yazılamadı: {e}")
+        if depo.isabet or depo.iskalama:
+            print(f"[BİLGİ] Fiyat önbelleği: {depo.isabet} isabet, {depo.iskalama} Yahoo isteği")
+
+    atexit.register(_kapanista)
+    return OnbellekliSaglayici(ic, depo)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Fiyat Sağlayıcıları — Yahoo Finance ve Çevrimdışı Tekrar (Replay)
+==================================================================
+Tüm backend betikleri fiyatı bu arayüz üzerinden ister:
+
+  saglayici = get_provider()
+  saglayici.latest(["EMPAE", "ATATR"])          → {"EMPAE": 72.4, ...}
+  saglayici.history("EMPAE", period="1y")       → [Bar(tarih, acilis, yuksek, dusuk, kapanis), ...]
+  saglayici.batch_history(kodlar, period="5d")  → {"EMPAE": [Bar, ...], ...}
+
+Seçim: HALKARZ_PRICE_PROVIDER=yahoo (varsayılan) | replay
+  yahoo → kalıcı TTL önbelleğiyle sarılır (bkz. fiyat_onbellek.py, HALKARZ_QUOTE_CACHE=0 kapatır).
+  replay → HALKARZ_REPLAY_FILE (JSON) varsa oradan okur; olmayan hisseler için
+  deterministik rastgele yürüyüş (tavan/taban günleriyle) üretir. Ağ kullanmaz,
+  yüzlerce hisseyle takip/benchmark çalıştırmak içindir.
+
+Dosya üretmek için:
+  python fiyat_saglayici.py --olustur 300 --cikti data/replay_prices.json
+"""
+
+import json
+import logging
+import os
+import random
+import zlib
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+import bist_takvimi
+import dayanikli_http
+from bist_takvimi import TR_TZ
+
+Bar = namedtuple("Bar", "tarih acilis yuksek dusuk kapanis")  # tarih: "YYYY-MM-DD"
+
+# Yahoo kapanışları temettü/bölünme düzeltmeli (yfinance history varsayılanı; fiyat_gecmisi bu seriyle dolduruldu)
+AUTO_ADJUST = True
+
+# BIST günlük fiyat limiti
+TAVAN_CARPANI = 1.10
+TABAN_CARPANI = 0.90
+
+
+@lru_cache(maxsize=8)
+def _son_islem_gunleri(bugun, adet):
+    gunler = bist_takvimi.islem_gunleri(bugun - timedelta(days=int(adet * 1.5) + 10), bugun)
+    return tuple(g.isoformat() for g in gunler[-adet:])
+
+
+def _sembol(kod):
+    return f"{kod}.IS"
+
+
+def _period_gun(period):
+    """Yahoo period stringini takvim gününe çevirir ("1mo", "1y"). "Nd" → None (işlem günü sayısı)."""
+    if not period:
+        return 30
+    p = period.lower()
+    try:
+        if p.endswith("mo"): return int(p[:-2]) * 31
+        if p.endswith("d"): return None
+        if p.endswith("y"): return int(p[:-1]) * 366
+    except ValueError:
+        pass
+    return 30
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ARAYÜZ
+# ═══════════════════════════════════════════════════════════════════
+class PriceProvider(ABC):
+    """Fiyat kaynağı arayüzü. Tüm fiyatlar TL, tarihler "YYYY-MM-DD"."""
+
+    ad = "base"
+
+    def latest(self, kodlar) -> dict[str, float]:
+        """
+        Anlık (Yahoo'da ~15 dk gecikmeli) son fiyatlar. Alınamayanlar sonuçta yer almaz.
+        Önce quotes(); alınamayanlar için son günlük kapanışa (batch_history "5d") düşer.
+        """
+        kodlar = list(kodlar)
+        if not kodlar: return {}
+        prices = self.quotes(kodlar)
+        eksik = [k for k in kodlar if k not in prices]
+        if eksik:
+            try:
+                for kod, bars in self.batch_history(eksik, period="5d").items():
+                    prices[kod] = round(bars[-1].kapanis, 2)
+            except Exception as e:
+                print(f"    {', '.join(eksik)} fiyat alınamadı: {e}")
+        return prices
+
+    @abstractmethod
+    def quotes(self, kodlar) -> dict[str, float]:
+        """Sadece anlık kotasyon (yedeksiz). latest() bunu kullanır."""
+
+    @abstractmethod
+    def history(self, kod, start=None, end=None, period=None) -> list[Bar]:
+        """Günlük barlar (eskiden yeniye). start/end: date/datetime, end hariç."""
+
+    def batch_history(self, kodlar, start=None, end=None, period=None) -> dict[str, list[Bar]]:
+        """Birden fazla hisse için history(); alt sınıflar toplu istekle hızlandırabilir."""
+        sonuc = {}
+        for kod in kodlar:
+            bars = self.history(kod, start=start, end=end, period=period)
+            if bars:
+                sonuc[kod] = bars
+        return sonuc
+
+
+# ═══════════════════════════════════════════════════════════════════
+# YAHOO FINANCE
+# ═══════════════════════════════════════════════════════════════════
+def _df_to_bars(df) -> list[Bar]:
+    if df is None or df.empty or "Close" not in df:
+        return []
+    df = df.dropna(subset=["Close"])
+    return [
+        Bar(idx.strftime("%Y-%m-%d"), float(r["Open"]), float(r["High"]), float(r["Low"]), float(r["Close"]))
+        for idx, r in df.iterrows()
+    ]
+
+
+def _tarih_str(d):
+    return d.strftime("%Y-%m-%d") if d else None
+
+
+def _son_fiyat(ticker) -> float:
+    return float(ticker.fast_info.last_price)  # fast_info isteği erişimde yapılır
+
+
+class _GunlukHatalari(logging.Handler):
+    """yfinance ≥ 1.0 download hatalarını shared._ERRORS yerine 'yfinance' günlüğüne yazar; onları toplar."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.mesajlar = []
+
+    def emit(self, kayit):
+        self.mesajlar.append(kayit.getMessage())
+
+
+def _indir(yf, semboller, **kwargs):
+    """yf.download + çağrı sırasında kaydedilen hata mesajları → (df, mesajlar)."""
+    yakalayici = _GunlukHatalari()
+    gunluk = logging.getLogger("yfinance")
+    gunluk.addHandler(yakalayici)
+    try:
+        df = yf.download(semboller, **kwargs)
+    finally:
+        gunluk.removeHandler(yakalayici)
+    try:
+        from yfinance import shared
+        mesajlar = [str(m) for m in (getattr(shared, "_ERRORS", None) or {}).values()]  # Eski sürümler
+    except ImportError:
+        mesajlar = []
+    return df, mesajlar + yakalayici.mesajlar
+
+
+def _indirme_hatasi(sonuc):
+    """
+    yf.download ağ hatalarını yutar, hisseyi boş tablo olarak döner: kaydedilen mesajlardan
+    biri ağ hatasıysa dayanikli_http hata sınıfı; böylece yeniden deneme ve devre kesici
+    devreye girer. Mesajsız boş sonuç "veri yok"tur (henüz işlem görmeyen hisse) → None.
+    """
+    for mesaj in sonuc[1]:
+        sinif = dayanikli_http.metin_sinifla(mesaj)
+        if sinif:
+            return sinif
+    return None
+
+
+class YahooProvider(PriceProvider):
+    """
+    yfinance tabanlı sağlayıcı. yfinance (→ pandas) ilk çağrıda yüklenir.
+    Her Yahoo çağrısı dayanikli_http.cagir ile: zaman aşımı / bağlantı / hız
+    sınırı hataları yeniden denenir, Yahoo devresi açıksa istek yapılmaz.
+    yfinance ağ hatalarını varsayılan olarak yutup boş tablo döndüğünden
+    history'de istisnalar açılır, download'ın kaydettiği hata mesajları (_indir) _indirme_hatasi ile sınıflanır.
+    """
+
+    ad = "yahoo"
+
+    def _yf(self):
+        import yfinance as yf
+        config = getattr(yf, "config", None)
+        if config is not None:  # ≥ 1.0; eski sürümlerde history(raise_errors=True), bkz. _ISTISNA
+            config.debug.hide_exceptions = False  # Ağ hatası boş tablo yerine istisna olarak gelsin
+        return yf
+
+    def _istisna(self, yf) -> dict:
+        return {} if getattr(yf, "config", None) is not None else {"raise_errors": True}
+
+    def _history_kwargs(self, start, end, period):
+        """Tek ve toplu isteğin ortak parametreleri; kapanışlar her iki yolda da düzeltilmiş (auto_adjust)."""
+        if start:
+            end = end or (datetime.now() + timedelta(days=1))
+            return {"start": _tarih_str(start), "end": _tarih_str(end), "interval": "1d", "auto_adjust": AUTO_ADJUST}
+        return {"period": period or "1mo", "interval": "1d", "auto_adjust": AUTO_ADJUST}
+
+    def quotes(self, kodlar):
+        kodlar = list(kodlar)
+        if not kodlar: return {}
+        yf = self._yf()
+        prices = {}
+        tickers = yf.Tickers(" ".join(_sembol(k) for k in kodlar))
+        for kod in kodlar:
+            try:
+                prices[kod] = round(dayanikli_http.cagir(dayanikli_http.YAHOO, _son_fiyat,
+                                                         tickers.tickers[_sembol(kod)]), 2)
+            except Exception:
+                pass  # latest() son günlük kapanışa düşer
+        return prices
+
+    def history(self, kod, start=None, end=None, period=None):
+        yf = self._yf()
+        try:
+            df = dayanikli_http.cagir(dayanikli_http.YAHOO, yf.Ticker(_sembol(kod)).history,
+                                      **self._history_kwargs(start, end, period), **self._istisna(yf))
+        except Exception as e:
+            if isinstance(e, dayanikli_http.DevreAcik) or dayanikli_http.sinifla(hata=e):
+                raise  # Yeniden denemeler tükendi ya da devre açık
+            return []  # Veri yok (delist, eksik saat dilimi…): istisnalar gizliyken de boş dönüyordu
+        return _df_to_bars(df)
+
+    def batch_history(self, kodlar, start=None, end=None, period=None):
+        kodlar = list(kodlar)
+        if len(kodlar) <= 1:
+            return super().batch_history(kodlar, start=start, end=end, period=period)
+        yf = self._yf()
+        try:
+            df, _ = dayanikli_http.cagir(dayanikli_http.YAHOO, _indir, yf, [_sembol(k) for k in kodlar],
+                                         group_by="ticker", progress=False, threads=True,
+                                         dogrula=_indirme_hatasi, **self._history_kwargs(start, end, period))
+        except dayanikli_http.DevreAcik:
+            raise  # Tek tek denemek de aynı hosta gider
+        except Exception as e:
+            print(f"  [UYARI] Toplu Yahoo isteği başarısız ({e}) → tek tek çekiliyor.")
+            return super().batch_history(kodlar, start=start, end=end, period=period)
+
+        sonuc = {}
+        seviye0 = set(df.columns.get_level_values(0)) if getattr(df.columns, "nlevels", 1) > 1 else set()
+        for kod in kodlar:
+            sym = _sembol(kod)
+            if sym not in seviye0:
+                continue
+            bars = _df_to_bars(df[sym])
+            if bars:
+                sonuc[kod] = bars
+        return sonuc
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ÇEVRİMDIŞI TEKRAR (REPLAY)
+# ═══════════════════════════════════════════════════════════════════
+class ReplayProvider(PriceProvider):
+    """
+    Dosya tabanlı, deterministik sağlayıcı.
+    Dosya formatı: {"seriler": {"KOD": {"YYYY-MM-DD": [acilis, yuksek, dusuk, kapanis], ...}}}
+    Dosyada olmayan hisse için seri, (kod, seed) ile belirlenen rastgele
+    yürüyüşle üretilir: ilk günlerde tavan serisi, sonra ~%10 tavan / ~%5 taban günü.
+    """
+
+    ad = "replay"
+
+    def __init__(self, path: Optional[str] = None, seed: int = 0, gun_sayisi: int = 250,
+                 simdi: Optional[datetime] = None):
+        self.path = path
+        self.seed = seed
+        self.gun_sayisi = gun_sayisi
+        self.simdi = simdi  # None → gerçek saat; benchmark için sabitlenebilir
+        self.seriler: dict[str, dict[str, list[float]]] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.seriler = json.load(f).get("seriler", {})
+
+    def _simdi(self):
+        return self.simdi or datetime.now(TR_TZ)
+
+    def _rng(self, *parcalar):
+        anahtar = "|".join(str(p) for p in (self.seed,) + parcalar)
+        return random.Random(zlib.crc32(anahtar.encode()))
+
+    def _uret(self, kod) -> dict[str, list[float]]:
+        rng = self._rng(kod)
+        gunler = _son_islem_gunleri(self._simdi().date(), self.gun_sayisi)
+
+        onceki = round(rng.uniform(8, 120), 2)
+        tavan_serisi = rng.randint(0, 6)
+        seri = {}
+        for i, gun in enumerate(gunler):
+            tavan = round(onceki * TAVAN_CARPANI, 2)
+            taban = round(onceki * TABAN_CARPANI, 2)
+            zar = rng.random()
+            if i < tavan_serisi or zar < 0.10:
+                acilis = round(rng.uniform(onceki, tavan), 2)
+                kapanis, yuksek, dusuk = tavan, tavan, min(acilis, tavan)
+            elif zar < 0.15:
+                acilis = round(rng.uniform(taban, onceki), 2)
+                kapanis, yuksek, dusuk = taban, max(acilis, taban), taban
+            else:
+                kapanis = round(min(max(onceki * (1 + rng.gauss(0, 0.03)), taban), tavan), 2)
+                acilis = round(min(max(onceki * (1 + rng.gauss(0, 0.01)), taban), tavan), 2)
+                yuksek = round(min(max(acilis, kapanis) * (1 + abs(rng.gauss(0, 0.01))), tavan), 2)
+                dusuk = round(max(min(acilis, kapanis) * (1 - abs(rng.gauss(0, 0.01))), taban), 2)
+            seri[gun] = [acilis, yuksek, dusuk, kapanis]
+            onceki = kapanis
+        return seri
+
+    def seri(self, kod) -> dict[str, list[float]]:
+        if kod not in self.seriler:
+            self.seriler[kod] = self._uret(kod)
+        return self.seriler[kod]
+
+    def kaydet(self, path: Optional[str] = None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"seed": self.seed, "seriler": self.seriler}, f, separators=(",", ":"))
+
+    def _gun_ici(self, kod, bar, seans, simdi):
+        """Seans içindeki an için deterministik fiyat: açılıştan kapanışa gürültülü yol."""
+        o, h, l, c = bar
+        toplam = (seans[1] - seans[0]).total_seconds()
+        gecen = (simdi - seans[0]).total_seconds()
+        ilerleme = min(gecen / toplam, 1.0)
+        gurultu = self._rng(kod, seans[0].date(), int(gecen // 60)).uniform(-1, 1) * (h - l) * 0.25 * (1 - ilerleme)
+        return round(min(max(o + (c - o) * ilerleme + gurultu, l), h), 2)
+
+    def _gorunen(self, kod):
+        """Şu an itibarıyla 'bilinen' barlar: bugünün barı seans açıldıysa (kısmi) dahil."""
+        simdi = self._simdi()
+        bugun = simdi.date().isoformat()
+        seans = bist_takvimi.seans(simdi)
+        for tarih, bar in sorted(self.seri(kod).items()):
+            if tarih > bugun:
+                break
+            if tarih == bugun:
+                if not seans or simdi < seans[0]:
+                    break
+                if simdi < seans[1]:
+                    o = bar[0]
+                    c = self._gun_ici(kod, bar, seans, simdi)
+                    bar = [o, max(o, c), min(o, c), c]
+            yield tarih, bar
+
+    def history(self, kod, start=None, end=None, period=None):
+        if not start and _period_gun(period) is None:
+            # Yahoo gibi: "5d" → son 5 işlem günü
+            return [Bar(t, *bar) for t, bar in self._gorunen(kod)][-int(period[:-1]):]
+        if start:
+            bas = _tarih_str(start)
+        else:
+            bas = (self._simdi().date() - timedelta(days=_period_gun(period))).isoformat()
+        bit = _tarih_str(end) if end else "9999-12-31"
+        return [Bar(t, *bar) for t, bar in self._gorunen(kod) if bas <= t < bit]
+
+    def quotes(self, kodlar):
+        prices = {}
+        for kod in kodlar:
+            son = None
+            for _, bar in self._gorunen(kod):
+                son = bar
+            if son:
+                prices[kod] = son[3]
+        return prices
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SEÇİM
+# ═══════════════════════════════════════════════════════════════════
+_provider = None
+
+
+def get_provider() -> PriceProvider:
+    """HALKARZ_PRICE_PROVIDER ortam değişkenine göre süreç başına tek sağlayıcı."""
+    global _provider
+    if _provider is None:
+        tur = os.environ.get("HALKARZ_PRICE_PROVIDER", "yahoo").lower()
+        if tur == "replay":
+            _provider = ReplayProvider(
+                path=os.environ.get("HALKARZ_REPLAY_FILE") or None,
+                seed=int(os.environ.get("HALKARZ_REPLAY_SEED", "0")),
+            )
+        else:
+            _provider = YahooProvider()
+            if os.environ.get("HALKARZ_QUOTE_CACHE", "1") != "0":
+                from fiyat_onbellek import onbellekle
+                _provider = onbellekle(_provider)
+    return _provider
+
+
+def set_provider(provider: Optional[PriceProvider]):
+    """Sağlayıcıyı elle ayarlar (benchmark/replay betikleri için). None → ortamdan tekrar seç."""
+    global _provider
+    _provider = provider
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay fiyat dosyası üret")
+    parser.add_argument("--olustur", type=int, default=100, help="Sentetik hisse sayısı")
+    parser.add_argument("--cikti", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "replay_prices.json"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gun", type=int, default=250, help="Hisse başına işlem günü")
+    args = parser.parse_args()
+
+    rp = ReplayProvider(seed=args.seed, gun_sayisi=args.gun)
+    for i in range(args.olustur):
+        rp.seri(f"SNT{i:03d}")
+    rp.kaydet(args.cikti)
+    print(f"[✓] {args.olustur} sentetik hisse → {args.cikti}")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Fiyat Geçmişi Biçimleri
+=======================
+halka_arzlar/<KOD>.fiyat_gecmisi bir Firestore haritası: {"YYYY-MM-DD": kapanış}.
+Her gün tarih metni anahtar olarak tekrar eder; doküman boyutu ve hem Python
+hem Dart tarafında çözme süresi gün sayısıyla şişer. Üç biçim:
+
+  harita  fiyat_gecmisi = {"2026-03-02": 24.2, "2026-03-03": 26.62, ...}    (varsayılan)
+  sutun   fiyat_serisi  = {"baslangic": "2026-03-02", "gun": [0, 1, 2, 5 ...], "fiyat": [24.2, ...]}
+  paket   fiyat_serisi  = bytes (delta + varint, aşağıda)
+
+Bellekte her zaman {tarih: fiyat} sözlüğüdür:
+
+  oku(doc)            harita / sutun / paket → sözlük (hangisi varsa; ikisi varsa harita üstün)
+  cozulmus(doc)       doc'un fiyat_serisi'si fiyat_gecmisi sözlüğüne açılmış kopyası
+  yazilacak(gecmis)   fs_set verisi: seçili biçimdeki alan + diğerinin silinmesi (fs_kodek.SIL)
+  boyutlar(gecmis)    her biçim için (Firestore depolama, REST JSON) bayt — rapor için
+
+Gün ofsetleri işlem günü değil takvim günüdür: işlem günü sırası
+bist_takvimi'nin tatil tablosuna bağlı; tablo her yıl güncellendiğinde eski
+kayıtların tarihleri kayardı. Hafta sonu boşluğu (3 gün) da tek varint baytıdır.
+
+Paket (sürüm 1, küçük endian):
+  [1] [ölçek] [genişlik] varint(n) varint(ilk gün, 1970-01-01'den)
+  (n-1) × gün farkı: 1 bayt (1..255); 0 → ardından varint (uzun işlem arası)
+  ölçek e ∈ 0..9 → zigzag varint(ilk fiyat × 10^e) + (n-1) × farkı, genişlik (1/2/4/8)
+                   baytlık işaretli tamsayı; fiyat = tamsayı / 10^e
+  ölçek 255      → n × float64; hiçbir e kayıpsız değilse (yuvarlanmamış fiyatlar)
+Sabit genişlikli alanlar tek struct çağrısıyla çözülür (Python'da bayt bayt döngü yok,
+Dart'ta ByteData); kuruşlu tipik bir hissede gün başına ~3 bayt.
+
+Yazım biçimi: HALKARZ_FIYAT_BICIMI=harita (varsayılan) | sutun | paket.
+Uygulamanın eski sürümleri yalnız fiyat_gecmisi okur; sutun/paket okuyan sürüm
+yayıldıktan sonra biçim değiştirilir, mevcut dokümanlar fiyat_serisi_gocu.py ile taşınır.
+"""
+
+import json
+import os
+import struct
+from datetime import date
+from functools import lru_cache
+from itertools import accumulate
+
+import fs_kodek
+
+HARITA = "fiyat_gecmisi"
+SERI = "fiyat_serisi"
+BICIMLER = ("harita", "sutun", "paket")
+
+SURUM = 1
+HAM = 255  # Ölçek baytı: ham float64 fiyatlar
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def bicim() -> str:
+    b = os.environ.get("HALKARZ_FIYAT_BICIMI", "harita").lower()
+    return b if b in BICIMLER else "harita"
+
+
+@lru_cache(maxsize=8192)
+def _iso(gun: int) -> str:
+    """1970'ten gün sayısı → "YYYY-MM-DD" (dokümanlar aynı tarihleri paylaşır, metin tekrar kullanılır)."""
+    return date.fromordinal(gun + _EPOCH).isoformat()
+
+
+def _sirala(gecmis: dict) -> list:
+    """{tarih: fiyat} → [(gün, fiyat)] tarih sırasıyla; bozuk tarih/fiyat ValueError."""
+    try:
+        return sorted((date.fromisoformat(t).toordinal() - _EPOCH, float(f)) for t, f in gecmis.items())
+    except TypeError as e:
+        raise ValueError(f"sayısal olmayan fiyat: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SÜTUN
+# ═══════════════════════════════════════════════════════════════════
+def sutunla(gecmis: dict) -> dict:
+    ogeler = _sirala(gecmis)
+    if not ogeler:
+        return {"baslangic": "", "gun": [], "fiyat": []}
+    bas = ogeler[0][0]
+    return {"baslangic": _iso(bas), "gun": [g - bas for g, _ in ogeler], "fiyat": [f for _, f in ogeler]}
+
+
+def sutundan(sutun: dict) -> dict:
+    if not sutun.get("gun"):
+        return {}
+    bas = date.fromisoformat(sutun["baslangic"]).toordinal() - _EPOCH
+    return {_iso(bas + g): float(f) for g, f in zip(sutun["gun"], sutun["fiyat"])}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PAKET
+# ═══════════════════════════════════════════════════════════════════
+_GENISLIK = ((1, "b"), (2, "h"), (4, "i"), (8, "q"))  # Fiyat farkı baytı → struct biçimi
+_BICIM = dict(_GENISLIK)
+
+
+def _varint(b: bytearray, n: int):
+    if n < 0:
+        raise ValueError(f"negatif varint: {n}")
+    while n > 0x7F:
+        b.append((n & 0x7F) | 0x80)
+        n >>= 7
+    b.append(n)
+
+
+def _varint_oku(veri: bytes, i: int):
+    n = kay = 0
+    while True:
+        c = veri[i]
+        i += 1
+        n |= (c & 0x7F) << kay
+        if c < 0x80:
+            return n, i
+        kay += 7
+
+
+def _olcek(fiyatlar) -> int:
+    """Tüm fiyatları kayıpsız tamsayıya çeviren en küçük ondalık basamak; yoksa HAM."""
+    for e in range(10):
+        carpan = 10 ** e
+        if all(round(f * carpan) / carpan == f for f in fiyatlar):
+            return e
+    return HAM
+
+
+def paketle(gecmis: dict) -> bytes:
+    ogeler = _sirala(gecmis)
+    n = len(ogeler)
+    fiyatlar = [f for _, f in ogeler]
+    olcek = _olcek(fiyatlar) if n else 0
+    tamlar = [round(f * 10 ** olcek) for f in fiyatlar] if olcek != HAM else []
+    farklar = [k - o for o, k in zip(tamlar, tamlar[1:])]
+    enbuyuk = max((abs(d) for d in farklar), default=0)
+    genislik = next((g for g, _ in _GENISLIK if enbuyuk < 1 << (8 * g - 1)), None)
+    if genislik is None:
+        raise ValueError("fiyat farkı 64 biti aşıyor")
+
+    b = bytearray((SURUM, olcek, genislik))
+    _varint(b, n)
+    if not n:
+        return bytes(b)
+    _varint(b, ogeler[0][0])
+    for (o, _), (g, _) in zip(ogeler, ogeler[1:]):
+        if g - o < 256:
+            b.append(g - o)
+        else:
+            b.append(0)
+            _varint(b, g - o)
+    if olcek == HAM:
+        b += struct.pack(f"<{n}d", *fiyatlar)
+    else:
+        k = tamlar[0]
+        _varint(b, (k << 1) if k >= 0 else ((-k << 1) - 1))  # zigzag
+        b += struct.pack(f"<{n - 1}{_BICIM[genislik]}", *farklar)
+    return bytes(b)
+
+
+def paketten(veri: bytes) -> dict:
+    if len(veri) < 4 or veri[0] != SURUM:
+        raise ValueError(f"bilinmeyen paket sürümü: {veri[:1].hex() or 'boş'}")
+    olcek, genislik = veri[1], veri[2]
+    try:
+        n, i = _varint_oku(veri, 3)
+        if not n:
+            return {}
+        bas, i = _varint_oku(veri, i)
+        farklar = veri[i:i + n - 1]
+        if 0 in farklar:  # Uzun boşluk (≥ 256 gün) kaçışı: yavaş yol
+            farklar = []
+            for _ in range(n - 1):
+                d, i = veri[i], i + 1
+                if not d:
+                    d, i = _varint_oku(veri, i)
+                farklar.append(d)
+        else:
+            i += n - 1
+        gunler = map(_iso, accumulate(farklar, initial=bas))
+        if olcek == HAM:
+            return dict(zip(gunler, struct.unpack_from(f"<{n}d", veri, i)))
+        z, i = _varint_oku(veri, i)
+        ilk = (z >> 1) ^ -(z & 1)
+        fark = struct.unpack_from(f"<{n - 1}{_BICIM[genislik]}", veri, i)
+    except (IndexError, KeyError, struct.error):
+        raise ValueError("paket kesik")
+    bolen = 10 ** olcek
+    return dict(zip(gunler, [k / bolen for k in accumulate(fark, initial=ilk)]))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DOKÜMAN
+# ═══════════════════════════════════════════════════════════════════
+def oku(doc: dict) -> dict:
+    """doc'taki fiyat geçmişi → {tarih: fiyat}. Yoksa ya da çözülemezse {}."""
+    harita = doc.get(HARITA)
+    if not isinstance(harita, dict):
+        harita = {}
+    seri = doc.get(SERI)
+    if not seri:
+        return harita
+    try:
+        gecmis = paketten(seri) if isinstance(seri, (bytes, bytearray)) else sutundan(seri)
+    except Exception as e:
+        print(f"  [UYARI] {SERI} çözülemedi ({e}) — yok sayıldı")
+        return harita
+    gecmis.update(harita)
+    return gecmis
+
+
+def cozulmus(doc: dict) -> dict:
+    """fiyat_serisi'si fiyat_gecmisi sözlüğüne açılmış kopya (JSON'a yazılabilir, eski okuyucularla uyumlu)."""
+    if SERI not in doc:
+        return doc
+    d = {k: v for k, v in doc.items() if k != SERI}
+    d[HARITA] = oku(doc)
+    return d
+
+
+def yazilacak(gecmis: dict, bicim_: str = None) -> dict:
+    """fs_set(..., merge=True) verisi: seçili biçimdeki alan; diğer alan SIL ile silinir."""
+    b = bicim_ or bicim()
+    try:
+        if b == "paket":
+            return {SERI: paketle(gecmis), HARITA: fs_kodek.SIL}
+        if b == "sutun":
+            return {SERI: sutunla(gecmis), HARITA: fs_kodek.SIL}
+    except ValueError as e:
+        print(f"  [UYARI] Fiyat geçmişi '{b}' biçimine çevrilemedi ({e}) — harita yazılıyor")
+    return {HARITA: gecmis, SERI: fs_kodek.SIL}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# BOYUT
+# ═══════════════════════════════════════════════════════════════════
+def depolama_boyutu(deger) -> int:
+    """Firestore depolama boyutu: metin UTF-8 + 1, sayı 8, bool/null 1, bytes uzunluk, harita anahtar + değer."""
+    if isinstance(deger, str):
+        return len(deger.encode("utf-8")) + 1
+    if isinstance(deger, bool) or deger is None:
+        return 1
+    if isinstance(deger, (bytes, bytearray)):
+        return len(deger)
+    if isinstance(deger, dict):
+        return sum(depolama_boyutu(k) + depolama_boyutu(v) for k, v in deger.items())
+    if isinstance(deger, (list, tuple)):
+        return sum(depolama_boyutu(v) for v in deger)
+    return 8
+
+
+def boyutlar(gecmis: dict) -> dict:
+    """{biçim: (depolama, rest_json)} — alan adı dahil, yazılacak alan için."""
+    sonuc = {}
+    for b in BICIMLER:
+        data = {k: v for k, v in yazilacak(gecmis, b).items() if v is not fs_kodek.SIL}
+        rest = json.dumps(fs_kodek.HALKA_ARZ.kodla(data), separators=(",", ":")).encode("utf-8")
+        sonuc[b] = (depolama_boyutu(data), len(rest))
+    return sonuc
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Fiyat Geçmişi Biçim Göçü
+========================
+halka_arzlar dokümanlarındaki fiyat geçmişini (fiyat_gecmisi haritası ya da
+fiyat_serisi) istenen biçime çevirir ve boyut raporu basar. Varsayılan kuru
+çalıştırmadır: hiçbir şey yazılmaz, her doküman için mevcut / hedef boyut ve
+kayıpsızlık kontrolü raporlanır. --uygula ile yazılır; geri dönüş aynı betiğin
+--bicim harita ile çalıştırılmasıdır.
+
+Her doküman yazılmadan önce hedef biçim çözülüp orijinal sözlükle
+karşılaştırılır; eşleşmezse doküman atlanır.
+
+Kullanım:
+  python backend/fiyat_serisi_gocu.py                        # paket'e göç raporu
+  python backend/fiyat_serisi_gocu.py --bicim paket --uygula
+  python backend/fiyat_serisi_gocu.py --bicim harita --uygula  # geri al
+
+Yazımlar kalıcı olsun diye göçten sonra main.py / price_tracker.py / backfill_prices.py
+aynı biçimde çalışmalı: HALKARZ_FIYAT_BICIMI=<bicim>.
+"""
+
+import argparse
+import sys
+
+import requests
+
+import fiyat_serisi
+import fs_kodek
+import fs_maliyet
+import olcum
+from backfill_prices import COLLECTION, FIREBASE_PROJECT_ID, FIREBASE_SA_KEY_JSON, _fs_url, get_token
+
+
+def dokumanlar(token):
+    """(doc_id, {fiyat_gecmisi?, fiyat_serisi?}) — sadece fiyat alanları okunur (mask)."""
+    pt = None
+    mask = [("mask.fieldPaths", fiyat_serisi.HARITA), ("mask.fieldPaths", fiyat_serisi.SERI)]
+    while True:
+        params = [("pageSize", 100)] + mask + ([("pageToken", pt)] if pt else [])
+        r = requests.get(_fs_url(COLLECTION), params=params,
+                         headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        if r.status_code != 200:
+            print(f"  [HATA] Firestore: {r.status_code}")
+            return
+        res = r.json()
+        fs_maliyet.yanit_say("okuma", r, max(len(res.get("documents", [])), 1))
+        for doc in res.get("documents", []):
+            yield doc["name"].split("/")[-1], fs_kodek.HALKA_ARZ.coz(doc.get("fields", {}))
+        pt = res.get("nextPageToken")
+        if not pt:
+            return
+
+
+def mevcut_bicim(doc) -> str:
+    seri = doc.get(fiyat_serisi.SERI)
+    if seri is None:
+        return "harita"
+    return "paket" if isinstance(seri, (bytes, bytearray)) else "sutun"
+
+
+def yaz(token, doc_id, data) -> bool:
+    body = {"fields": fs_kodek.HALKA_ARZ.kodla(data)}
+    fp = "&".join(f"updateMask.fieldPaths={k}" for k in data)
+    r = requests.patch(f"{_fs_url(f'{COLLECTION}/{doc_id}')}?{fp}", json=body,
+                       headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+                       timeout=15)
+    fs_maliyet.yanit_say("yazma", r)
+    return r.status_code == 200
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="halka_arzlar fiyat geçmişi biçim göçü")
+    parser.add_argument("--bicim", choices=fiyat_serisi.BICIMLER, default="paket", help="Hedef biçim")
+    parser.add_argument("--uygula", action="store_true", help="Yaz (varsayılan: sadece rapor)")
+    args = parser.parse_args(argv)
+
+    if not FIREBASE_PROJECT_ID or not FIREBASE_SA_KEY_JSON:
+        print("[HATA] FIREBASE_PROJECT_ID veya FIREBASE_SA_KEY_JSON ayarlanmadı!")
+        return 1
+
+    print(f"Fiyat geçmişi göçü → {args.bicim}" + ("" if args.uygula else " (kuru çalıştırma)"))
+    token = get_token()
+    toplam = {b: [0, 0] for b in fiyat_serisi.BICIMLER}
+    sayac = {"dokuman": 0, "gun": 0, "yazilan": 0, "guncel": 0, "kayipli": 0, "hata": 0}
+
+    for doc_id, doc in dokumanlar(token):
+        gecmis = fiyat_serisi.oku(doc)
+        if not gecmis:
+            continue
+        sayac["dokuman"] += 1
+        sayac["gun"] += len(gecmis)
+        for b, (depolama, rest) in fiyat_serisi.boyutlar(gecmis).items():
+            toplam[b][0] += depolama
+            toplam[b][1] += rest
+
+        data = fiyat_serisi.yazilacak(gecmis, args.bicim)
+        geri = fiyat_serisi.oku({k: v for k, v in data.items() if v is not fs_kodek.SIL})
+        if geri != gecmis:
+            print(f"  [UYARI] {doc_id}: {args.bicim} biçimi kayıpsız değil — atlandı")
+            sayac["kayipli"] += 1
+            continue
+        onceki = mevcut_bicim(doc)
+        karisik = fiyat_serisi.HARITA in doc and fiyat_serisi.SERI in doc  # Yarım kalmış göç
+        if onceki == args.bicim and not karisik:
+            sayac["guncel"] += 1
+            continue
+        print(f"  {doc_id}: {len(gecmis)} gün, {onceki} → {args.bicim}")
+        if args.uygula:
+            if yaz(token, doc_id, data):
+                sayac["yazilan"] += 1
+            else:
+                print(f"  [HATA] {doc_id} yazılamadı")
+                sayac["hata"] += 1
+
+    print(f"\n{sayac['dokuman']} doküman, {sayac['gun']} gün | "
+          f"yazılan {sayac['yazilan']}, zaten {args.bicim} {sayac['guncel']}, "
+          f"kayıplı {sayac['kayipli']}, hata {sayac['hata']}")
+    if sayac["dokuman"]:
+        taban_d, taban_r = toplam["harita"]
+        print(f"\n  {'biçim':<8} {'depolama':>12} {'REST JSON':>12}")
+        for b, (depolama, rest) in toplam.items():
+            print(f"  {b:<8} {depolama:>10,} B {rest:>10,} B  "
+                  f"({depolama / taban_d:.0%} / {rest / taban_r:.0%} harita'nın)")
+    return 1 if sayac["hata"] else 0
+
+
+if __name__ == "__main__":
+    with olcum.calistirma("fiyat_serisi_gocu"):
+        kod = main()
+    sys.exit(kod)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Firestore Değer Kodlayıcı (REST Value JSON)
+============================================
+main.py, price_tracker.py, backfill_prices.py ve ipo_modeli.py'deki _to_fv /
+_from_fv kopyalarının yerine. İki katman:
+
+  to_fv(deger) / from_fv(fv)     Genel: eski kopyalarla aynı çıktı; tam tip
+                                 karşılaştırması, sık tipler önce.
+
+  sema = Sema({"durum": str, "fiyat_gecmisi": {str: float}, ...})
+  sema.kodla(doc)                → {"alan": Value, ...}
+  sema.coz(fields)               → {"alan": deger, ...}
+  sema.coz(fields, ("durum",))   → sadece istenen alanlar çözülür, gerisine dokunulmaz
+
+Şema dili: str / int / float / bool / bytes, {str: T} (değerleri aynı tipte harita —
+fiyat_gecmisi gibi), [T] (dizi), {"alan": T, ...} (bilinen alanlı iç içe harita),
+None (genel). Şema derlenirken her alan için özel kodlayıcı/çözücü kurulur;
+değer beklenen tipte değilse (son_fiyat bazen metin) genel yola düşer. Çıktı
+her durumda genel to_fv/from_fv ile aynıdır; şemada olmayan alanlar da genel
+yoldan geçer.
+
+SIL: fs_set(..., merge=True) verisinde bir alanın değeri SIL ise alan gövdeye
+yazılmaz ama updateMask'te kalır — Firestore alanı siler.
+alan_yolu(ad): updateMask.fieldPaths için alan adı (basit değilse `ters tırnaklı`).
+"""
+
+import base64
+import re
+from array import array
+
+SIL = object()  # merge yazımında "bu alanı sil" işareti (kodla onu gövdeden atar)
+_BASIT_ALAN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def alan_yolu(ad: str) -> str:
+    """Firestore alan yolu: "yeni_arz_ABC" olduğu gibi, "durum-x.y" → `durum-x.y`."""
+    if _BASIT_ALAN.fullmatch(ad):
+        return ad
+    return "`" + ad.replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GENEL
+# ═══════════════════════════════════════════════════════════════════
+def to_fv(val):
+    t = type(val)  # Tam tip karşılaştırması: en sık tipler önce, isinstance zinciri yok
+    if t is str: return {"stringValue": val}
+    if t is float: return {"doubleValue": val}
+    if t is int: return {"integerValue": str(val)}
+    if t is bool: return {"booleanValue": val}
+    if t is dict: return {"mapValue": {"fields": {k: to_fv(v) for k, v in val.items()}}}
+    if t is list or t is tuple or t is array: return {"arrayValue": {"values": [to_fv(v) for v in val]}}
+    if val is None: return {"nullValue": None}
+    if t is bytes: return {"bytesValue": base64.b64encode(val).decode("ascii")}
+    # Alt sınıflar (IntEnum, OrderedDict ...) için eski isinstance sırası
+    if isinstance(val, bool): return {"booleanValue": val}
+    if isinstance(val, int): return {"integerValue": str(val)}
+    if isinstance(val, float): return {"doubleValue": val}
+    if isinstance(val, str): return {"stringValue": val}
+    if isinstance(val, (list, tuple)): return {"arrayValue": {"values": [to_fv(v) for v in val]}}
+    if isinstance(val, dict): return {"mapValue": {"fields": {k: to_fv(v) for k, v in val.items()}}}
+    return {"stringValue": str(val)}
+
+
+def from_fv(fv):
+    if "stringValue" in fv: return fv["stringValue"]
+    if "doubleValue" in fv: return fv["doubleValue"]
+    if "integerValue" in fv: return int(fv["integerValue"])
+    if "booleanValue" in fv: return fv["booleanValue"]
+    if "mapValue" in fv: return {k: from_fv(v) for k, v in fv["mapValue"].get("fields", {}).items()}
+    if "arrayValue" in fv: return [from_fv(v) for v in fv["arrayValue"].get("values", [])]
+    if "bytesValue" in fv: return base64.b64decode(fv["bytesValue"])
+    return None  # nullValue ya da bilinmeyen tür
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ŞEMA DERLEYİCİ
+# ═══════════════════════════════════════════════════════════════════
+# Skaler tip → (Value anahtarı, Value → değer)
+_SKALER = {
+    str: ("stringValue", None),
+    int: ("integerValue", int),
+    float: ("doubleValue", None),
+    bool: ("booleanValue", None),
+}
+
+
+def _kodlayici(spec):
+    if spec is None or spec is bytes:
+        return to_fv
+    if isinstance(spec, type) and spec in _SKALER:
+        anahtar = _SKALER[spec][0]
+        if spec is int:
+            return lambda v: {"integerValue": str(v)} if type(v) is int else to_fv(v)
+        return lambda v: {anahtar: v} if type(v) is spec else to_fv(v)
+    if isinstance(spec, list):
+        ic = _kodlayici(spec[0])
+        return lambda v: {"arrayValue": {"values": [ic(x) for x in v]}} if type(v) is list else to_fv(v)
+    if isinstance(spec, dict) and list(spec) == [str]:
+        deger_spec = spec[str]
+        if deger_spec in (str, float, bool):  # En sık yol (fiyat_gecmisi): iç çağrı yok
+            anahtar = _SKALER[deger_spec][0]
+            return lambda v: {"mapValue": {"fields": {
+                k: {anahtar: x} if type(x) is deger_spec else to_fv(x) for k, x in v.items()
+            }}} if type(v) is dict else to_fv(v)
+        ic = _kodlayici(deger_spec)
+        return lambda v: {"mapValue": {"fields": {k: ic(x) for k, x in v.items()}}} if type(v) is dict else to_fv(v)
+    if isinstance(spec, dict):
+        ic_sema = Sema(spec)
+        return lambda v: {"mapValue": {"fields": ic_sema.kodla(v)}} if type(v) is dict else to_fv(v)
+    raise ValueError(f"Bilinmeyen şema tipi: {spec!r}")
+
+
+def _cozucu(spec):
+    if spec is None or spec is bytes:
+        return from_fv
+    if isinstance(spec, type) and spec in _SKALER:
+        anahtar, cevir = _SKALER[spec]
+        if cevir is None:
+            return lambda fv: fv[anahtar] if anahtar in fv else from_fv(fv)
+        return lambda fv: cevir(fv[anahtar]) if anahtar in fv else from_fv(fv)
+    if isinstance(spec, list):
+        ic = _cozucu(spec[0])
+        return lambda fv: [ic(x) for x in fv["arrayValue"].get("values", [])] if "arrayValue" in fv else from_fv(fv)
+    if isinstance(spec, dict) and list(spec) == [str]:
+        deger_spec = spec[str]
+        if deger_spec in (str, float, bool):
+            anahtar = _SKALER[deger_spec][0]
+            return lambda fv: {
+                k: x[anahtar] if anahtar in x else from_fv(x) for k, x in fv["mapValue"].get("fields", {}).items()
+            } if "mapValue" in fv else from_fv(fv)
+        ic = _cozucu(deger_spec)
+        return lambda fv: {
+            k: ic(x) for k, x in fv["mapValue"].get("fields", {}).items()
+        } if "mapValue" in fv else from_fv(fv)
+    if isinstance(spec, dict):
+        ic_sema = Sema(spec)
+        return lambda fv: ic_sema.coz(fv["mapValue"].get("fields", {})) if "mapValue" in fv else from_fv(fv)
+    raise ValueError(f"Bilinmeyen şema tipi: {spec!r}")
+
+
+class Sema:
+    """Bilinen bir doküman şeması için derlenmiş kodlayıcı/çözücü."""
+
+    def __init__(self, alanlar: dict):
+        self.alanlar = alanlar
+        self._kodlayicilar = {ad: _kodlayici(spec) for ad, spec in alanlar.items()}
+        self._cozuculer = {ad: _cozucu(spec) for ad, spec in alanlar.items()}
+
+    def kodla(self, veri: dict) -> dict:
+        k = self._kodlayicilar
+        return {ad: k.get(ad, to_fv)(deger) for ad, deger in veri.items() if deger is not SIL}
+
+    def coz(self, fields: dict, alanlar=None) -> dict:
+        """fields → sözlük; alanlar verilirse sadece onlar çözülür."""
+        c = self._cozuculer
+        if alanlar is None:
+            return {ad: c.get(ad, from_fv)(fv) for ad, fv in fields.items()}
+        return {ad: c.get(ad, from_fv)(fields[ad]) for ad in alanlar if ad in fields}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ŞEMALAR
+# ═══════════════════════════════════════════════════════════════════
+# halka_arzlar/<KOD> (main.py build_doc + price_tracker/backfill fiyat_gecmisi)
+HALKA_ARZ = Sema({
+    "sirket_kodu": str, "sirket_adi": str, "durum": str, "tarih": str,
+    "arz_fiyati": float, "toplam_lot": int, "dagitim_sekli": str, "konsorsiyum_lideri": str,
+    "katilim_endeksine_uygun": bool, "kisi_basi_lot": str, "bireysel_lot": int, "bireysel_yuzde": int,
+    "sirket_aciklama": str, "pazar": str, "bist_ilk_islem_tarihi": str, "guncelleme_zamani": str,
+    "son_fiyat": float,               # ya da "Borsaya açılmadı henüz" (genel yol)
+    "fiyat_gecmisi": {str: float},    # {"YYYY-MM-DD": kapanış}
+    "fiyat_serisi": None,             # Sıkıştırılmış geçmiş: bytes (paket) ya da sütun haritası (bkz. fiyat_serisi.py)
+})
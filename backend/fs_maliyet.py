@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Firestore Maliyet Sayacı
+========================
+Firestore doküman başına ücretlendirir: her okunan doküman 1 okuma (404 ve
+boş sorgu sonucu da 1 okuma), her yazma/silme 1 işlem. Betiklerdeki fs_*
+yardımcıları her istekten sonra say() çağırır; sayaçlar çağrı yerine
+(fs_* yardımcısını çağıran fonksiyon) göre tutulur:
+
+  "main.main"                         → okuma 41, yazma 20, silme 1
+  "price_tracker.get_islem_hisseleri" → okuma 38
+
+Çalıştırma sonunda olcum raporuna "firestore" bölümü olarak eklenir.
+gunluk_ozet_yaz() aynı sayıları meta/cost_stats dokümanına, gün ve betik
+bazında increment transform'larıyla ekler:
+
+  meta/cost_stats.gunler.`2026-10-19`.price_tracker.{okuma,yazma,silme,bayt,calistirma}
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+import olcum
+from bist_takvimi import TR_TZ
+
+ISLEMLER = ("okuma", "yazma", "silme")
+MALIYET_DOC = "meta/cost_stats"
+
+_kilit = threading.Lock()
+_sayaclar: dict[str, dict[str, int]] = {}  # çağrı yeri → {okuma, yazma, silme, bayt, istek}
+
+# Çağrı yeri ararken atlanan çerçeveler: sayılan yardımcılar ve sarmalayıcılar
+_ATLANAN_DOSYALAR = {os.path.abspath(__file__), os.path.abspath(olcum.__file__)}
+_ATLANAN_ONEKLER = ("fs_", "_fs_")
+
+
+def _cagri_yeri() -> str:
+    f = sys._getframe(2)
+    while f is not None:
+        kod = f.f_code
+        if (os.path.abspath(kod.co_filename) not in _ATLANAN_DOSYALAR
+                and not kod.co_name.startswith(_ATLANAN_ONEKLER)
+                and kod.co_name != "sarmal"
+                and "contextlib" not in kod.co_filename):
+            modul = os.path.splitext(os.path.basename(kod.co_filename))[0]
+            return f"{modul}.{getattr(kod, 'co_qualname', kod.co_name)}"
+        f = f.f_back
+    return "?"
+
+
+def say(islem: str, adet: int = 1, bayt: int = 0, yer: str = None):
+    """Bir Firestore isteğini kaydeder. islem: okuma | yazma | silme; adet: doküman sayısı."""
+    yer = yer or _cagri_yeri()
+    with _kilit:
+        s = _sayaclar.setdefault(yer, {"okuma": 0, "yazma": 0, "silme": 0, "bayt": 0, "istek": 0})
+        s[islem] += adet
+        s["bayt"] += bayt
+        s["istek"] += 1
+
+
+def yanit_say(islem: str, r, adet: int = 1):
+    """requests yanıtından bayt sayısını (gönderilen + alınan) çıkarıp say()'e iletir."""
+    govde = r.request.body if r.request is not None else None
+    bayt = len(r.content or b"") + (len(govde) if isinstance(govde, (bytes, str)) else 0)
+    say(islem, adet, bayt, yer=_cagri_yeri())
+
+
+def toplam() -> dict[str, int]:
+    t = {"okuma": 0, "yazma": 0, "silme": 0, "bayt": 0, "istek": 0}
+    with _kilit:
+        for s in _sayaclar.values():
+            for k in t:
+                t[k] += s[k]
+    return t
+
+
+def rapor() -> dict:
+    with _kilit:
+        yerler = dict(sorted(_sayaclar.items(), key=lambda x: -(x[1]["okuma"] + x[1]["yazma"] + x[1]["silme"])))
+    return {"toplam": toplam(), "cagri_yerleri": yerler}
+
+
+def _markdown(r) -> str:
+    t = r["toplam"]
+    satirlar = [f"**Firestore:** {t['okuma']} okuma, {t['yazma']} yazma, {t['silme']} silme, "
+                f"{t['bayt'] / 1024:.0f} KB", "",
+                "| Çağrı yeri | Okuma | Yazma | Silme | KB |", "|---|---:|---:|---:|---:|"]
+    for yer, s in r["cagri_yerleri"].items():
+        satirlar.append(f"| {yer} | {s['okuma']} | {s['yazma']} | {s['silme']} | {s['bayt'] / 1024:.0f} |")
+    return "\n".join(satirlar) + "\n"
+
+
+olcum.rapor_bolumu("firestore", rapor, _markdown)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GÜNLÜK TOPLAM → meta/cost_stats
+# ═══════════════════════════════════════════════════════════════════
+def _int(n):
+    return {"integerValue": str(int(n))}
+
+
+def gunluk_artislar() -> tuple[str, dict[str, int]]:
+    """(bugün "YYYY-MM-DD", {okuma, yazma, silme, bayt, calistirma}) — SDK kullanan betikler için."""
+    t = toplam()
+    artis = {k: t[k] for k in (*ISLEMLER, "bayt")}
+    artis["calistirma"] = 1
+    return datetime.now(TR_TZ).strftime("%Y-%m-%d"), artis
+
+
+def gunluk_ozet_yaz(betik: str, proje_id: str, token_fn, http=None) -> bool:
+    """
+    Bu çalıştırmanın toplamlarını meta/cost_stats'a tek bir commit ile ekler
+    (atomik increment — eşzamanlı işler birbirinin sayısını ezmez).
+    token_fn sadece yazılacak bir şey varsa çağrılır.
+    """
+    t = toplam()
+    if not t["istek"]:
+        return True
+    token = token_fn() if proje_id else None
+    if not token:
+        return False
+    import requests
+    http = http or requests
+
+    gun, artis = gunluk_artislar()
+    belge = f"projects/{proje_id}/databases/(default)/documents/{MALIYET_DOC}"
+    onek = f"gunler.`{gun}`.`{betik}`"
+    donusumler = [{"fieldPath": f"{onek}.{k}", "increment": _int(v)} for k, v in artis.items()]
+    donusumler.append({"fieldPath": "guncelleme", "setToServerValue": "REQUEST_TIME"})
+    try:
+        r = http.post(
+            f"https://firestore.googleapis.com/v1/projects/{proje_id}/databases/(default)/documents:commit",
+            json={"writes": [{"transform": {"document": belge, "fieldTransforms": donusumler}}]},
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15,
+        )
+        if r.status_code != 200:
+            print(f"[UYARI] Firestore maliyet özeti yazılamadı: {r.status_code}")
+            return False
+        print(f"[BİLGİ] Firestore maliyeti: {t['okuma']} okuma, {t['yazma']} yazma, {t['silme']} silme → {MALIYET_DOC}")
+        return True
+    except Exception as e:
+        print(f"[UYARI] Firestore maliyet özeti yazılamadı: {e}")
+        return False
@@ -9,17 +9,22 @@ ve ipos.json'a merge eder.
 GitHub Actions: Günde 1 kez (TR 10:00) çalışır.
 """
 
-import json
 import os
 import re
 import random
-import time
 from datetime import datetime
 from typing import Optional
 
 import requests
 from bs4 import BeautifulSoup
 
+import dayanikli_http
+import http_kaset
+import ipo_deposu
+import olcum
+from ipo_deposu import IpoDeposu
+from ipo_modeli import Ipo
+
 # --- Yapılandırma ---
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 IPOS_FILE = os.path.join(DATA_DIR, "ipos.json")
@@ -50,9 +55,9 @@ AY_MAP = {
 def safe_get(url: str, timeout: int = 15) -> Optional[requests.Response]:
     """Rate-limited HTTP GET."""
     delay = random.uniform(1.0, 2.5)
-    time.sleep(delay)
+    http_kaset.bekle(delay)
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
+        resp = dayanikli_http.getir(url, headers=HEADERS, timeout=timeout)
         resp.raise_for_status()
         return resp
     except requests.RequestException as e:
@@ -139,7 +144,8 @@ def clean_lot(text: str) -> int:
 def fetch_details(url: str) -> tuple[float, int, str]:
     if not url: return 0.0, 0, "Eşit"
     resp = safe_get(url)
-    if not resp: return 0.0, 0, "Eşit"
+    # Çekilemedi: boş/sıfır değerler merge_scraped_data'da mevcut kaydın üzerine yazılmaz
+    if not resp: return 0.0, 0, ""
 
     soup = BeautifulSoup(resp.text, 'html.parser')
     arz_fiyati = 0.0
@@ -242,130 +248,67 @@ def scrape_ilk_halka_arzlar() -> list[dict]:
 
 # ─── Merge ──────────────────────────────────────────────────────
 
-def load_ipos() -> list[dict]:
-    """Mevcut ipos.json dosyasını yükler."""
-    if not os.path.exists(IPOS_FILE):
-        return []
-    try:
-        with open(IPOS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"[HATA] ipos.json okuma: {e}")
-        return []
-
-
-def save_ipos(ipos: list[dict]):
-    """ipos.json dosyasına yazar."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(IPOS_FILE, "w", encoding="utf-8") as f:
-        json.dump(ipos, f, ensure_ascii=False, indent=2)
-    print(f"[✓] {len(ipos)} kayıt → ipos.json")
-
-
 def create_new_ipo_entry(scraped: dict) -> dict:
     """Yeni bir IPO kaydı oluşturur (ipos.json formatında)."""
-    return {
-        "sirket_kodu": scraped["sirket_kodu"],
-        "sirket_adi": scraped["sirket_adi"],
-        "arz_fiyati": 0,
-        "toplam_lot": 0,
-        "kisi_basi_lot": 1,
-        "dagitim_sekli": "Eşit",
-        "konsorsiyum_lideri": "",
-        "iskonto_orani": 0.0,
-        "fon_kullanim_yeri": {
-            "yatirim": 0,
-            "borc_odeme": 0,
-            "isletme_sermayesi": 0
-        },
-        "katilim_endeksine_uygun": False,
-        "talep_baslangic": "",
-        "talep_bitis": "",
-        "borsada_islem_tarihi": "",
-        "durum": scraped["durum"],
-        "son_katilimci_sayilari": [],
-        "guncelleme_zamani": datetime.now().isoformat(),
-    }
-
-
-def merge_scraped_data(existing: list[dict], scraped: list[dict]) -> list[dict]:
+    return Ipo(
+        sirket_kodu=scraped["sirket_kodu"],
+        sirket_adi=scraped["sirket_adi"],
+        durum=scraped["durum"],
+        kisi_basi_lot="1",
+        guncelleme_zamani=datetime.now().isoformat(),
+    ).to_dict()
+
+
+def merge_scraped_data(depo: IpoDeposu, scraped: list[dict]) -> tuple[int, int]:
     """
-    Kazınan verileri mevcut ipos.json ile birleştirir.
+    Kazınan verileri IPO deposuyla birleştirir (sadece değişen satırlar yazılır).
     - Mevcut şirketlerin durum bilgisini günceller
     - Yeni şirketleri ekler
     - Mevcut sparkline/fiyat verilerini korur
+    Dönüş: (yeni, güncellenen) kayıt sayısı
     """
-    # Mevcut verileri dict'e çevir (kod -> kayıt)
-    existing_dict = {}
-    for ipo in existing:
-        code = ipo.get("sirket_kodu", "").upper()
-        if code:
-            existing_dict[code] = ipo
-
     new_count = 0
     updated_count = 0
 
     for item in scraped:
-        code = item["sirket_kodu"].upper()
-
-        # BIST kodu boşsa şirket adından tanımlama yapılamaz, atla
-        if not code:
-            # Kodusuz kayıtları şirket adıyla eşleştirmeye çalış
-            found = False
-            for ex_code, ex_ipo in existing_dict.items():
-                if ex_ipo.get("sirket_adi", "").lower() == item["sirket_adi"].lower():
-                    code = ex_code
-                    found = True
-                    break
-            if not found:
-                # Yeni ve kodsuz → yine de ekle (şirket adı bazlı)
-                new_entry = create_new_ipo_entry(item)
-                existing_dict[f"_nocode_{item['sirket_adi'][:20]}"] = new_entry
-                new_count += 1
-                print(f"  [YENİ] {item['sirket_adi']} (kod yok) → {item['durum']}")
-                continue
-
-        if code in existing_dict:
+        # Kod indeksi; kod yoksa normalize ad / parmak izi indeksi.
+        # Kodsuz kayda gerçek kod geldiyse kayıt o koda bağlanır.
+        code = depo.esle(item["sirket_kodu"], item["sirket_adi"])
+        mevcut = depo.getir(code) if code else None
+        if mevcut:
             # Mevcut kayıt — durumu ve tarihleri güncelle
-            old_durum = existing_dict[code].get("durum", "")
+            degisiklik = {}
+            old_durum = mevcut.get("durum", "")
             new_durum = item["durum"]
-            
-            updated = False
             if old_durum != new_durum:
-                existing_dict[code]["durum"] = new_durum
-                updated = True
+                degisiklik["durum"] = new_durum
                 print(f"  [GÜNCELLE] {code}: {old_durum} → {new_durum}")
-            
+
             # Tarihleri de tazele (eskiden boş kalmış olabilir)
             for field in ["talep_baslangic", "talep_bitis", "tarih_raw"]:
-                if item.get(field) and not existing_dict[code].get(field):
-                    existing_dict[code][field] = item[field]
-                    updated = True
+                if item.get(field) and not mevcut.get(field):
+                    degisiklik[field] = item[field]
 
             # Performans ve detay bilgileri tazele
             for field in ["arz_fiyati", "toplam_lot"]:
-                if item.get(field) and (existing_dict[code].get(field, 0) == 0):
-                    existing_dict[code][field] = item[field]
-                    updated = True
-            
-            if item.get("dagitim_sekli") and existing_dict[code].get("dagitim_sekli") != item["dagitim_sekli"]:
-                existing_dict[code]["dagitim_sekli"] = item["dagitim_sekli"]
-                updated = True
-
-            if updated:
-                existing_dict[code]["guncelleme_zamani"] = datetime.now().isoformat()
+                if item.get(field) and (mevcut.get(field, 0) == 0):
+                    degisiklik[field] = item[field]
+
+            if item.get("dagitim_sekli") and mevcut.get("dagitim_sekli") != item["dagitim_sekli"]:
+                degisiklik["dagitim_sekli"] = item["dagitim_sekli"]
+
+            if degisiklik:
+                degisiklik["guncelleme_zamani"] = datetime.now().isoformat()
+                depo.guncelle(code, degisiklik)
                 updated_count += 1
         else:
-            # Yeni kayıt
-            new_entry = create_new_ipo_entry(item)
-            existing_dict[code] = new_entry
+            # Yeni kayıt (kodsuzsa şirket adı bazlı anahtarla)
+            depo.ekle(create_new_ipo_entry(item))
             new_count += 1
-            print(f"  [YENİ] {code} ({item['sirket_adi']}) → {item['durum']}")
+            print(f"  [YENİ] {item['sirket_kodu'] or '(kod yok)'} ({item['sirket_adi']}) → {item['durum']}")
 
     print(f"\n[Merge ✓] {new_count} yeni, {updated_count} güncellenen kayıt.")
-
-    # Dict'ten listeye çevir
-    return list(existing_dict.values())
+    return new_count, updated_count
 
 
 # ─── Ana Fonksiyon ──────────────────────────────────────────────
@@ -381,24 +324,21 @@ def main():
         print("[UYARI] Kazıma sonucu boş, işlem durduruluyor.")
         return
 
-    # 2. Mevcut ipos.json yükle
-    existing = load_ipos()
-    print(f"\n[2/3] Mevcut ipos.json: {len(existing)} kayıt")
-
-    # 3. Merge
-    print(f"\n[3/3] Merge işlemi başlıyor...")
-    merged = merge_scraped_data(existing, scraped)
+    # 2. IPO deposunu aç (çıkışta değişiklik varsa ipos.json dışa aktarılır)
+    with ipo_deposu.ac(IPOS_FILE) as depo:
+        print(f"\n[2/3] Mevcut IPO deposu: {len(depo)} kayıt")
 
-    # 4. Kaydet
-    save_ipos(merged)
+        # 3. Merge
+        print(f"\n[3/3] Merge işlemi başlıyor...")
+        merge_scraped_data(depo, scraped)
+        sayilar = depo.sayilar()
 
     # İstatistikler
-    taslak = sum(1 for i in merged if i.get("durum") == "taslak")
-    talep = sum(1 for i in merged if i.get("durum") == "talep_topluyor")
-    islem = sum(1 for i in merged if i.get("durum") == "islem_goruyor")
-    print(f"\n[İSTATİSTİK] Taslak: {taslak} | Talep: {talep} | İşlem: {islem}")
+    print(f"\n[İSTATİSTİK] Taslak: {sayilar.get('taslak', 0)} | Talep: {sayilar.get('talep_topluyor', 0)} "
+          f"| İşlem: {sayilar.get('islem_goruyor', 0)}")
     print("=" * 60)
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("halkarz_scraper"):
+        main()
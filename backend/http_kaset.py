@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+HTTP Kaset — Kazıyıcılar İçin Kayıt / Tekrar
+=============================================
+Tüm kazıyıcıların safe_get/safe_request'i buradan geçer:
+
+  HALKARZ_HTTP_MODE=record  → gerçek istek yapılır, yanıt (URL, durum, başlıklar,
+                              gövde) kasete eklenir
+  HALKARZ_HTTP_MODE=replay  → ağa çıkılmaz, bekleme yapılmaz; yanıt kasetten gelir.
+                              Kasette olmayan URL bağlantı hatası gibi davranır.
+  (boş)                     → normal çalışma
+
+Kaset: HALKARZ_HTTP_CASSETTE (varsayılan data/cassettes/halkarz.jsonl.gz).
+Her kayıt çalıştırması dosyaya yeni bir gzip üyesi olarak eklenir (JSON satırları),
+böylece aylar boyunca biriken sayfalar tek dosyada durur. Tekrar modunda her URL
+için en yeni kayıt kullanılır; HALKARZ_HTTP_AT=YYYY-MM-DD[THH:MM] verilirse o
+andan önceki en yeni kayıt (ayrıştırıcıyı geçmiş sayfalara karşı denemek için).
+
+  python http_kaset.py                 # kasetteki URL/kayıt özeti
+  python http_kaset.py --url <URL>     # bir URL'nin kayıt zamanları
+"""
+
+import atexit
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+VARSAYILAN_KASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cassettes", "halkarz.jsonl.gz")
+# Tekrarda anlamlı olan başlıklar; Set-Cookie vb. kasete yazılmaz
+SAKLANAN_BASLIKLAR = ("Content-Type", "Content-Encoding", "Last-Modified", "ETag", "Location")
+
+
+def mod() -> str:
+    return os.environ.get("HALKARZ_HTTP_MODE", "").strip().lower()
+
+
+def kaset_yolu() -> str:
+    return os.environ.get("HALKARZ_HTTP_CASSETTE") or VARSAYILAN_KASET
+
+
+# ═══════════════════════════════════════════════════════════════════
+# KASET DOSYASI
+# ═══════════════════════════════════════════════════════════════════
+def kayitlar(path: Optional[str] = None):
+    """Kasetteki tüm kayıtlar, yazılma sırasıyla."""
+    path = path or kaset_yolu()
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for satir in f:
+            if satir.strip():
+                yield json.loads(satir)
+
+
+def _govde_kodla(icerik: bytes) -> dict:
+    try:
+        return {"govde": icerik.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"govde_b64": base64.b64encode(icerik).decode("ascii")}
+
+
+def _govde_coz(kayit) -> bytes:
+    if "govde_b64" in kayit:
+        return base64.b64decode(kayit["govde_b64"])
+    return kayit.get("govde", "").encode("utf-8")
+
+
+def yanit_olustur(kayit) -> requests.Response:
+    """Kasetteki kayıttan gerçek bir requests.Response üretir (raise_for_status, .text çalışır)."""
+    r = requests.Response()
+    r.status_code = kayit["durum"]
+    r.url = kayit.get("son_url", kayit["url"])
+    r.headers = CaseInsensitiveDict(kayit.get("basliklar", {}))
+    r._content = _govde_coz(kayit)
+    r.encoding = get_encoding_from_headers(r.headers)
+    r.reason = "Kaset"
+    return r
+
+
+class _Kaydedici:
+    """Kayıt modunda yanıtları biriktirir; süreç sonunda tek gzip üyesi olarak ekler."""
+
+    def __init__(self, path):
+        self.path = path
+        self.bekleyen = []
+        self.kilit = threading.Lock()
+        atexit.register(self.yaz)
+
+    def ekle(self, url, r: requests.Response):
+        kayit = {
+            "url": url,
+            "zaman": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "durum": r.status_code,
+            "basliklar": {k: r.headers[k] for k in SAKLANAN_BASLIKLAR if k in r.headers},
+            **_govde_kodla(r.content),
+        }
+        if r.url != url:
+            kayit["son_url"] = r.url  # Yönlendirme
+        with self.kilit:
+            self.bekleyen.append(kayit)
+
+    def yaz(self):
+        with self.kilit:
+            bekleyen, self.bekleyen = self.bekleyen, []
+        if not bekleyen:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for kayit in bekleyen:
+                f.write(json.dumps(kayit, ensure_ascii=False) + "\n")
+        print(f"[KASET] {len(bekleyen)} yanıt kaydedildi → {self.path}")
+
+
+class _Oynatici:
+    def __init__(self, path, an: Optional[str]):
+        self.indeks = {}
+        for kayit in kayitlar(path):
+            if an and kayit["zaman"][:len(an)] > an:
+                continue
+            # Sonraki kayıt öncekini ezer → en yeni kayıt kalır
+            self.indeks[kayit["url"]] = kayit
+        print(f"[KASET] Tekrar modu: {len(self.indeks)} URL ({path})")
+
+    def bul(self, url):
+        return self.indeks.get(url) or self.indeks.get(url.rstrip("/")) or self.indeks.get(url.rstrip("/") + "/")
+
+
+_kaydedici = None
+_oynatici = None
+_kilit = threading.Lock()
+
+
+def _kaydedici_al():
+    global _kaydedici
+    with _kilit:
+        if _kaydedici is None or _kaydedici.path != kaset_yolu():
+            _kaydedici = _Kaydedici(kaset_yolu())
+        return _kaydedici
+
+
+def _oynatici_al():
+    global _oynatici
+    with _kilit:
+        if _oynatici is None:
+            _oynatici = _Oynatici(kaset_yolu(), os.environ.get("HALKARZ_HTTP_AT") or None)
+        return _oynatici
+
+
+# ═══════════════════════════════════════════════════════════════════
+# KAZIYICILARIN KULLANDIĞI ARAYÜZ
+# ═══════════════════════════════════════════════════════════════════
+def get(url, headers=None, timeout=15) -> requests.Response:
+    """requests.get yerine. Tekrar modunda kasette yoksa requests.ConnectionError fırlatır."""
+    m = mod()
+    if m == "replay":
+        kayit = _oynatici_al().bul(url)
+        if kayit is None:
+            raise requests.ConnectionError(f"kasette kayıt yok: {url}")
+        return yanit_olustur(kayit)
+    r = requests.get(url, headers=headers, timeout=timeout)
+    if m == "record":
+        _kaydedici_al().ekle(url, r)
+    return r
+
+
+def bekle(saniye: float):
+    """Nazik kazıma beklemesi; tekrar modunda atlanır."""
+    if mod() != "replay":
+        time.sleep(saniye)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP kaset özeti")
+    parser.add_argument("--kaset", default=None)
+    parser.add_argument("--url", help="Bu URL'nin kayıtlarını listele")
+    args = parser.parse_args()
+
+    yol = args.kaset or kaset_yolu()
+    sayac, son, boyut = {}, {}, 0
+    for k in kayitlar(yol):
+        if args.url and k["url"] != args.url:
+            continue
+        sayac[k["url"]] = sayac.get(k["url"], 0) + 1
+        son[k["url"]] = k["zaman"]
+        boyut += len(k.get("govde") or k.get("govde_b64", ""))
+        if args.url:
+            print(f"  {k['zaman']}  {k['durum']}  {len(_govde_coz(k)) / 1024:.0f} KB")
+    if not args.url:
+        for url in sorted(sayac):
+            print(f"  {sayac[url]:>4}×  son {son[url]}  {url}")
+    print(f"\n{len(sayac)} URL, {sum(sayac.values())} kayıt, {boyut / 1024 / 1024:.1f} MB (açılmış) — {yol}")
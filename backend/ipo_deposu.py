@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+IPO Deposu — ipos.json Arkasında İndeksli SQLite
+================================================
+scraper, halkarz_scraper, ipo_price_scraper ve price_checker kayıtları buradan
+okur/yazar; her seferinde tüm listeyi yükleyip sözlük kurmak ve hepsini yeniden
+yazmak yerine:
+
+  with ipo_deposu.ac() as depo:
+      depo.getir("EMPAE")                       # sirket_kodu indeksi
+      depo.durumdakiler("islem_goruyor")        # durum indeksi
+      depo.guncelle("EMPAE", {"arz_fiyati": 22})  # kısmi alan güncellemesi
+      depo.upsert(kayit)                        # yoksa ekle, varsa alanları birleştir
+
+Sadece değeri gerçekten değişen satırlar yazılır; çıkışta bir şey değiştiyse
+ipos.json (ve ipos.min.json.gz) depodan dışa aktarılır — ipos.json artık bir
+dışa aktarımdır. Veritabanı data/ipos.sqlite3'tedir (HALKARZ_IPO_DB, git'e
+girmez); ipos.json son dışa aktarımdan farklıysa (git pull, elle düzenleme)
+açılışta depo ondan yeniden kurulur.
+
+Kazanç yalnızca veritabanının çalıştırmalar arasında yaşadığı yerdedir: yerel
+çalıştırmalar ve kalıcı diski olan sunucular. GitHub Actions iş akışları
+(halka_arz_bot: main.py, price_tracker: price_tracker.py) ipos.json betiklerini
+çalıştırmaz; bunlar bir iş akışına eklenirse data/ipos.sqlite3 actions/cache ile
+hashFiles('backend/data/ipos.json') anahtarıyla saklanmalıdır, yoksa her
+çalıştırma depoyu _doldur ile ipos.json'dan baştan kurar (doğru ama tam tarama).
+
+Kodsuz kayıtlar "_nocode_<ad[:20]>" anahtarıyla tutulur (halkarz_scraper'ın
+eski sözlük anahtarı); scraper.py'nin eski "TAS_xxxx" kayıtları da kodsuz
+sayılır. Ad eşleşmesi ad_esleme.normalize / parmak_izi indekslerinden yapılır;
+esle() kodsuz bir kayda gerçek kod geldiğinde onu o koda bağlar. Dışa aktarım
+sırası ekleme sırasıdır.
+"""
+
+import hashlib
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Optional
+
+import ad_esleme
+import veri_dosyasi
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+IPOS_FILE = os.path.join(DATA_DIR, "ipos.json")
+VARSAYILAN_DB = os.path.join(DATA_DIR, "ipos.sqlite3")
+SEMA_SURUMU = 2  # Değişince yerel veritabanı silinip ipos.json'dan yeniden kurulur
+
+SEMA = """
+CREATE TABLE IF NOT EXISTS ipos (
+    anahtar              TEXT PRIMARY KEY,
+    sira                 INTEGER NOT NULL,
+    sirket_kodu          TEXT NOT NULL DEFAULT '',
+    ad_norm              TEXT NOT NULL DEFAULT '',
+    ad_iz                TEXT NOT NULL DEFAULT '',
+    durum                TEXT,
+    talep_baslangic      TEXT,
+    talep_bitis          TEXT,
+    borsada_islem_tarihi TEXT,
+    veri                 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ipos_kod ON ipos(sirket_kodu);
+CREATE INDEX IF NOT EXISTS ipos_ad ON ipos(ad_norm);
+CREATE INDEX IF NOT EXISTS ipos_iz ON ipos(ad_iz);
+CREATE INDEX IF NOT EXISTS ipos_durum ON ipos(durum, sira);
+CREATE INDEX IF NOT EXISTS ipos_talep ON ipos(talep_baslangic, talep_bitis);
+CREATE INDEX IF NOT EXISTS ipos_islem ON ipos(borsada_islem_tarihi);
+CREATE TABLE IF NOT EXISTS meta (anahtar TEXT PRIMARY KEY, deger TEXT);
+"""
+_INDEKSLI = ("durum", "talep_baslangic", "talep_bitis", "borsada_islem_tarihi")
+
+
+def anahtar_of(kayit: dict) -> str:
+    kod = (kayit.get("sirket_kodu") or "").strip().upper()
+    return kod or f"_nocode_{kayit.get('sirket_adi', '')[:20]}"
+
+
+def _gercek_kod(kayit: dict) -> str:
+    kod = (kayit.get("sirket_kodu") or "").strip().upper()
+    return "" if ad_esleme.gecici_kod_mu(kod) else kod
+
+
+def _anahtar(kod_veya_anahtar: str) -> str:
+    return kod_veya_anahtar if kod_veya_anahtar.startswith("_nocode_") else kod_veya_anahtar.upper()
+
+
+def _ozet(path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class IpoDeposu:
+    def __init__(self, db_yolu: str = ":memory:", json_yolu: Optional[str] = None):
+        self.json_yolu = json_yolu
+        self.db = sqlite3.connect(db_yolu)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SEMA_SURUMU:
+            self.db.executescript("DROP TABLE IF EXISTS ipos; DROP TABLE IF EXISTS meta;")
+            self.db.execute(f"PRAGMA user_version = {SEMA_SURUMU}")
+        self.db.executescript(SEMA)
+        self.degisen = 0
+        self.baglanan: set[str] = set()  # Bu oturumda kodsuz kayıttan koda bağlananlar (yeni sayılmaz)
+        self._sira = self.db.execute("SELECT COALESCE(MAX(sira), -1) + 1 FROM ipos").fetchone()[0]
+
+    @classmethod
+    def listeden(cls, ipos: list[dict]) -> "IpoDeposu":
+        """Bellek içi depo (benchmark/test; dışa aktarım yok)."""
+        depo = cls()
+        depo._doldur(ipos)
+        return depo
+
+    # ── İçe aktarma ──
+    def _doldur(self, ipos):
+        self.db.execute("DELETE FROM ipos")
+        self._sira = 0
+        for kayit in ipos:
+            anahtar = anahtar_of(kayit)
+            # Eski listede aynı kod iki kez varsa sonuncusu geçerli (eski dict davranışı)
+            self.db.execute("DELETE FROM ipos WHERE anahtar = ?", (anahtar,))
+            self._yaz(anahtar, kayit, self._sira)
+            self._sira += 1
+
+    def esitle(self):
+        """ipos.json son dışa aktarımdan farklıysa depoyu ondan yeniden kurar."""
+        ozet = _ozet(self.json_yolu)
+        if ozet is None or ozet == self._meta("json_ozet"):
+            return
+        ipos = veri_dosyasi.ipos_oku(self.json_yolu)
+        self._doldur(ipos)
+        self._meta_yaz("json_ozet", ozet)
+        self.db.commit()
+        print(f"[BİLGİ] IPO deposu ipos.json'dan kuruldu: {len(ipos)} kayıt")
+
+    def _meta(self, anahtar):
+        satir = self.db.execute("SELECT deger FROM meta WHERE anahtar = ?", (anahtar,)).fetchone()
+        return satir[0] if satir else None
+
+    def _meta_yaz(self, anahtar, deger):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (anahtar, deger))
+
+    # ── Yazma ──
+    def _yaz(self, anahtar, kayit, sira):
+        self.db.execute(
+            "INSERT OR REPLACE INTO ipos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (anahtar, sira, _gercek_kod(kayit), *ad_esleme.anahtarlar(kayit.get("sirket_adi", "")),
+             *(kayit.get(a) or None for a in _INDEKSLI), veri_dosyasi.dumps(kayit, girintili=False).decode("utf-8")),
+        )
+
+    def ekle(self, kayit: dict, anahtar: Optional[str] = None):
+        self._yaz(anahtar or anahtar_of(kayit), kayit, self._sira)
+        self._sira += 1
+        self.degisen += 1
+
+    def guncelle(self, kod_veya_anahtar: str, alanlar: dict) -> bool:
+        """Var olan kaydın alanlarını günceller; değer değişmediyse satıra dokunmaz."""
+        anahtar = _anahtar(kod_veya_anahtar)
+        satir = self.db.execute("SELECT sira, veri FROM ipos WHERE anahtar = ?", (anahtar,)).fetchone()
+        if not satir:
+            return False
+        kayit = veri_dosyasi.loads(satir[1])
+        if all(kayit.get(k) == v and k in kayit for k, v in alanlar.items()):
+            return False
+        kayit.update(alanlar)
+        self._yaz(anahtar, kayit, satir[0])
+        self.degisen += 1
+        return True
+
+    def _kod_bagla(self, anahtar: str, kod: str):
+        """Kodsuz kaydı gerçek koduna taşır (sırası korunur)."""
+        sira, veri = self.db.execute("SELECT sira, veri FROM ipos WHERE anahtar = ?", (anahtar,)).fetchone()
+        kayit = veri_dosyasi.loads(veri)
+        kayit["sirket_kodu"] = kod
+        self.db.execute("DELETE FROM ipos WHERE anahtar = ?", (anahtar,))
+        self._yaz(kod, kayit, sira)
+        self.degisen += 1
+        self.baglanan.add(kod)
+        print(f"  [BAĞLANDI] {kayit.get('sirket_adi', anahtar)}: {anahtar} → {kod}")
+
+    def esle(self, kod: str, sirket_adi: str) -> Optional[str]:
+        """
+        Gelen (kod, ad) için mevcut kaydın anahtarı; yoksa None.
+        Kod varsa kod indeksinden, yoksa ad indeksinden kodlu kayıt aranır; bulunamazsa
+        aynı adlı kodsuz kayıt döner — gelen kayıtta kod varsa önce o koda bağlanır.
+        """
+        kod = (kod or "").strip().upper()
+        if ad_esleme.gecici_kod_mu(kod):
+            kod = ""
+        if kod:
+            if self.db.execute("SELECT 1 FROM ipos WHERE anahtar = ?", (kod,)).fetchone():
+                return kod
+        else:
+            anahtar = self._ad_anahtari(sirket_adi, kodlu=True)
+            if anahtar:
+                return anahtar
+        kodsuz = self._ad_anahtari(sirket_adi, kodlu=False)
+        if kodsuz and kod:
+            self._kod_bagla(kodsuz, kod)
+            return kod
+        return kodsuz
+
+    def upsert(self, kayit: dict) -> Optional[str]:
+        """"yeni" | "guncel" | None (değişiklik yok)."""
+        if self.getir(anahtar_of(kayit)) is None:
+            self.ekle(kayit)
+            return "yeni"
+        return "guncel" if self.guncelle(anahtar_of(kayit), kayit) else None
+
+    # ── Okuma ──
+    def _liste(self, sql, params=()):
+        return [veri_dosyasi.loads(v) for (v,) in self.db.execute(sql, params)]
+
+    def getir(self, kod_veya_anahtar: str) -> Optional[dict]:
+        satir = self.db.execute("SELECT veri FROM ipos WHERE anahtar = ?", (_anahtar(kod_veya_anahtar),)).fetchone()
+        return veri_dosyasi.loads(satir[0]) if satir else None
+
+    def hepsi(self) -> list[dict]:
+        return self._liste("SELECT veri FROM ipos ORDER BY sira")
+
+    def durumdakiler(self, durum: str) -> list[dict]:
+        return self._liste("SELECT veri FROM ipos WHERE durum = ? ORDER BY sira", (durum,))
+
+    def _ad_anahtari(self, sirket_adi: str, kodlu: bool) -> Optional[str]:
+        """Önce normalize ad, sonra kelime kümesi parmak izi indeksinden."""
+        kosul = "sirket_kodu != ''" if kodlu else "sirket_kodu = ''"
+        for sutun, deger in zip(("ad_norm", "ad_iz"), ad_esleme.anahtarlar(sirket_adi)):
+            if not deger:
+                return None
+            satir = self.db.execute(f"SELECT anahtar FROM ipos WHERE {sutun} = ? AND {kosul} ORDER BY sira LIMIT 1",
+                                    (deger,)).fetchone()
+            if satir:
+                return satir[0]
+        return None
+
+    def ada_gore(self, sirket_adi: str, kodlu: bool = True) -> Optional[dict]:
+        """Normalize ad eşleşmesi (varsayılan: sadece gerçek kodu olan kayıtlar arasında)."""
+        anahtar = self._ad_anahtari(sirket_adi, kodlu)
+        return self.getir(anahtar) if anahtar else None
+
+    def kodlar(self) -> set[str]:
+        return {k for (k,) in self.db.execute("SELECT sirket_kodu FROM ipos WHERE sirket_kodu != ''")}
+
+    def sayilar(self) -> dict[str, int]:
+        return dict(self.db.execute("SELECT durum, COUNT(*) FROM ipos GROUP BY durum").fetchall())
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM ipos").fetchone()[0]
+
+    # ── Dışa aktarma ──
+    def disa_aktar(self):
+        """
+        Değişiklik varsa ipos.json + ipos.min.json.gz'yi depodan yeniden üretir.
+        Commit'ten önce çağrılır: commit düşerse ipos.json depodan yeni kalır ve
+        sonraki açılışta depo ondan yeniden kurulur.
+        """
+        if not self.degisen or not self.json_yolu:
+            return
+        ipos = self.hepsi()
+        veri_dosyasi.ipos_kaydet(self.json_yolu, ipos)
+        self._meta_yaz("json_ozet", _ozet(self.json_yolu))
+        print(f"[✓] {len(ipos)} kayıt ({self.degisen} değişiklik) → {os.path.basename(self.json_yolu)}")
+        self.degisen = 0
+
+    def kapat(self):
+        self.db.close()
+
+
+@contextmanager
+def ac(json_yolu: str = IPOS_FILE, db_yolu: Optional[str] = None):
+    """Depoyu açar ve ipos.json ile eşitler; hatasız çıkışta kaydedip dışa aktarır, hatada geri alır."""
+    db_yolu = db_yolu or os.environ.get("HALKARZ_IPO_DB") or VARSAYILAN_DB
+    os.makedirs(os.path.dirname(os.path.abspath(db_yolu)), exist_ok=True)
+    depo = IpoDeposu(db_yolu, json_yolu)
+    try:
+        depo.esitle()
+        yield depo
+        depo.disa_aktar()
+        depo.db.commit()
+    except BaseException:
+        depo.db.rollback()
+        raise
+    finally:
+        depo.kapat()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+IPO Kayıt Modeli
+================
+ipos.json kaydı, halka_arzlar Firestore dokümanı ve kazıyıcıların ara kayıtları
+aynı bilgiyi farklı adlar ve tiplerle taşıyordu ("durum": "islem" / "islem_goruyor",
+"tarih" / "tarih_raw", kisi_basi_lot 1 / "1"). Ipo tek tip kayıttır:
+
+  ipo = Ipo.from_dict(d)          # ipos.json / kazıma sözlüğü (bilinmeyen alanlar ekstra'da korunur)
+  ipo.to_dict()                   # ipos.json kaydı
+  ipo.to_doc()                    # halka_arzlar dokümanı (durum kısa adla: taslak / arz / islem)
+  Ipo.from_fields(doc["fields"])  # Firestore REST Value JSON → Ipo
+  ipo.to_fields()                 # Ipo → Firestore REST Value JSON
+
+Bellek: __slots__'lu dataclass (kayıt başına __dict__ yok); sayısal alanlar
+gerçek int/float, sparkline array('d') (fiyat başına 8 bayt, float nesnesi yok).
+Az çeşitli metinler (durum, tarihler, aracı kurum ...) sys.intern'lenir; boş
+sparkline/ekstra None, boş diziler paylaşılan (), sıfır fon dağılımı paylaşılan
+tek sözlüktür — ipos.json'daki kayıtların çoğu (taslaklar) böyle.
+
+durum her zaman kanoniktir: taslak / talep_topluyor / islem_goruyor — "arz",
+"islem" gibi eş anlamlılar girişte çevrilir. Dönüştürücüler alan tipine göre
+modül yüklenirken bir kez kurulur; kayıt başına isinstance zinciri yoktur.
+"""
+
+import sys
+from array import array
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from fs_kodek import from_fv as _from_fv, to_fv as _to_fv  # Genel Value JSON (ekstra alanlar)
+
+# ─── Durum ───
+DURUMLAR = ("taslak", "talep_topluyor", "islem_goruyor")
+DURUM_ESANLAM = {"arz": "talep_topluyor", "talep": "talep_topluyor", "islem": "islem_goruyor"}
+KISA_DURUM = {"taslak": "taslak", "talep_topluyor": "arz", "islem_goruyor": "islem"}
+
+
+def kanonik_durum(durum) -> str:
+    durum = (durum or "taslak").strip()
+    return sys.intern(DURUM_ESANLAM.get(durum, durum))
+
+
+SIFIR_FON = {"yatirim": 0, "borc_odeme": 0, "isletme_sermayesi": 0}  # Paylaşılır: değiştirmeyin
+
+
+@dataclass(slots=True)
+class Ipo:
+    sirket_kodu: str = ""
+    sirket_adi: str = ""
+    durum: str = "taslak"
+    tarih_raw: str = ""
+    talep_baslangic: str = ""
+    talep_bitis: str = ""
+    borsada_islem_tarihi: str = ""
+    detay_url: str = ""
+    kaynak: str = ""
+    # Arz bilgileri
+    arz_fiyati: float = 0.0
+    toplam_lot: int = 0
+    kisi_basi_lot: str = ""
+    dagitim_sekli: str = "Eşit"
+    konsorsiyum_lideri: str = ""
+    iskonto_orani: float = 0.0
+    fon_kullanim_yeri: Optional[dict] = None       # None → SIFIR_FON
+    katilim_endeksine_uygun: bool = False
+    bireysel_lot: int = 0
+    bireysel_yuzde: int = 0
+    sirket_aciklama: str = ""
+    pazar: str = ""
+    bist_ilk_islem_tarihi: str = ""
+    halka_arz_sekli: str = ""
+    fonun_kullanim_yeri: str = ""
+    satis_yontemi: str = ""
+    tahsisat_gruplari: str = ""
+    son_katilimci_sayilari: tuple = ()
+    # Borsa metrikleri (işlem görenler)
+    ilk_gun_kapanis: Optional[float] = None
+    max_fiyat: Optional[float] = None
+    min_fiyat: Optional[float] = None
+    tavan_gun: Optional[int] = None
+    sparkline: Optional[array] = None              # None → []
+    sparkline_dates: tuple = ()
+    static_fetched: bool = False
+    static_fetched_at: str = ""
+    guncelleme_zamani: str = ""
+    # Modelde karşılığı olmayan alanlar (finansal_tablolar, fiyat_gecmisi, son_fiyat ...); boşsa None
+    ekstra: Optional[dict] = None
+
+    # ── ipos.json / sözlük ──
+    @classmethod
+    def from_dict(cls, d: dict) -> "Ipo":
+        kwargs, ekstra = {}, {}
+        for ad, deger in d.items():
+            cevir = _SOZLUKTEN.get(ad)
+            if cevir is None:
+                ekstra[ad] = deger
+            else:
+                kwargs[ad] = cevir(deger)
+        return cls(**kwargs, ekstra=ekstra or None)
+
+    def to_dict(self, alanlar: Optional[tuple] = None) -> dict:
+        """ipos.json kaydı: temel alanlar her zaman, diğerleri varsayılandan farklıysa (alanlar → tam bu alanlar)."""
+        if alanlar is not None:
+            d = {ad: _JSONA[ad](getattr(self, ad)) for ad in alanlar}
+        else:
+            d = {}
+            for ad, bos, jsona in _ALANLAR:
+                deger = getattr(self, ad)
+                if ad in TEMEL_ALANLAR or deger != bos:
+                    d[ad] = jsona(deger)
+        if self.ekstra:
+            d.update(self.ekstra)
+        return d
+
+    # ── halka_arzlar dokümanı ──
+    def to_doc(self) -> dict:
+        doc = {DOC_ADLARI.get(ad, ad): getattr(self, ad) for ad in DOC_ALANLARI}
+        doc["durum"] = KISA_DURUM.get(self.durum, self.durum)
+        for ad in DOC_EKSTRA:
+            if self.ekstra and ad in self.ekstra:
+                doc[ad] = self.ekstra[ad]
+        return doc
+
+    # ── Firestore REST Value JSON ──
+    @classmethod
+    def from_fields(cls, alanlar: dict) -> "Ipo":
+        kwargs, ekstra = {}, {}
+        for ad, fv in alanlar.items():
+            ad = _DOCTAN_ADLAR.get(ad, ad)
+            coz = _FV_COZ.get(ad)
+            if coz is None:
+                ekstra[ad] = _from_fv(fv)
+                continue
+            try:
+                kwargs[ad] = coz(fv)
+            except (KeyError, TypeError, ValueError):
+                ekstra[ad] = _from_fv(fv)  # Beklenmeyen tip: kaybetme, ekstra'da taşı
+        return cls(**kwargs, ekstra=ekstra or None)
+
+    def to_fields(self, alanlar: Optional[tuple] = None) -> dict:
+        """Firestore REST "fields" (alanlar=None → to_dict() ile aynı alan seçimi)."""
+        if alanlar is None:
+            fv = {}
+            for ad, bos, _ in _ALANLAR:
+                deger = getattr(self, ad)
+                if ad in TEMEL_ALANLAR or deger != bos:
+                    fv[ad] = _FV_KODLA[ad](deger)
+        else:
+            fv = {ad: _FV_KODLA[ad](getattr(self, ad)) for ad in alanlar}
+        if self.ekstra:
+            fv.update({ad: _to_fv(deger) for ad, deger in self.ekstra.items()})
+        return fv
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ŞEMA
+# ═══════════════════════════════════════════════════════════════════
+# ipos.json'un temel şeması (halkarz_scraper/scraper'ın yeni kayıt alanları)
+TEMEL_ALANLAR = frozenset({
+    "sirket_kodu", "sirket_adi", "durum", "borsada_islem_tarihi", "arz_fiyati", "toplam_lot",
+    "dagitim_sekli", "konsorsiyum_lideri", "iskonto_orani", "fon_kullanim_yeri", "katilim_endeksine_uygun",
+    "talep_baslangic", "talep_bitis", "son_katilimci_sayilari", "sparkline", "sparkline_dates",
+    "guncelleme_zamani",
+})
+
+# halka_arzlar dokümanı (main.py) — Flutter IpoModel ile aynı alanlar
+DOC_ALANLARI = (
+    "sirket_kodu", "sirket_adi", "durum", "tarih_raw", "arz_fiyati", "toplam_lot",
+    "dagitim_sekli", "konsorsiyum_lideri", "katilim_endeksine_uygun", "kisi_basi_lot",
+    "bireysel_lot", "bireysel_yuzde", "sirket_aciklama", "pazar", "bist_ilk_islem_tarihi",
+    "guncelleme_zamani",
+)
+DOC_ADLARI = {"tarih_raw": "tarih"}
+DOC_EKSTRA = ("son_fiyat", "fiyat_gecmisi", "fiyat_serisi")
+_DOCTAN_ADLAR = {v: k for k, v in DOC_ADLARI.items()}
+
+# Kayıtlar arasında çok tekrarlanan metin alanları (sys.intern)
+_INTERN = frozenset({
+    "tarih_raw", "talep_baslangic", "talep_bitis", "borsada_islem_tarihi", "kaynak", "kisi_basi_lot",
+    "dagitim_sekli", "konsorsiyum_lideri", "pazar", "bist_ilk_islem_tarihi", "sparkline_dates",
+})
+
+
+def _int(v):
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return int(float(v))
+
+
+def _opt(cevir):
+    return lambda v: None if v is None else cevir(v)
+
+
+def _str(v):
+    return "" if v is None else str(v)
+
+
+def _intern_str(v):
+    return sys.intern(str(v)) if v else ""
+
+
+def _dizi(v):
+    return tuple(v) if v else ()
+
+
+def _intern_dizi(v):
+    return tuple(map(sys.intern, v)) if v else ()
+
+
+def _sparkline(v):
+    return array("d", map(float, v)) if v else None
+
+
+def _fon(v):
+    return None if not v or v == SIFIR_FON else v
+
+
+def _float_fv(fv):
+    return float(fv["doubleValue"] if "doubleValue" in fv else fv["integerValue"])
+
+
+def _int_fv(fv):
+    return _int(fv.get("integerValue", fv.get("doubleValue")))
+
+
+def _dizi_fv(fv):
+    return fv.get("arrayValue", {}).get("values", [])
+
+
+# tip → (sözlükten, JSON'a, Value JSON'a, Value JSON'dan)
+_TIPLER = {
+    str: (_str, lambda v: v,
+          lambda v: {"stringValue": v}, lambda fv: fv["stringValue"]),
+    int: (_int, lambda v: v,
+          lambda v: {"integerValue": str(v)}, _int_fv),
+    float: (lambda v: float(v or 0), lambda v: v,
+            lambda v: {"doubleValue": v}, _float_fv),
+    bool: (bool, lambda v: v,
+           lambda v: {"booleanValue": v}, lambda fv: fv["booleanValue"]),
+    Optional[float]: (_opt(float), lambda v: v,
+                      lambda v: {"nullValue": None} if v is None else {"doubleValue": v},
+                      lambda fv: None if "nullValue" in fv else _float_fv(fv)),
+    Optional[int]: (_opt(_int), lambda v: v,
+                    lambda v: {"nullValue": None} if v is None else {"integerValue": str(v)},
+                    lambda fv: None if "nullValue" in fv else _int_fv(fv)),
+    Optional[array]: (_sparkline, lambda v: v.tolist() if v else [],
+                      lambda v: {"arrayValue": {"values": [{"doubleValue": x} for x in v] if v else []}},
+                      lambda fv: _sparkline([_float_fv(x) for x in _dizi_fv(fv)])),
+    tuple: (_dizi, list,
+            lambda v: _to_fv(v), lambda fv: _dizi(_from_fv(fv))),
+    Optional[dict]: (_fon, lambda v: dict(v or SIFIR_FON),
+                     lambda v: _to_fv(v or SIFIR_FON), lambda fv: _fon(_from_fv(fv))),
+}
+# intern'li tiplerin sözlükten/Value JSON'dan çeviricileri
+_INTERN_TIPLER = {
+    str: (_intern_str, lambda fv: _intern_str(fv["stringValue"])),
+    tuple: (_intern_dizi, lambda fv: _intern_dizi(_from_fv(fv))),
+}
+
+_MODEL_ALANLARI = [a for a in fields(Ipo) if a.name != "ekstra"]
+_SOZLUKTEN = {a.name: (_INTERN_TIPLER[a.type][0] if a.name in _INTERN else _TIPLER[a.type][0])
+              for a in _MODEL_ALANLARI}
+_SOZLUKTEN["durum"] = kanonik_durum
+_ALANLAR = [(a.name, a.default, _TIPLER[a.type][1]) for a in _MODEL_ALANLARI]
+_JSONA = {ad: jsona for ad, _, jsona in _ALANLAR}
+_FV_KODLA = {a.name: _TIPLER[a.type][2] for a in _MODEL_ALANLARI}
+_FV_COZ = {a.name: (_INTERN_TIPLER[a.type][1] if a.name in _INTERN else _TIPLER[a.type][3])
+           for a in _MODEL_ALANLARI}
+_FV_COZ["durum"] = lambda fv: kanonik_durum(fv["stringValue"])
@@ -11,17 +11,20 @@ Kaynak: halkarz.com
 Anti-ban: Gerçekçi User-Agent, rastgele gecikmeler
 """
 
-import json
 import os
 import re
 import random
-import time
 from datetime import datetime
 from typing import Optional
 
 import requests
 from bs4 import BeautifulSoup
 
+import dayanikli_http
+import http_kaset
+import olcum
+import ipo_deposu
+
 # --- Yapılandırma ---
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 IPOS_FILE = os.path.join(DATA_DIR, "ipos.json")
@@ -46,9 +49,9 @@ HEADERS = {
 def safe_get(url: str, timeout: int = 15) -> Optional[requests.Response]:
     """Rate-limited HTTP GET."""
     delay = random.uniform(1.0, 2.5)
-    time.sleep(delay)
+    http_kaset.bekle(delay)
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
+        resp = dayanikli_http.getir(url, headers=HEADERS, timeout=timeout)
         resp.raise_for_status()
         return resp
     except requests.RequestException as e:
@@ -178,27 +181,6 @@ def build_price_lookup(target_codes: set[str]) -> dict[str, float]:
     return results
 
 
-# ─── ipos.json İşlemleri ──────────────────────────────────────────────────────
-
-def load_ipos() -> list:
-    if not os.path.exists(IPOS_FILE):
-        print("[HATA] ipos.json bulunamadı!")
-        return []
-    try:
-        with open(IPOS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"[HATA] ipos.json okuma: {e}")
-        return []
-
-
-def save_ipos(ipos: list):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(IPOS_FILE, "w", encoding="utf-8") as f:
-        json.dump(ipos, f, ensure_ascii=False, indent=2)
-    print(f"[✓] {len(ipos)} kayıt → ipos.json")
-
-
 # ─── Ana Fonksiyon ────────────────────────────────────────────────────────────
 
 def main():
@@ -206,40 +188,32 @@ def main():
     print(f"IPO Fiyat Güncelleme (halkarz.com) — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("=" * 60)
 
-    ipos = load_ipos()
-    if not ipos:
-        print("[BİLGİ] İşlenecek IPO yok.")
-        return
+    with ipo_deposu.ac(IPOS_FILE) as depo:
+        if not len(depo):
+            print("[BİLGİ] İşlenecek IPO yok.")
+            return
 
-    # Hedef kodları çıkar
-    target_codes = {ipo["sirket_kodu"].upper() for ipo in ipos if ipo.get("sirket_kodu")}
-    print(f"[BİLGİ] ipos.json'da {len(ipos)} kayıt | Hedef: {', '.join(sorted(target_codes))}\n")
+        # Hedef kodlar (sirket_kodu indeksinden)
+        target_codes = depo.kodlar()
+        print(f"[BİLGİ] IPO deposunda {len(depo)} kayıt | Hedef: {', '.join(sorted(target_codes))}\n")
 
-    # halkarz.com'dan fiyatları kazı
-    scraped = build_price_lookup(target_codes)
-
-    if not scraped:
-        print("[UYARI] halkarz.com'dan fiyat alınamadı!")
-        return
-
-    # Fiyatları güncelle
-    print(f"\n[3/3] Fiyatlar güncelleniyor...\n")
-    updated_count = 0
-    for ipo in ipos:
-        code = ipo.get("sirket_kodu", "").upper()
-        if code not in scraped:
-            continue
+        # halkarz.com'dan fiyatları kazı
+        scraped = build_price_lookup(target_codes)
 
-        scraped_price = scraped[code]
-        old_price = ipo.get("arz_fiyati", 0)
+        if not scraped:
+            print("[UYARI] halkarz.com'dan fiyat alınamadı!")
+            return
 
-        if old_price != scraped_price:
-            print(f"  {code}: ₺{old_price} → ₺{scraped_price}")
-            ipo["arz_fiyati"] = scraped_price
-            updated_count += 1
+        # Fiyatları güncelle (sadece değişen satırlar yazılır)
+        print(f"\n[3/3] Fiyatlar güncelleniyor...\n")
+        updated_count = 0
+        for code, scraped_price in sorted(scraped.items()):
+            old_price = (depo.getir(code) or {}).get("arz_fiyati", 0)
+            if depo.guncelle(code, {"arz_fiyati": scraped_price}):
+                print(f"  {code}: ₺{old_price} → ₺{scraped_price}")
+                updated_count += 1
 
     if updated_count > 0:
-        save_ipos(ipos)
         print(f"\n[✓] {updated_count} arz fiyatı güncellendi.")
     else:
         print("[BİLGİ] Tüm fiyatlar zaten doğru — güncelleme yok.")
@@ -248,4 +222,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("ipo_price_scraper"):
+        main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+İşlem Günlüğü — Firestore Mutasyonları İçin Önden Yazma Kaydı
+==============================================================
+main.main() yarıda kesilirse (Actions zaman aşımı, token hatası) bazı dokümanlar
+yazılmış, bildirim durumu kaydedilmemiş, temizlik hiç çalışmamış olur; sonraki
+çalıştırma her şeyi yeniden kazır ve aynı bildirimi ikinci kez gönderebilir.
+
+Çalıştırma boyunca data/cache/journal/<betik>.jsonl'e (HALKARZ_JOURNAL_DIR)
+her satır fsync'lenerek eklenir:
+
+  basla   → çalıştırma başladı
+  sonuc   → hatirla(ad, fn): kazıma/okuma sonucu
+  plan    → yap(islem, fn): yapılacak Firestore yazma/silme veya bildirim
+  tamam   → fn başarılı döndü
+  (bitti) → çalıştırma sorunsuz bitti; dosya silinir
+
+Bitmemiş bir günlük varsa (HALKARZ_JOURNAL_MAX_SAAT, varsayılan 12 saatten
+yeni) yeni çalıştırma onu devralır: hatirla() sonucu günlükten döner (yeniden
+kazıma/okuma yok, "bugün" dahil), "tamam" kayıtlı mutasyon ve bildirimler
+atlanır, yalnız yarım kalanlar çalışır. Daha eski günlük atılır.
+
+  with islem_gunlugu.calistirma("main"):
+      raw = islem_gunlugu.hatirla("kazima", scrape_first_20)
+      islem_gunlugu.yap(f"set:{yol}", fs_set, yol, doc)
+
+calistirma() dışında hatirla()/yap() doğrudan fn'i çağırır.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+VARSAYILAN_DIZIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "journal")
+VARSAYILAN_MAX_SAAT = 12
+
+_aktif = None  # Açık _Gunluk
+
+
+# ─── JSON kodlama (datetime/date korunur) ───
+def _kodla(v):
+    if isinstance(v, datetime):
+        return {"$dt": v.isoformat()}
+    if isinstance(v, date):
+        return {"$d": v.isoformat()}
+    if isinstance(v, dict):
+        return {k: _kodla(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_kodla(x) for x in v]
+    return v
+
+
+def _coz(v):
+    if isinstance(v, dict):
+        if len(v) == 1 and "$dt" in v:
+            return datetime.fromisoformat(v["$dt"])
+        if len(v) == 1 and "$d" in v:
+            return date.fromisoformat(v["$d"])
+        return {k: _coz(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_coz(x) for x in v]
+    return v
+
+
+def _oku(path):
+    """Günlük satırları; çökme anında yarım yazılmış son satır atlanır."""
+    kayitlar = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for satir in f:
+                try:
+                    kayitlar.append(json.loads(satir))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return kayitlar
+
+
+class _Gunluk:
+    def __init__(self, path, onceki):
+        self.path = path
+        self.sonuclar = {}      # ad → kodlanmış sonuç
+        self.tamam = set()      # tamamlanmış işlem kimlikleri
+        self.atlanan = 0
+        self.yarim = 0          # planlanmış ama tamamlanmamış (devralınan)
+        planli = set()
+        for k in onceki:
+            if k["t"] == "sonuc":
+                self.sonuclar[k["ad"]] = k["veri"]
+            elif k["t"] == "plan":
+                planli.add(k["islem"])
+            elif k["t"] == "tamam":
+                self.tamam.add(k["islem"])
+        self.yarim = len(planli - self.tamam)
+        self.f = open(path, "a", encoding="utf-8")
+        self._kilit = threading.Lock()  # bildirim_kutusu mesajları eşzamanlı yap() çağırır
+
+    def _yaz(self, kayit):
+        satir = json.dumps(kayit, ensure_ascii=False) + "\n"
+        with self._kilit:
+            self.f.write(satir)
+            self.f.flush()
+            os.fsync(self.f.fileno())
+
+    def hatirla(self, ad, fn, *args, **kwargs):
+        if ad in self.sonuclar:
+            return _coz(self.sonuclar[ad])
+        sonuc = fn(*args, **kwargs)
+        if sonuc is None:  # Başarısız okuma günlüğe girmez, devralınan çalıştırma yeniden dener
+            return None
+        kodlu = _kodla(sonuc)
+        self.sonuclar[ad] = kodlu
+        self._yaz({"t": "sonuc", "ad": ad, "veri": kodlu})
+        return sonuc
+
+    def yap(self, islem, fn, *args, **kwargs):
+        if islem in self.tamam:
+            self.atlanan += 1
+            return True
+        self._yaz({"t": "plan", "islem": islem})
+        sonuc = fn(*args, **kwargs)
+        if sonuc:
+            self.tamam.add(islem)
+            self._yaz({"t": "tamam", "islem": islem})
+        return sonuc
+
+    def kapat(self, bitti):
+        self.f.close()
+        if bitti:
+            os.remove(self.path)
+        if self.atlanan:
+            print(f"[BİLGİ] İşlem günlüğü: önceki çalıştırmada tamamlanan {self.atlanan} işlem atlandı.")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GENEL ARAYÜZ
+# ═══════════════════════════════════════════════════════════════════
+def hatirla(ad, fn, *args, **kwargs):
+    """fn()'in sonucunu (None değilse) günlüğe yazar; devralınan çalıştırmada fn çağrılmadan günlükten döner."""
+    if _aktif:
+        return _aktif.hatirla(ad, fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def yap(islem, fn, *args, **kwargs):
+    """Yan etkili işlem (mutasyon/bildirim). islem kimliği çalıştırma içinde tekil olmalı; fn doğruysa tamamlanmış sayılır."""
+    if _aktif:
+        return _aktif.yap(islem, fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def tamam_mi(islem) -> bool:
+    """islem önceki (devralınan) ya da bu çalıştırmada tamamlandı mı? Toplu gönderimden önce elemek için."""
+    return bool(_aktif) and islem in _aktif.tamam
+
+
+@contextmanager
+def calistirma(betik: str):
+    """Günlüğü açar (bitmemiş ve yeni olanı devralır); hatasız çıkışta siler, hata/kesintide bırakır."""
+    global _aktif
+    dizin = os.environ.get("HALKARZ_JOURNAL_DIR") or VARSAYILAN_DIZIN
+    max_saat = float(os.environ.get("HALKARZ_JOURNAL_MAX_SAAT", VARSAYILAN_MAX_SAAT))
+    os.makedirs(dizin, exist_ok=True)
+    path = os.path.join(dizin, f"{betik}.jsonl")
+
+    onceki = _oku(path)
+    if onceki:
+        try:
+            baslangic = datetime.fromisoformat(onceki[0]["zaman"]).timestamp()
+        except (KeyError, ValueError):
+            baslangic = os.path.getmtime(path)
+        yas_saat = (time.time() - baslangic) / 3600
+        if yas_saat > max_saat:
+            print(f"[UYARI] {yas_saat:.0f} saatlik bitmemiş işlem günlüğü atıldı ({path}).")
+            os.remove(path)
+            onceki = []
+    _aktif = g = _Gunluk(path, onceki)
+    if onceki:
+        print(f"[UYARI] Yarım kalan çalıştırma devralınıyor ({onceki[0].get('zaman', '?')}): "
+              f"{len(g.sonuclar)} kayıtlı sonuç, {len(g.tamam)} tamamlanmış, {g.yarim} yarım işlem.")
+    else:
+        g._yaz({"t": "basla", "zaman": datetime.now().isoformat(timespec="seconds")})
+    bitti = False
+    try:
+        yield g
+        bitti = True
+    finally:
+        _aktif = None
+        g.kapat(bitti)
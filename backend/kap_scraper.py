@@ -14,13 +14,18 @@ import json
 import os
 import re
 import random
-import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import requests
 from bs4 import BeautifulSoup
 
+import dayanikli_http
+import fs_maliyet
+import http_kaset
+import olcum
+from ipo_modeli import Ipo
+
 # ─────────────────────────────────────────────────────────────────
 # 1) Firebase Firestore
 # ─────────────────────────────────────────────────────────────────
@@ -68,9 +73,9 @@ AY_MAP = {
 # 3) Yardımcılar
 # ─────────────────────────────────────────────────────────────────
 def safe_get(url: str, timeout: int = 15) -> Optional[requests.Response]:
-    time.sleep(random.uniform(0.8, 2.0))
+    http_kaset.bekle(random.uniform(0.8, 2.0))
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
+        resp = dayanikli_http.getir(url, headers=HEADERS, timeout=timeout)
         resp.raise_for_status()
         return resp
     except requests.RequestException as e:
@@ -146,9 +151,8 @@ def _extract_section(full_text: str, header: str, next_headers: list[str]) -> st
     return full_text[start:end].strip()
 
 
-def fetch_all_details(url: str) -> dict:
-    """halkarz.com detay sayfasından TÜM halka arz bilgilerini çeker."""
-    defaults = {
+def _detay_varsayilan() -> dict:
+    return {
         "arz_fiyati": 0.0,
         "toplam_lot": 0,
         "dagitim_sekli": "Eşit",
@@ -164,15 +168,26 @@ def fetch_all_details(url: str) -> dict:
         "sirket_aciklama": "",
         "finansal_tablolar": {},
     }
+
+
+@olcum.asama("detay_sayfasi")
+def fetch_all_details(url: str) -> Optional[dict]:
+    """halkarz.com detay sayfasından TÜM halka arz bilgilerini çeker."""
     if not url:
-        return defaults
+        return _detay_varsayilan()
 
     resp = safe_get(url)
     if not resp:
-        return defaults
+        return None  # Çekilemedi: scrape() kaydı atlar, Firestore'daki önceki veri korunur
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    d = dict(defaults)
+    return parse_all_details(resp.text)
+
+
+@olcum.asama("ayristir")
+def parse_all_details(html: str) -> dict:
+    """Detay sayfası HTML'ini ayrıştırır (ağdan bağımsız; profil/benchmark için ayrı aşama)."""
+    soup = BeautifulSoup(html, "html.parser")
+    d = _detay_varsayilan()
 
     # ── 1) Ana tablo: Fiyat, Pay, Dağıtım, Aracı Kurum ──
     for tbl in soup.find_all("table"):
@@ -277,7 +292,7 @@ def fetch_all_details(url: str) -> dict:
 # ─────────────────────────────────────────────────────────────────
 # 5) Ana Kazıma — Sadece Taslak & Talep
 # ─────────────────────────────────────────────────────────────────
-def scrape() -> list[dict]:
+def scrape() -> list[Ipo]:
     print(f"\n[■] halkarz.com ana sayfa çekiliyor...")
     resp = safe_get(BASE_URL)
     if not resp:
@@ -342,8 +357,11 @@ def scrape() -> list[dict]:
         print(f"    Detay sayfası çekiliyor: {detail_url}")
 
         det = fetch_all_details(detail_url)
+        if det is None:
+            print(f"    [UYARI] Detay alınamadı → {bist_kod or sirket_adi} atlandı, önceki kayıt korunuyor.")
+            continue
 
-        entry = {
+        entry = Ipo.from_dict({
             "sirket_kodu":              bist_kod,
             "sirket_adi":               sirket_adi,
             "durum":                    durum,
@@ -371,7 +389,7 @@ def scrape() -> list[dict]:
             "finansal_tablolar":        det["finansal_tablolar"],
             # Meta
             "guncelleme_zamani":        datetime.now().isoformat(),
-        }
+        })
         results.append(entry)
 
     print(f"\n[✓] {len(results)} aktif halka arz bulundu (sadece taslak + talep).")
@@ -381,33 +399,44 @@ def scrape() -> list[dict]:
 # ─────────────────────────────────────────────────────────────────
 # 6) Firestore'a Yaz
 # ─────────────────────────────────────────────────────────────────
-def upsert_to_firestore(ipos: list[dict]):
+# "ipos" dokümanının alanları (finansal_tablolar modelde yok, ekstra'dan gelir)
+KAYIT_ALANLARI = (
+    "sirket_kodu", "sirket_adi", "durum", "tarih_raw", "talep_baslangic", "talep_bitis",
+    "borsada_islem_tarihi", "detay_url", "arz_fiyati", "toplam_lot", "kisi_basi_lot", "dagitim_sekli",
+    "konsorsiyum_lideri", "katilim_endeksine_uygun", "iskonto_orani", "halka_arz_sekli",
+    "fonun_kullanim_yeri", "satis_yontemi", "tahsisat_gruplari", "bireysel_lot", "bireysel_yuzde",
+    "sirket_aciklama", "guncelleme_zamani",
+)
+
+
+def upsert_to_firestore(ipos: list[Ipo]):
     if not ipos:
         print("[!] Yazılacak kayıt yok.")
         return
 
     saved = 0
     for ipo in ipos:
-        bist = ipo.get("sirket_kodu", "").strip()
+        bist = ipo.sirket_kodu.strip()
         if not bist:
-            raw = ipo.get("sirket_adi", "NONAME")
+            raw = ipo.sirket_adi or "NONAME"
             bist = re.sub(r"[^A-Z0-9]", "", raw.upper())[:10] or "NOCODE"
-            ipo["sirket_kodu"] = bist
+            ipo.sirket_kodu = bist
 
         if db:
-            db.collection("ipos").document(bist).set(ipo, merge=True)
-            print(f"  [✓] {bist:<8} {ipo['sirket_adi'][:40]:40s} → {ipo['durum']}")
+            db.collection("ipos").document(bist).set(ipo.to_dict(KAYIT_ALANLARI), merge=True)
+            fs_maliyet.say("yazma")
+            print(f"  [✓] {bist:<8} {ipo.sirket_adi[:40]:40s} → {ipo.durum}")
         else:
-            print(f"  [DRY] {bist:<8} → {ipo['durum']}")
-            print(f"    Fiyat: {ipo['arz_fiyati']} | Lot: {ipo['toplam_lot']} | Dağıtım: {ipo['dagitim_sekli']}")
-            print(f"    Aracı: {ipo['konsorsiyum_lideri']}")
-            print(f"    Katılım: {ipo['katilim_endeksine_uygun']}")
-            if ipo["halka_arz_sekli"]:
-                print(f"    Arz Şekli: {ipo['halka_arz_sekli'][:100]}")
-            if ipo["fonun_kullanim_yeri"]:
-                print(f"    Fon Kullanım: {ipo['fonun_kullanim_yeri'][:100]}")
-            if ipo["tahsisat_gruplari"]:
-                print(f"    Tahsisat: {ipo['tahsisat_gruplari'][:100]}")
+            print(f"  [DRY] {bist:<8} → {ipo.durum}")
+            print(f"    Fiyat: {ipo.arz_fiyati} | Lot: {ipo.toplam_lot} | Dağıtım: {ipo.dagitim_sekli}")
+            print(f"    Aracı: {ipo.konsorsiyum_lideri}")
+            print(f"    Katılım: {ipo.katilim_endeksine_uygun}")
+            if ipo.halka_arz_sekli:
+                print(f"    Arz Şekli: {ipo.halka_arz_sekli[:100]}")
+            if ipo.fonun_kullanim_yeri:
+                print(f"    Fon Kullanım: {ipo.fonun_kullanim_yeri[:100]}")
+            if ipo.tahsisat_gruplari:
+                print(f"    Tahsisat: {ipo.tahsisat_gruplari[:100]}")
         saved += 1
 
     print(f"\n── {saved} kayıt Firestore'a yazıldı. ──")
@@ -421,9 +450,17 @@ if __name__ == "__main__":
     print(f"  Halka Arz Bot  —  {datetime.now():%Y-%m-%d %H:%M:%S}")
     print("=" * 58)
 
-    ipos = scrape()
-    upsert_to_firestore(ipos)
+    with olcum.calistirma("kap_scraper"):
+        olcum.adim("kazima")
+        ipos = scrape()
+        olcum.adim("firestore_yaz")
+        upsert_to_firestore(ipos)
+        if db:
+            gun, artis = fs_maliyet.gunluk_artislar()
+            db.collection("meta").document("cost_stats").set(
+                {"gunler": {gun: {"kap_scraper": {k: fs.Increment(v) for k, v in artis.items()}}},
+                 "guncelleme": fs.SERVER_TIMESTAMP}, merge=True)
 
-    t = sum(1 for i in ipos if i["durum"] == "taslak")
-    ta = sum(1 for i in ipos if i["durum"] == "talep_topluyor")
+    t = sum(1 for i in ipos if i.durum == "taslak")
+    ta = sum(1 for i in ipos if i.durum == "talep_topluyor")
     print(f"\n[İSTATİSTİK] Taslak:{t} | Talep:{ta} | Toplam:{len(ipos)}")
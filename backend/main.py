@@ -15,14 +15,27 @@ import json
 import os
 import re
 import random
-import time
 from datetime import datetime, timedelta
 from typing import Optional
+from urllib.parse import quote
 
 import requests
 from bs4 import BeautifulSoup
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+
+import bildirim_kutusu
+import bist_takvimi
+import dayanikli_http
+import durum_deposu
+import fcm_gonderici
+import fiyat_serisi
+import fs_kodek
+import fs_maliyet
+import http_kaset
+import islem_gunlugu
+import olcum
+from bist_takvimi import TR_TZ
+from fiyat_saglayici import get_provider
+from ipo_modeli import Ipo
 
 # ─── Yapılandırma ─────────────────────────────────────────────────
 FIREBASE_PROJECT_ID = os.environ.get("FIREBASE_PROJECT_ID", "")
@@ -31,7 +44,7 @@ FIREBASE_RTDB_URL = os.environ.get("FIREBASE_RTDB_URL", "")
 
 FIRESTORE_COLLECTION = "halka_arzlar"
 STATE_DOC_PATH = "meta/notification_state"
-FCM_V1_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+BILDIRIM_TTL = 7 * durum_deposu.GUN   # Gönderilen bildirim kaydı bu süre sonra düşer
 
 SCRAPE_BASE_URL = "https://halkarz.com"
 SCRAPE_HEADERS = {
@@ -50,14 +63,25 @@ MAX_IPO_COUNT = 20
 # ═══════════════════════════════════════════════════════════════════
 # FIREBASE AUTH
 # ═══════════════════════════════════════════════════════════════════
+# Token'lar süreç boyunca saklanır; sadece süresi dolunca yenilenir.
+_CREDS_CACHE = {}
+
+@olcum.asama("auth")
 def _get_credentials(scopes):
     if not FIREBASE_SA_KEY_JSON:
         print("[UYARI] FIREBASE_SA_KEY_JSON ayarlanmadı.")
         return None
+    key = tuple(scopes)
+    creds = _CREDS_CACHE.get(key)
+    if creds is not None and creds.valid:
+        return creds
     try:
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import Request
         sa_info = json.loads(FIREBASE_SA_KEY_JSON)
         creds = service_account.Credentials.from_service_account_info(sa_info, scopes=scopes)
         creds.refresh(Request())
+        _CREDS_CACHE[key] = creds
         return creds
     except Exception as e:
         print(f"[HATA] Firebase credentials: {e}")
@@ -78,72 +102,70 @@ def get_firestore_token():
 def _fs_url(path):
     return f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/{path}"
 
-def _to_fv(val):
-    if val is None: return {"nullValue": None}
-    if isinstance(val, bool): return {"booleanValue": val}
-    if isinstance(val, int): return {"integerValue": str(val)}
-    if isinstance(val, float): return {"doubleValue": val}
-    if isinstance(val, str): return {"stringValue": val}
-    if isinstance(val, list): return {"arrayValue": {"values": [_to_fv(v) for v in val]}}
-    if isinstance(val, dict): return {"mapValue": {"fields": {k: _to_fv(v) for k, v in val.items()}}}
-    return {"stringValue": str(val)}
-
-def _from_fv(fv):
-    if "stringValue" in fv: return fv["stringValue"]
-    if "integerValue" in fv: return int(fv["integerValue"])
-    if "doubleValue" in fv: return fv["doubleValue"]
-    if "booleanValue" in fv: return fv["booleanValue"]
-    if "nullValue" in fv: return None
-    if "arrayValue" in fv: return [_from_fv(v) for v in fv.get("arrayValue", {}).get("values", [])]
-    if "mapValue" in fv: return {k: _from_fv(v) for k, v in fv.get("mapValue", {}).get("fields", {}).items()}
-    return None
-
-def fs_get(doc_path):
+# Value JSON: halka_arzlar şeması derlenmiş, şemada olmayan alanlar/dokümanlar genel yoldan
+_to_fv, _from_fv = fs_kodek.to_fv, fs_kodek.from_fv
+FS_SEMA = fs_kodek.HALKA_ARZ
+
+def _maske(alanlar):
+    """alanlar → mask.fieldPaths parametreleri (sunucu sadece onları döndürür); () → hiç alan, sadece doküman adı."""
+    if alanlar is None: return []
+    return [("mask.fieldPaths", fs_kodek.alan_yolu(a)) for a in alanlar] or [("mask.fieldPaths", "_yok")]
+
+@olcum.asama("firestore")
+def fs_get(doc_path, alanlar=None):
     token = get_firestore_token()
     if not token: return None
     try:
-        r = requests.get(_fs_url(doc_path), headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        r = requests.get(_fs_url(doc_path), params=_maske(alanlar), headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        fs_maliyet.yanit_say("okuma", r)
         if r.status_code == 200:
-            return {k: _from_fv(v) for k, v in r.json().get("fields", {}).items()}
+            return FS_SEMA.coz(r.json().get("fields", {}), alanlar)
         if r.status_code == 404: return {}
         return None
     except: return None
 
+@olcum.asama("firestore")
 def fs_set(doc_path, data, merge=False):
     token = get_firestore_token()
     if not token: return False
-    body = {"fields": {k: _to_fv(v) for k, v in data.items()}}
+    body = {"fields": FS_SEMA.kodla(data)}
     url = _fs_url(doc_path)
     try:
         if merge:
-            fp = "&".join([f"updateMask.fieldPaths={k}" for k in data.keys()])
+            fp = "&".join([f"updateMask.fieldPaths={quote(fs_kodek.alan_yolu(k))}" for k in data.keys()])
             r = requests.patch(f"{url}?{fp}", json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
         else:
             r = requests.patch(url, json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
+        fs_maliyet.yanit_say("yazma", r)
         return r.status_code == 200
     except: return False
 
+@olcum.asama("firestore")
 def fs_delete(doc_path):
     token = get_firestore_token()
     if not token: return False
     try:
         r = requests.delete(_fs_url(doc_path), headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        fs_maliyet.yanit_say("silme", r)
         return r.status_code == 200
     except: return False
 
-def fs_collection(col):
+@olcum.asama("firestore")
+def fs_collection(col, alanlar=None):
+    """Koleksiyondaki dokümanlar (+ "_doc_id"); alanlar verilirse sadece onlar indirilir ve çözülür."""
     token = get_firestore_token()
     if not token: return []
     docs, pt = [], None
     try:
         while True:
-            params = {"pageSize": 100}
-            if pt: params["pageToken"] = pt
+            params = [("pageSize", 100)] + _maske(alanlar)
+            if pt: params.append(("pageToken", pt))
             r = requests.get(_fs_url(col), params=params, headers={"Authorization": f"Bearer {token}"}, timeout=30)
             if r.status_code != 200: break
             res = r.json()
+            fs_maliyet.yanit_say("okuma", r, max(len(res.get("documents", [])), 1))
             for doc in res.get("documents", []):
-                p = {k: _from_fv(v) for k, v in doc.get("fields", {}).items()}
+                p = FS_SEMA.coz(doc.get("fields", {}), alanlar)
                 p["_doc_id"] = doc["name"].split("/")[-1]
                 docs.append(p)
             pt = res.get("nextPageToken")
@@ -155,37 +177,18 @@ def fs_collection(col):
 # ═══════════════════════════════════════════════════════════════════
 # FCM BİLDİRİM
 # ═══════════════════════════════════════════════════════════════════
-def send_fcm(title, body, data=None):
-    if not FIREBASE_PROJECT_ID: return False
-    token = get_fcm_token()
-    if not token: return False
-    msg = {
-        "message": {
-            "topic": "halka_arz",
-            "notification": {"title": title, "body": body},
-            "android": {"priority": "high", "notification": {"sound": "default", "channel_id": "halka_arz_channel", "click_action": "FLUTTER_NOTIFICATION_CLICK"}},
-            "apns": {"payload": {"aps": {"sound": "default", "badge": 1}}},
-            "data": {k: str(v) for k, v in (data or {}).items()},
-        }
-    }
-    try:
-        r = requests.post(FCM_V1_URL.format(project_id=FIREBASE_PROJECT_ID), json=msg,
-                          headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json; UTF-8"}, timeout=10)
-        if r.status_code == 200:
-            print(f"  [FCM ✓] {title}")
-            return True
-        print(f"  [FCM HATA] {r.status_code}: {r.text[:100]}")
-        return False
-    except: return False
+# Kalıcı bağlantı + hız sınırı + 429/503 yeniden deneme (fcm_gonderici); send_fcm(title, body, data, kosul) → bool,
+# send_fcm.toplu([...]) → mesaj başına sonuç. Token her toplu gönderimde get_fcm_token'dan (önbellekli) alınır.
+send_fcm = fcm_gonderici.FcmGonderici(FIREBASE_PROJECT_ID, lambda: get_fcm_token())
 
 
 # ═══════════════════════════════════════════════════════════════════
 # WEB SCRAPING — halkarz.com
 # ═══════════════════════════════════════════════════════════════════
 def safe_get(url, timeout=15):
-    time.sleep(random.uniform(0.5, 1.2))
+    http_kaset.bekle(random.uniform(0.5, 1.2))
     try:
-        r = requests.get(url, headers=SCRAPE_HEADERS, timeout=timeout)
+        r = dayanikli_http.getir(url, headers=SCRAPE_HEADERS, timeout=timeout)
         r.raise_for_status()
         return r
     except requests.RequestException as e:
@@ -220,19 +223,30 @@ def clean_lot(text):
     try: return int(text)
     except: return 0
 
-def fetch_detail(url):
-    defaults = {
+def _detay_varsayilan():
+    return {
         "arz_fiyati": 0.0, "toplam_lot": 0, "dagitim_sekli": "Eşit",
         "konsorsiyum_lideri": "", "katilim_endeksine_uygun": False,
         "kisi_basi_lot": "",
         "bireysel_lot": 0, "bireysel_yuzde": 0, "sirket_aciklama": "",
         "pazar": "", "bist_ilk_islem_tarihi": "",
     }
-    if not url: return defaults
+
+DETAY_ALANLARI = tuple(_detay_varsayilan())
+
+@olcum.asama("detay_sayfasi")
+def fetch_detail(url):
+    """Detay sayfası → alanlar. Sayfa yeniden denemelere rağmen çekilemezse None (varsayılanlar yazılmasın)."""
+    if not url: return _detay_varsayilan()
     resp = safe_get(url)
-    if not resp: return defaults
-    soup = BeautifulSoup(resp.text, "html.parser")
-    d = dict(defaults)
+    if not resp: return None
+    return parse_detail(resp.text)
+
+@olcum.asama("ayristir")
+def parse_detail(html):
+    """Detay sayfası HTML'ini ayrıştırır (ağdan bağımsız; profil/benchmark için ayrı aşama)."""
+    soup = BeautifulSoup(html, "html.parser")
+    d = _detay_varsayilan()
 
     for tbl in soup.find_all("table"):
         for tr in tbl.find_all("tr"):
@@ -275,7 +289,14 @@ def scrape_first_20():
         print("  halkarz.com'a ulaşılamadı.")
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    results = parse_liste(resp.text)
+    print(f"  {len(results)} halka arz bulundu.")
+    return results
+
+
+def parse_liste(html):
+    """Ana sayfa HTML'inden ilk MAX_IPO_COUNT halka arzı çıkarır (ağdan bağımsız)."""
+    soup = BeautifulSoup(html, "html.parser")
     arz_lists = soup.find_all("ul", class_="halka-arz-list")
     if not arz_lists:
         print("  halka-arz-list bulunamadı.")
@@ -316,8 +337,6 @@ def scrape_first_20():
             "tarih_str": tarih_str, "start_dt": start_dt, "end_dt": end_dt,
             "detail_url": detail_url,
         })
-
-    print(f"  {len(results)} halka arz bulundu.")
     return results
 
 
@@ -330,53 +349,75 @@ def kategorize(start_dt, end_dt, bugun):
 
 
 # ═══════════════════════════════════════════════════════════════════
-# YAHOO FINANCE — Kapanış fiyatı (işlem gören hisseler için)
+# FİYAT — Kapanış fiyatı (işlem gören hisseler için, bkz. fiyat_saglayici)
 # ═══════════════════════════════════════════════════════════════════
+@olcum.asama("yahoo")
 def fetch_yahoo_prices(ticker_list):
-    """Yahoo Finance'ten hisse fiyatlarını çeker. Dönüş: {KOD: fiyat}"""
+    """Son günlük kapanış fiyatlarını çeker (toplu istek). Dönüş: {KOD: fiyat}"""
     if not ticker_list: return {}
+    print(f"  {get_provider().ad}: {len(ticker_list)} hisse sorgulanıyor...")
+    prices = {}
     try:
-        import yfinance as yf
-        symbols = [f"{t}.IS" for t in ticker_list]
-        print(f"  Yahoo Finance: {len(symbols)} hisse sorgulanıyor...")
-        prices = {}
-        for kod, sym in zip(ticker_list, symbols):
-            try:
-                tk = yf.Ticker(sym)
-                hist = tk.history(period="5d")
-                if not hist.empty:
-                    prices[kod] = round(float(hist["Close"].iloc[-1]), 2)
-                    print(f"    {kod} → ₺{prices[kod]}")
-            except Exception as e:
-                print(f"    {kod} fiyat alınamadı: {e}")
-        return prices
-    except ImportError:
-        print("  [HATA] yfinance yüklü değil!")
+        barlar = get_provider().batch_history(ticker_list, period="5d")
+    except Exception as e:
+        print(f"  [HATA] Fiyatlar alınamadı: {e}")
         return {}
+    for kod in ticker_list:
+        bars = barlar.get(kod)
+        if bars:
+            prices[kod] = round(bars[-1].kapanis, 2)
+            print(f"    {kod} → ₺{prices[kod]}")
+        else:
+            print(f"    {kod} fiyat alınamadı")
+    return prices
 
 
 # ═══════════════════════════════════════════════════════════════════
 # ANA FONKSİYON
 # ═══════════════════════════════════════════════════════════════════
 def main():
-    bugun = datetime.now()
+    # Yarım kalan çalıştırma devralınıyorsa "bugün" (ve guncelleme_zamani) aynı kalır
+    bugun = islem_gunlugu.hatirla("bugun", datetime.now)
     print("=" * 60)
     print(f"  Günlük Halka Arz Botu — {bugun.strftime('%Y-%m-%d %H:%M')}")
     print("=" * 60)
 
     # 1. Scrape
-    raw_list = scrape_first_20()
+    olcum.adim("kazima")
+    raw_list = islem_gunlugu.hatirla("kazima", scrape_first_20)
     if not raw_list:
         print("[BİTTİ] Veri alınamadı.")
         return
+    firestore_guncelle(raw_list, bugun)
+
+
+def firestore_guncelle(raw_list, bugun, fiyatlar=None):
+    """
+    Kazınmış listeyi Firestore'a işler: detaylar, yazma, fiyat, bildirim, temizlik.
+    pipeline.py için: item["det"] verilmişse detay sayfası çekilmez (None: çekilemedi); fiyatlar
+    ({KOD: kapanış}) verilirse fiyat sağlayıcıya gidilmez. Bildirimler bildirim_kutusu'nda
+    toplanır, state kaydından önce birleştirilip gönderilir.
+    Dönüş: (gönderilen mesaj sayısı, başarısız set:/sil:/set:state işlem sayısı).
+    """
 
     # 2. Mevcut state'i oku
     print("\n[2/4] Bildirim durumu okunuyor...")
-    state = fs_get(STATE_DOC_PATH) or {}
-    prev_docs = {d["_doc_id"]: d for d in fs_collection(FIRESTORE_COLLECTION)}
+    olcum.adim("durum_oku")
+    # Günlüğe alınır: devralınan çalıştırmada yarısı yazılmış dokümanlar "önceki" sayılmasın
+    state = durum_deposu.DurumDeposu(
+        durum_deposu.FirestoreArkaUcu(STATE_DOC_PATH, fs_get, fs_set), ttl=BILDIRIM_TTL,
+        ham=islem_gunlugu.hatirla("state", fs_get, STATE_DOC_PATH) or {})
+    prev_docs = islem_gunlugu.hatirla(
+        "onceki_dokumanlar",
+        lambda: {d["_doc_id"]: fiyat_serisi.cozulmus(d) for d in fs_collection(
+            FIRESTORE_COLLECTION, alanlar=("durum", fiyat_serisi.HARITA, fiyat_serisi.SERI))})
+    # Teslim edilen bildirimin anahtarı state'e yazılır; gönderilemeyen sonraki çalıştırmada tekrar denenir
+    kutu = bildirim_kutusu.BildirimKutusu(send_fcm, state=state)
+    basarisiz = 0  # Yazılamayan/silinemeyen doküman + state; sonraki çalıştırma yeniden dener
 
     # 3. Kategorize et ve TÜM detayları çek
     print("\n[3/5] Kategorize ediliyor ve detaylar çekiliyor...")
+    olcum.adim("detaylar")
     taslak_list, arz_list, islem_list = [], [], []
 
     for item in raw_list:
@@ -387,8 +428,16 @@ def main():
 
         # TÜM halka arzlar için detay sayfasını çek
         print(f"  [{kat.upper()}] {adi} ({kod}) detay çekiliyor...")
-        det = fetch_detail(item["detail_url"])
-        item["det"] = det
+        if "det" not in item:
+            item["det"] = islem_gunlugu.hatirla(f"detay:{kod}", fetch_detail, item["detail_url"])
+        if item["det"] is None:
+            # Sayfa yeniden denemelere rağmen çekilemedi: son bilinen iyi detay (mevcut doküman) yazılır
+            onceki = fs_get(f"{FIRESTORE_COLLECTION}/{kod}", alanlar=DETAY_ALANLARI) if kod in prev_docs else None
+            if not onceki:
+                print(f"    [UYARI] {kod} detayı alınamadı, önceki kayıt yok → bu çalıştırmada atlandı.")
+                continue
+            print(f"    [UYARI] {kod} detayı alınamadı → önceki kayıttaki detay korunuyor.")
+            item["det"] = {**_detay_varsayilan(), **onceki}
 
         if kat == "taslak":
             taslak_list.append(item)
@@ -399,21 +448,13 @@ def main():
 
     # 4. Firestore'a yaz
     print("\n[4/5] Firestore'a yazılıyor...")
+    olcum.adim("firestore_yaz")
 
     def build_doc(item, kat, extra=None):
-        det = item["det"]
-        doc = {
-            "sirket_kodu": item["sirket_kodu"], "sirket_adi": item["sirket_adi"],
-            "durum": kat, "tarih": item["tarih_str"],
-            "arz_fiyati": det["arz_fiyati"], "toplam_lot": det["toplam_lot"],
-            "dagitim_sekli": det["dagitim_sekli"], "konsorsiyum_lideri": det["konsorsiyum_lideri"],
-            "katilim_endeksine_uygun": det["katilim_endeksine_uygun"],
-            "kisi_basi_lot": det["kisi_basi_lot"],
-            "bireysel_lot": det["bireysel_lot"],
-            "bireysel_yuzde": det["bireysel_yuzde"], "sirket_aciklama": det["sirket_aciklama"],
-            "pazar": det["pazar"], "bist_ilk_islem_tarihi": det["bist_ilk_islem_tarihi"],
-            "guncelleme_zamani": bugun.isoformat(),
-        }
+        doc = Ipo.from_dict({
+            **item["det"], "sirket_kodu": item["sirket_kodu"], "sirket_adi": item["sirket_adi"],
+            "durum": kat, "tarih_raw": item["tarih_str"], "guncelleme_zamani": bugun.isoformat(),
+        }).to_doc()
         if extra:
             doc.update(extra)
         return doc
@@ -424,25 +465,45 @@ def main():
         adi = item["sirket_adi"]
         kat = item["kategori"]
         doc = build_doc(item, kat)
-        fs_set(f"{FIRESTORE_COLLECTION}/{kod}", doc, merge=False)
+        if not islem_gunlugu.yap(f"set:{kod}", fs_set, f"{FIRESTORE_COLLECTION}/{kod}", doc, merge=False):
+            print(f"  [!] {kod} yazılamadı")
+            basarisiz += 1
 
-        # Bildirim: yeni arz mı?
-        if f"yeni_arz_{kod}" not in state:
-            send_fcm("🆕 Yeni Halka Arz!", f"{adi} — ₺{item['det']['arz_fiyati']}", {"type": "yeni_arz", "ticker": kod})
-            state[f"yeni_arz_{kod}"] = bugun.isoformat()
+        # Bildirim: yeni arz mı? (aynı gün birden çok yeni arz tek özet mesajı olur)
+        kutu.ekle("yeni_arz", "🆕 Yeni Halka Arz!", f"{adi} — ₺{item['det']['arz_fiyati']}", kod=kod,
+                  anahtar=f"yeni_arz_{kod}", deger=bugun.isoformat(), ozet="🆕 {n} Yeni Halka Arz!")
 
         # Bildirim: durum değişikliği?
         prev = prev_docs.get(kod, {})
         if prev.get("durum") and prev["durum"] != kat:
             if kat == "arz":
-                send_fcm("📢 Talep Toplama Başladı!", f"{adi} halka arzı talep topluyor!", {"type": "durum_degisim", "ticker": kod})
-            state[f"durum_{kod}_{kat}"] = bugun.isoformat()
+                kutu.ekle("durum_degisim", "📢 Talep Toplama Başladı!", f"{adi} halka arzı talep topluyor!",
+                          kod=kod, anahtar=f"durum_{kod}_{kat}", deger=bugun.isoformat(),
+                          ozet="📢 {n} Halka Arz Talep Topluyor!")
+            else:
+                state[f"durum_{kod}_{kat}"] = bugun.isoformat()
 
     # ── İŞLEM → Detay + Yahoo Finance fiyat + Firestore güncelle ──
+    olcum.adim("islem_fiyat")
     if islem_list:
-        print(f"\n  İşlem gören {len(islem_list)} hisse için fiyat çekiliyor...")
-        islem_kodlari = [i["sirket_kodu"] for i in islem_list]
-        fiyatlar = fetch_yahoo_prices(islem_kodlari)
+        # Fiyat, seansı kapanmış son işlem gününe aittir (bot açılıştan önce çalışır)
+        simdi_tr = datetime.now(TR_TZ)
+        kapanis_gunu = bist_takvimi.son_kapanis_gunu(simdi_tr)
+        kapanis_str = kapanis_gunu.isoformat()
+        # Dünkü çalıştırma aynı kapanışı zaten gördüyse (tatil/hafta sonu) Yahoo'ya gitme
+        ayni_kapanis = bist_takvimi.son_kapanis_gunu(simdi_tr - timedelta(days=1)) == kapanis_gunu
+
+        islem_kodlari = []
+        for i in islem_list:
+            gecmis = prev_docs.get(i["sirket_kodu"], {}).get("fiyat_gecmisi")
+            if ayni_kapanis and isinstance(gecmis, dict) and kapanis_str in gecmis:
+                continue
+            islem_kodlari.append(i["sirket_kodu"])
+        atlanan = len(islem_list) - len(islem_kodlari)
+        print(f"\n  İşlem gören {len(islem_list)} hisse | kapanış günü {kapanis_str}"
+              + (f" | {atlanan} hisse güncel, atlandı" if atlanan else ""))
+        if fiyatlar is None:
+            fiyatlar = islem_gunlugu.hatirla("fiyatlar", fetch_yahoo_prices, islem_kodlari)
 
         for item in islem_list:
             kod = item["sirket_kodu"]
@@ -450,15 +511,17 @@ def main():
             fiyat = fiyatlar.get(kod)
 
             # Mevcut dokümanı oku (fiyat_gecmisi'ni korumak için)
-            mevcut = fs_get(f"{FIRESTORE_COLLECTION}/{kod}") or {}
-            fiyat_gecmisi = mevcut.get("fiyat_gecmisi", {})
-            if not isinstance(fiyat_gecmisi, dict): fiyat_gecmisi = {}
+            mevcut = fs_get(f"{FIRESTORE_COLLECTION}/{kod}", alanlar=(fiyat_serisi.HARITA, fiyat_serisi.SERI)) or {}
+            fiyat_gecmisi = fiyat_serisi.oku(mevcut)
+
+            if not fiyat and kod not in islem_kodlari:
+                fiyat = fiyat_gecmisi.get(kapanis_str)
 
             extra = {}
             if fiyat:
-                fiyat_gecmisi[bugun.strftime("%Y-%m-%d")] = fiyat
+                fiyat_gecmisi[kapanis_str] = fiyat
                 extra["son_fiyat"] = fiyat
-                extra["fiyat_gecmisi"] = fiyat_gecmisi
+                extra.update(fiyat_serisi.yazilacak(fiyat_gecmisi))  # HALKARZ_FIYAT_BICIMI biçiminde
                 print(f"  [İŞLEM] {adi} ({kod}) → ₺{fiyat}")
             else:
                 extra["son_fiyat"] = "Borsaya açılmadı henüz"
@@ -466,48 +529,58 @@ def main():
 
             doc = build_doc(item, "islem", extra)
             # Mevcut fiyat_gecmisi'ni korumak için merge=True
-            fs_set(f"{FIRESTORE_COLLECTION}/{kod}", doc, merge=True)
+            if not islem_gunlugu.yap(f"set:{kod}", fs_set, f"{FIRESTORE_COLLECTION}/{kod}", doc, merge=True):
+                print(f"  [!] {kod} yazılamadı")
+                basarisiz += 1
 
             # Bildirim: durum değişikliği (arz → islem)?
             prev = prev_docs.get(kod, {})
             if prev.get("durum") and prev["durum"] != "islem":
-                dkey = f"durum_{kod}_islem"
-                if dkey not in state:
-                    send_fcm("🔔 Borsada İşlem Başladı!", f"{adi} artık borsada işlem görüyor!", {"type": "islem_basladi", "ticker": kod})
-                    state[dkey] = bugun.isoformat()
-
-    # 5. State kaydet
-    print(f"\n[5/5] Bildirim durumu kaydediliyor...")
-    cutoff = bugun - timedelta(days=7)
-    cleaned = {}
-    for k, v in state.items():
-        try:
-            if datetime.fromisoformat(str(v)) > cutoff: cleaned[k] = v
-        except: cleaned[k] = v
-    fs_set(STATE_DOC_PATH, cleaned, merge=False)
+                kutu.ekle("islem_basladi", "🔔 Borsada İşlem Başladı!", f"{adi} artık borsada işlem görüyor!",
+                          kod=kod, anahtar=f"durum_{kod}_islem", deger=bugun.isoformat(),
+                          ozet="🔔 {n} Hisse Borsada İşlem Görmeye Başladı!")
+
+    # 5. Bildirimleri gönder + state kaydet
+    print(f"\n[5/5] Bildirimler gönderiliyor, durum kaydediliyor...")
+    olcum.adim("bildirim")
+    gonderilen = kutu.gonder()
+    olcum.adim("state_kaydet")
+    # Süresi dolanlar atılır; sadece değişen/silinen alanlar yazılır (merge)
+    if not islem_gunlugu.yap("set:state", state.kaydet):
+        print("  [!] Bildirim durumu kaydedilemedi")
+        basarisiz += 1
 
     # 6. Eski halka arzları sil (son 20'de olmayanlar)
     print(f"\n[6/6] Eski halka arzlar temizleniyor...")
-    aktif_kodlar = set(i["sirket_kodu"] for i in taslak_list + arz_list + islem_list)
-    mevcut_docs = fs_collection(FIRESTORE_COLLECTION)
+    olcum.adim("temizlik")
+    # Detayı alınamayıp atlanan kalemler de aktif: dokümanları silinmez
+    aktif_kodlar = set(i["sirket_kodu"] for i in raw_list)
+    mevcut_docs = fs_collection(FIRESTORE_COLLECTION, alanlar=())
     silinen = 0
     for doc in mevcut_docs:
         doc_id = doc.get("_doc_id", "")
         if doc_id and doc_id not in aktif_kodlar:
-            if fs_delete(f"{FIRESTORE_COLLECTION}/{doc_id}"):
+            if islem_gunlugu.yap(f"sil:{doc_id}", fs_delete, f"{FIRESTORE_COLLECTION}/{doc_id}"):
                 print(f"  [×] {doc_id} silindi (artık ilk 20'de değil)")
                 silinen += 1
             else:
                 print(f"  [!] {doc_id} silinemedi")
+                basarisiz += 1
     if silinen:
         print(f"  Toplam {silinen} eski doküman silindi.")
     else:
         print(f"  Temizlenecek doküman yok.")
 
     print("\n" + "=" * 60)
-    print(f"  Taslak: {len(taslak_list)} | Arz: {len(arz_list)} | İşlem: {len(islem_list)}")
+    print(f"  Taslak: {len(taslak_list)} | Arz: {len(arz_list)} | İşlem: {len(islem_list)}"
+          + (f" | {basarisiz} işlem başarısız" if basarisiz else ""))
     print("=" * 60)
+    return gonderilen, basarisiz
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("main"), islem_gunlugu.calistirma("main"):
+        try:
+            main()
+        finally:
+            fs_maliyet.gunluk_ozet_yaz("main", FIREBASE_PROJECT_ID, get_firestore_token)
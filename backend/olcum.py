@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Ölçüm — Aşama Bazlı Süre ve Kaynak Kaydı
+=========================================
+Her giriş betiği çalıştırmayı olcum.calistirma() ile sarar; içerideki
+aşamalar iç içe açılabilir ve aynı isimli aşamalar toplanır (daemon turları,
+her fs_set çağrısı vb.):
+
+  with olcum.calistirma("main"):
+      olcum.adim("kazima")               # sıradaki adim()'e kadar sürer
+      ...
+      with olcum.asama("yahoo"): ...     # bağlam yöneticisi
+
+  @olcum.asama("firestore")              # veya dekoratör
+  def fs_get(...): ...
+
+Aşama başına: çağrı sayısı, duvar süresi, CPU süresi, host bazında HTTP
+istek/bayt/hata sayısı. Çalıştırma sonunda tepe RSS ile birlikte JSON rapor
+yazılır (HALKARZ_RUN_REPORT, varsayılan data/reports/<betik>.json) ve
+GitHub Actions'ta GITHUB_STEP_SUMMARY'e tablo olarak eklenir.
+
+HTTP sayımı requests.Session.send üzerinden yapılır; requests dışındaki
+istemciler (yfinance'in curl_cffi'si, firebase_admin gRPC) sayılmaz, süreleri
+yine aşamalarına yansır. calistirma() dışında asama()/adim() kayıt tutmaz.
+
+--profile[=aşama] / HALKARZ_PROFILE ile çalıştırma cProfile + tracemalloc
+altında koşar; bkz. profil.py.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RAPOR_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reports")
+
+_kilit = threading.Lock()
+_aktif = None          # Çalışan _Calistirma
+_orijinal_send = None  # Yamadan önceki requests.Session.send
+_bolumler: dict = {}   # Ek rapor bölümleri: ad → (veri_fn, markdown_fn)
+_profilci = None       # --profile / HALKARZ_PROFILE açıksa profil.Profilci
+
+
+def tepe_rss_mb() -> Optional[float]:
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (MB)."""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döner
+    return round(tepe / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _yeni_istatistik():
+    return {"adet": 0, "duvar_s": 0.0, "cpu_s": 0.0, "maks_s": 0.0, "http": {}}
+
+
+def _http_ekle(hedef, host, bayt, hata):
+    h = hedef.setdefault(host, {"istek": 0, "bayt": 0, "hata": 0})
+    h["istek"] += 1
+    h["bayt"] += bayt
+    h["hata"] += hata
+
+
+class _Calistirma:
+    def __init__(self, betik):
+        self.betik = betik
+        self.baslangic = datetime.now(timezone.utc)
+        self.t0 = time.perf_counter()
+        self.c0 = time.process_time()
+        self.yigin: list[str] = []          # Açık aşama yolları (iç içe)
+        self.adimlar: dict[str, tuple] = {}  # Açık adim() yolları → (t0, c0)
+        self.asamalar: dict[str, dict] = {}  # yol → istatistik (ilk açılış sırasıyla)
+        self.http: dict[str, dict] = {}
+
+    def _yol(self, ad):
+        return f"{self.yigin[-1]}/{ad}" if self.yigin else ad
+
+    def ac(self, ad):
+        with _kilit:
+            yol = self._yol(ad)
+            self.asamalar.setdefault(yol, _yeni_istatistik())
+            self.yigin.append(yol)
+        if _profilci:
+            _profilci.gir(ad)
+        return yol, time.perf_counter(), time.process_time()
+
+    def kapa(self, yol, t0, c0):
+        # Bu aşamanın içinde açılmış adımlar onunla biter
+        for ic in [a for a in self.adimlar if a.startswith(yol + "/")]:
+            self.kapa(ic, *self.adimlar.pop(ic))
+        duvar = time.perf_counter() - t0
+        cpu = time.process_time() - c0
+        if _profilci:
+            _profilci.cik(yol.rsplit("/", 1)[-1])
+        with _kilit:
+            s = self.asamalar[yol]
+            s["adet"] += 1
+            s["duvar_s"] += duvar
+            s["cpu_s"] += cpu
+            s["maks_s"] = max(s["maks_s"], duvar)
+            if yol in self.yigin:
+                # Kapanmamış iç aşamalarla birlikte çıkar
+                del self.yigin[self.yigin.index(yol):]
+
+    def adim(self, ad):
+        # En içteki açık kayıt bir adımsa bu onun kardeşidir: önce onu kapat
+        if self.yigin and self.yigin[-1] in self.adimlar:
+            ust = self.yigin[-1]
+            self.kapa(ust, *self.adimlar.pop(ust))
+        yol, t0, c0 = self.ac(ad)
+        self.adimlar[yol] = (t0, c0)
+
+    def adimlari_bitir(self):
+        for yol in sorted(self.adimlar, key=lambda y: -y.count("/")):
+            if yol in self.adimlar:
+                self.kapa(yol, *self.adimlar.pop(yol))
+
+    def http_kaydet(self, url, bayt, hata):
+        host = urlparse(url).hostname or "?"
+        with _kilit:
+            _http_ekle(self.http, host, bayt, hata)
+            for yol in self.yigin:
+                _http_ekle(self.asamalar[yol]["http"], host, bayt, hata)
+
+    def rapor(self, hata=None) -> dict:
+        def yuvarla(s):
+            return {**s, "duvar_s": round(s["duvar_s"], 3), "cpu_s": round(s["cpu_s"], 3),
+                    "maks_s": round(s["maks_s"], 3)}
+        return {
+            "betik": self.betik,
+            "baslangic": self.baslangic.isoformat(timespec="seconds"),
+            "duvar_s": round(time.perf_counter() - self.t0, 3),
+            "cpu_s": round(time.process_time() - self.c0, 3),
+            "tepe_rss_mb": tepe_rss_mb(),
+            "http": self.http,
+            "asamalar": {yol: yuvarla(s) for yol, s in self.asamalar.items()},
+            "hata": hata,
+            **{ad: veri() for ad, (veri, _) in _bolumler.items()},
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HTTP KANCASI
+# ═══════════════════════════════════════════════════════════════════
+def _govde_boyu(body):
+    if body is None: return 0
+    if isinstance(body, (bytes, bytearray, str)): return len(body)
+    return 0  # Akış/dosya gövdeleri sayılmaz
+
+
+def _kancayi_kur():
+    """requests.Session.send'i bir kez sarar (requests.get/post da Session kullanır)."""
+    global _orijinal_send
+    if _orijinal_send is not None:
+        return
+    import requests
+
+    _orijinal_send = requests.Session.send
+
+    @functools.wraps(_orijinal_send)
+    def send(self, request, **kwargs):
+        try:
+            r = _orijinal_send(self, request, **kwargs)
+        except Exception:
+            if _aktif: _aktif.http_kaydet(request.url, _govde_boyu(request.body), 1)
+            raise
+        if _aktif:
+            if kwargs.get("stream"):
+                gelen = int(r.headers.get("Content-Length") or 0)
+            else:
+                gelen = len(r.content or b"")
+            _aktif.http_kaydet(request.url, _govde_boyu(request.body) + gelen, int(r.status_code >= 400))
+        return r
+
+    requests.Session.send = send
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GENEL ARAYÜZ
+# ═══════════════════════════════════════════════════════════════════
+class asama:
+    """Bir aşamayı ölçer. Bağlam yöneticisi veya dekoratör olarak kullanılır."""
+
+    def __init__(self, ad):
+        self.ad = ad
+        self._acik = threading.local()
+
+    def __enter__(self):
+        cal = _aktif
+        self._acik.kayit = (cal, cal.ac(self.ad)) if cal else None
+        return self
+
+    def __exit__(self, *exc):
+        kayit = self._acik.kayit
+        if kayit:
+            cal, acik = kayit
+            cal.kapa(*acik)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def sarmal(*args, **kwargs):
+            with asama(self.ad):
+                return fn(*args, **kwargs)
+        return sarmal
+
+
+def adim(ad):
+    """Doğrusal akış için: önceki adım kapanır, yenisi bir sonraki adim()'e / çalıştırma sonuna kadar sürer."""
+    if _aktif:
+        _aktif.adim(ad)
+
+
+def rapor_bolumu(ad: str, veri, markdown=None):
+    """Rapora başka modülden bölüm ekler: veri() → JSON'a, markdown(veri) → iş özetine."""
+    _bolumler[ad] = (veri, markdown)
+
+
+def _ozet_markdown(r) -> str:
+    satirlar = [
+        f"### ⏱ {r['betik']} — {r['duvar_s']:.1f} sn (CPU {r['cpu_s']:.1f} sn, tepe RSS {r['tepe_rss_mb']} MB)",
+        "",
+        "| Aşama | Adet | Süre (sn) | CPU (sn) | En uzun (sn) | HTTP | KB |",
+        "|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for yol, s in r["asamalar"].items():
+        istek = sum(h["istek"] for h in s["http"].values())
+        kb = sum(h["bayt"] for h in s["http"].values()) / 1024
+        girinti = "&nbsp;&nbsp;" * yol.count("/")
+        satirlar.append(f"| {girinti}{yol.rsplit('/', 1)[-1]} | {s['adet']} | {s['duvar_s']:.2f} | "
+                        f"{s['cpu_s']:.2f} | {s['maks_s']:.2f} | {istek} | {kb:.0f} |")
+    if r["http"]:
+        satirlar += ["", "| Host | İstek | KB | Hata |", "|---|---:|---:|---:|"]
+        for host, h in sorted(r["http"].items(), key=lambda x: -x[1]["istek"]):
+            satirlar.append(f"| {host} | {h['istek']} | {h['bayt'] / 1024:.0f} | {h['hata']} |")
+    for ad, (_, markdown) in _bolumler.items():
+        if markdown and r.get(ad):
+            satirlar += ["", markdown(r[ad])]
+    if r["hata"]:
+        satirlar += ["", f"**Hata:** `{r['hata']}`"]
+    return "\n".join(satirlar) + "\n"
+
+
+def rapor_yaz(r: dict):
+    path = os.environ.get("HALKARZ_RUN_REPORT") or os.path.join(RAPOR_DIZINI, f"{r['betik']}.json")
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(r, f, ensure_ascii=False, indent=2)
+        print(f"[BİLGİ] Çalıştırma raporu: {path}")
+    except OSError as e:
+        print(f"[UYARI] Çalıştırma raporu yazılamadı: {e}")
+
+    ozet = os.environ.get("GITHUB_STEP_SUMMARY")
+    if ozet:
+        try:
+            with open(ozet, "a", encoding="utf-8") as f:
+                f.write(_ozet_markdown(r))
+        except OSError:
+            pass
+
+
+@contextmanager
+def calistirma(betik: str):
+    """Giriş betiğinin tamamını ölçer; çıkışta (hata olsa da) raporu yazar."""
+    global _aktif, _profilci
+    _kancayi_kur()
+    if os.environ.get("HALKARZ_PROFILE") or any(a.startswith("--profile") for a in sys.argv[1:]):
+        import profil
+        ayar = profil.ayar_oku()
+        if ayar is not None:
+            _profilci = profil.Profilci(betik, {a.strip() for a in ayar.split(",") if a.strip()})
+            _profilci.baslat()
+    onceki = _aktif
+    _aktif = cal = _Calistirma(betik)
+    hata = None
+    try:
+        yield cal
+    except BaseException as e:
+        hata = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        cal.adimlari_bitir()
+        _aktif = onceki
+        if _profilci:
+            _profilci.bitir()
+            _profilci = None
+        rapor_yaz(cal.rapor(hata))
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Pipeline — Tek Kazıma, Çok Çıktı
+=================================
+main, scraper, halkarz_scraper, kap_scraper ve ipo_price_scraper ana sayfayı
+ayrı ayrı indirip aynı kayıtları yeniden türetiyor. Bu betik işi aşamalardan
+oluşan bir DAG olarak çalıştırır; Firestore ve ipos.json aynı kazımayı paylaşır:
+
+  ana_sayfa → liste → detay_sayfalari → detaylar → kayitlar ─┬─────────────────────────┐
+                                                             └→ fiyatlar → metrikler ─┴→ firestore
+                                                                                       └→ ipos_json
+
+Her aşamanın çıktısı, girdilerinin (bağımlı aşama çıktıları + aşamaya özgü ek
+anahtar) sha256 özetiyle data/cache/pipeline/<aşama>.json.gz'ye yazılır. Özet
+değişmediyse aşama çalışmaz, çıktı önbellekten gelir; bir aşama yeniden çalışıp
+aynı çıktıyı üretirse sonrakiler de atlanır. Ek anahtarlar:
+
+  ana_sayfa, detay_sayfalari → tazelik dilimi (--tazelik sn, varsayılan 3600)
+  kayitlar, metrikler        → bugünün tarihi (kategori/sparkline tarihe bağlı)
+  fiyatlar                   → son kapanış günü (yeni kapanış gelene kadar Yahoo'ya gidilmez)
+
+Firestore yazımı ve bildirimler main.firestore_guncelle() ile yapılır (aynı
+state/temizlik kuralları). Bildirimler firestore aşamasının içinde gönderilir:
+tekilleştirme anahtarları ancak teslimden sonra state'e yazıldığından, ayrı bir
+aşamada (önbellekten gelebilir, hata verebilir) gönderilmeleri bildirim
+kaybettirir. ipos.json, halkarz_scraper.merge_scraped_data + scraper.sparkline_hesapla
+ile güncellenir.
+
+  python backend/pipeline.py                            # tüm çıktılar
+  python backend/pipeline.py --hedef ipos_json          # sadece ipos.json (Firestore'a dokunmaz)
+  python backend/pipeline.py --zorla detay_sayfalari    # aşamayı önbelleğe bakmadan çalıştır
+  python backend/pipeline.py --durum                    # DAG ve önbellek durumu
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import bist_takvimi
+import fs_maliyet
+import olcum
+from bist_takvimi import TR_TZ
+from ipo_modeli import kanonik_durum
+
+ONBELLEK_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "pipeline")
+VARSAYILAN_TAZELIK = 3600
+CIKTILAR = ("firestore", "ipos_json")
+# Detayı çekilemeyen kalem: sıfır/boş değerler merge_scraped_data'da mevcut kaydın üzerine yazılmaz
+_BOS_DETAY = {"arz_fiyati": 0.0, "toplam_lot": 0, "dagitim_sekli": ""}
+
+Dugum = namedtuple("Dugum", "ad bagimli fn ek surum")
+DUGUMLER: dict[str, Dugum] = {}
+
+
+def dugum(ad, bagimli=(), ek=None, surum=1):
+    """
+    DAG'a aşama ekler. fn(pipeline, *bagimli_ciktilar) → JSON'a yazılabilir çıktı.
+    ek(pipeline) → anahtara katılan ek değer; surum, aşama mantığı değişince
+    eski önbelleği geçersiz kılmak için artırılır.
+    """
+    def kaydet(fn):
+        DUGUMLER[ad] = Dugum(ad, tuple(bagimli), fn, ek, surum)
+        return fn
+    return kaydet
+
+
+def ozet(veri) -> str:
+    return hashlib.sha256(json.dumps(veri, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ÇALIŞTIRICI
+# ═══════════════════════════════════════════════════════════════════
+class Pipeline:
+    def __init__(self, tazelik=VARSAYILAN_TAZELIK, zorla=(), dizin=ONBELLEK_DIZINI, bugun=None):
+        self.tazelik = tazelik
+        self.zorla = set(zorla)
+        self.dizin = dizin
+        self.bugun = bugun or datetime.now()
+        self.sonuclar: dict[str, tuple[str, object]] = {}  # ad → (çıktı özeti, çıktı)
+        self.durum: dict[str, str] = {}                    # ad → "önbellek" | "çalıştı"
+
+    def _yol(self, ad):
+        return os.path.join(self.dizin, f"{ad}.json.gz")
+
+    def onbellek_oku(self, ad):
+        try:
+            with gzip.open(self._yol(ad), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _onbellek_yaz(self, ad, kayit):
+        os.makedirs(self.dizin, exist_ok=True)
+        gecici = f"{self._yol(ad)}.tmp"
+        with gzip.open(gecici, "wt", encoding="utf-8") as f:
+            json.dump(kayit, f, ensure_ascii=False)
+        os.replace(gecici, self._yol(ad))
+
+    def onceki_cikti(self, ad):
+        """Aşamanın son başarılı çıktısı (anahtar tutmasa da); yoksa None."""
+        kayit = self.onbellek_oku(ad)
+        return kayit["cikti"] if kayit else None
+
+    def anahtar(self, ad, girdi_ozetleri):
+        d = DUGUMLER[ad]
+        return ozet({"surum": d.surum, "girdiler": girdi_ozetleri, "ek": d.ek(self) if d.ek else None})
+
+    def calistir(self, ad):
+        """Aşamayı (ve gerekiyorsa bağımlılıklarını) çalıştırır; çıktısını döner."""
+        if ad in self.sonuclar:
+            return self.sonuclar[ad][1]
+        d = DUGUMLER[ad]
+        girdiler = [self.calistir(b) for b in d.bagimli]
+        anahtar = self.anahtar(ad, [self.sonuclar[b][0] for b in d.bagimli])
+
+        kayit = None if ad in self.zorla else self.onbellek_oku(ad)
+        if kayit and kayit.get("anahtar") == anahtar:
+            self.sonuclar[ad] = (kayit["cikti_ozet"], kayit["cikti"])
+            self.durum[ad] = "önbellek"
+            print(f"[■] {ad:<16} önbellekten ({kayit['zaman']})")
+            return kayit["cikti"]
+
+        print(f"[▶] {ad:<16} çalışıyor...")
+        t0 = time.perf_counter()
+        with olcum.asama(ad):
+            cikti = d.fn(self, *girdiler)
+        cikti_ozet = ozet(cikti)
+        self._onbellek_yaz(ad, {"anahtar": anahtar, "cikti_ozet": cikti_ozet,
+                                "zaman": datetime.now().isoformat(timespec="seconds"), "cikti": cikti})
+        self.sonuclar[ad] = (cikti_ozet, cikti)
+        self.durum[ad] = "çalıştı"
+        print(f"[✓] {ad:<16} {time.perf_counter() - t0:.2f} sn")
+        return cikti
+
+
+def _tazelik_dilimi(p):
+    return int(time.time() // p.tazelik) if p.tazelik > 0 else time.time()
+
+
+def _bugun(p):
+    return p.bugun.date().isoformat()
+
+
+def _son_kapanis(p):
+    return bist_takvimi.son_kapanis_gunu(datetime.now(TR_TZ)).isoformat()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# AŞAMALAR
+# ═══════════════════════════════════════════════════════════════════
+@dugum("ana_sayfa", ek=_tazelik_dilimi)
+def ana_sayfa(p):
+    import main
+    resp = main.safe_get(main.SCRAPE_BASE_URL)
+    if not resp:
+        raise RuntimeError("halkarz.com'a ulaşılamadı")
+    return resp.text
+
+
+@dugum("liste", bagimli=("ana_sayfa",))
+def liste(p, html):
+    import main
+    sonuc = []
+    for item in main.parse_liste(html):
+        start_dt, end_dt = item.pop("start_dt"), item.pop("end_dt")
+        item["start"] = start_dt.isoformat() if start_dt else ""
+        item["end"] = end_dt.isoformat() if end_dt else ""
+        sonuc.append(item)
+    print(f"  {len(sonuc)} halka arz bulundu.")
+    return sonuc
+
+
+@dugum("detay_sayfalari", bagimli=("liste",), ek=_tazelik_dilimi)
+def detay_sayfalari(p, kalemler):
+    import main
+    # Çekilemeyen sayfa için bir önceki çalıştırmanın HTML'i kullanılır
+    onceki = p.onceki_cikti("detay_sayfalari") or {}
+    sayfalar = {}
+    for item in kalemler:
+        url = item["detail_url"]
+        if not url:
+            continue
+        resp = main.safe_get(url)
+        if resp:
+            sayfalar[url] = resp.text
+        elif onceki.get(url):
+            print(f"  [UYARI] {url} çekilemedi, önceki sayfa kullanılıyor.")
+            sayfalar[url] = onceki[url]
+    return sayfalar
+
+
+@dugum("detaylar", bagimli=("detay_sayfalari",))
+def detaylar(p, sayfalar):
+    import main
+    return {url: main.parse_detail(html) for url, html in sayfalar.items()}
+
+
+@dugum("kayitlar", bagimli=("liste", "detaylar"), ek=_bugun, surum=2)
+def kayitlar(p, kalemler, detaylar):
+    import main
+    sonuc = []
+    for item in kalemler:
+        start = datetime.fromisoformat(item["start"]) if item["start"] else None
+        end = datetime.fromisoformat(item["end"]) if item["end"] else None
+        sonuc.append({**item, "kategori": main.kategorize(start, end, p.bugun),
+                      # Sayfası hiç çekilemeyen kalem None: firestore önceki dokümanın detayını korur
+                      "det": detaylar.get(item["detail_url"]) if item["detail_url"] else main._detay_varsayilan()})
+    return sonuc
+
+
+@dugum("fiyatlar", bagimli=("kayitlar",), ek=_son_kapanis, surum=2)
+def fiyatlar(p, kayitlar):
+    """
+    İşlem gören hisselerin 1 yıllık günlük kapanışları: {KOD: [[tarih, kapanış], ...]}
+    Sadece son kapanış gününe kadarki barlar: seans içinde çalışınca bugünün yarım barı
+    son_fiyat olup dünkü kapanışın yerine yazılmasın.
+    """
+    from fiyat_saglayici import get_provider
+    kodlar = sorted({k["sirket_kodu"] for k in kayitlar if k["kategori"] == "islem"})
+    if not kodlar:
+        return {}
+    son_kapanis = _son_kapanis(p)
+    print(f"  {get_provider().ad}: {len(kodlar)} hisse (1y, ≤ {son_kapanis})...")
+    barlar = get_provider().batch_history(kodlar, period="1y")
+    return {kod: [[b.tarih, round(b.kapanis, 4)] for b in bars if b.tarih <= son_kapanis]
+            for kod, bars in barlar.items()}
+
+
+@dugum("metrikler", bagimli=("kayitlar", "fiyatlar"), ek=_bugun)
+def metrikler(p, kayitlar, fiyatlar):
+    """Son fiyat, tavan gün sayısı ve sparkline (scraper.sparkline_hesapla ile aynı kurallar)."""
+    from scraper import sparkline_hesapla
+    sonuc = {}
+    for k in kayitlar:
+        seri = fiyatlar.get(k["sirket_kodu"])
+        if not seri:
+            continue
+        m = sparkline_hesapla({"arz_fiyati": (k["det"] or _BOS_DETAY)["arz_fiyati"], "borsada_islem_tarihi": k["end"]},
+                              [c for _, c in seri], [t for t, _ in seri])
+        # Zaman damgası çıktıyı her çalıştırmada değiştirmesin; ipos_json yazarken ekler
+        for alan in ("arz_fiyati", "borsada_islem_tarihi", "static_fetched_at"):
+            m.pop(alan)
+        m["son_fiyat"] = round(seri[-1][1], 2)
+        sonuc[k["sirket_kodu"]] = m
+    return sonuc
+
+
+@dugum("firestore", bagimli=("kayitlar", "metrikler"), surum=3)
+def firestore(p, kayitlar, metrikler):
+    """main.py ile aynı yazma/temizlik/bildirim (send_fcm; teslim edilenler state'e yazılır)."""
+    import main
+    raw_list = []
+    for k in kayitlar:
+        item = {key: v for key, v in k.items() if key not in ("start", "end", "kategori")}
+        item["start_dt"] = datetime.fromisoformat(k["start"]) if k["start"] else None
+        item["end_dt"] = datetime.fromisoformat(k["end"]) if k["end"] else None
+        item["det"] = dict(k["det"]) if k["det"] else None
+        raw_list.append(item)
+    gonderilen, basarisiz = main.firestore_guncelle(raw_list, p.bugun,
+                                                    fiyatlar={kod: m["son_fiyat"] for kod, m in metrikler.items()})
+    if basarisiz:
+        # Çıktı önbelleğe yazılmasın: aynı kazımayla sonraki çalıştırma yazımları yeniden dener
+        raise RuntimeError(f"firestore: {basarisiz} yazma/silme başarısız, aşama önbelleğe alınmadı")
+    return {"kayit": len(raw_list), "bildirim": gonderilen}
+
+
+@dugum("ipos_json", bagimli=("kayitlar", "metrikler"))
+def ipos_json(p, kayitlar, metrikler):
+    import halkarz_scraper as hs
+    import ipo_deposu
+    kazinan = [{
+        "sirket_kodu": k["sirket_kodu"], "sirket_adi": k["sirket_adi"],
+        "durum": kanonik_durum(k["kategori"]), "tarih_raw": k["tarih_str"],
+        "talep_baslangic": k["start"], "talep_bitis": k["end"], "detay_url": k["detail_url"],
+        **{alan: (k["det"] or _BOS_DETAY)[alan] for alan in ("arz_fiyati", "toplam_lot", "dagitim_sekli")},
+    } for k in kayitlar]
+    with ipo_deposu.ac(hs.IPOS_FILE) as depo:
+        yeni, guncellenen = hs.merge_scraped_data(depo, kazinan)
+        simdi = datetime.now().isoformat()
+        for ipo in depo.durumdakiler("islem_goruyor"):
+            m = metrikler.get(ipo["sirket_kodu"].upper())
+            # Metrikler değişmediyse static_fetched_at da yazılmaz → satıra dokunulmaz
+            if m and any(ipo.get(k) != v for k, v in m.items()):
+                depo.guncelle(ipo["sirket_kodu"], {**m, "static_fetched_at": simdi})
+        return {"kayit": len(depo), "yeni": yeni, "guncellenen": guncellenen, "degisen": depo.degisen}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GİRİŞ
+# ═══════════════════════════════════════════════════════════════════
+def _gerekenler(hedefler):
+    """Hedeflerin bağımlılık kapanışı, topolojik sırada."""
+    sira, gorulen = [], set()
+
+    def ziyaret(ad):
+        if ad in gorulen:
+            return
+        gorulen.add(ad)
+        for b in DUGUMLER[ad].bagimli:
+            ziyaret(b)
+        sira.append(ad)
+
+    for h in hedefler:
+        ziyaret(h)
+    return sira
+
+
+def durum_yazdir(p):
+    print(f"{'Aşama':<18}{'Bağımlı':<28}{'Son çalışma':<22}Çıktı özeti")
+    for ad in _gerekenler(DUGUMLER):
+        kayit = p.onbellek_oku(ad)
+        zaman = kayit["zaman"] if kayit else "—"
+        cikti = kayit["cikti_ozet"][:12] if kayit else "—"
+        print(f"{ad:<18}{','.join(DUGUMLER[ad].bagimli) or '—':<28}{zaman:<22}{cikti}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Halka arz DAG pipeline'ı (aşama önbellekli)")
+    parser.add_argument("--hedef", default=",".join(CIKTILAR),
+                        help=f"Çalıştırılacak aşamalar, bağımlılıklarıyla (varsayılan: {','.join(CIKTILAR)})")
+    parser.add_argument("--zorla", default="", help="Önbelleğe bakmadan çalışacak aşamalar (virgülle, 'hepsi')")
+    parser.add_argument("--tazelik", type=int, default=int(os.environ.get("HALKARZ_PIPELINE_TAZELIK", VARSAYILAN_TAZELIK)),
+                        help="Ağ aşamalarının önbellek süresi (sn); 0 = her seferinde çek")
+    parser.add_argument("--durum", action="store_true", help="DAG ve önbellek durumunu yazdır")
+    args = parser.parse_args(argv)
+
+    hedefler = [h.strip() for h in args.hedef.split(",") if h.strip()]
+    zorla = [z.strip() for z in args.zorla.split(",") if z.strip()]
+    if zorla == ["hepsi"]:
+        zorla = list(DUGUMLER)
+    bilinmeyen = [a for a in hedefler + zorla if a not in DUGUMLER]
+    if bilinmeyen:
+        parser.error(f"bilinmeyen aşama: {', '.join(bilinmeyen)} (mevcut: {', '.join(DUGUMLER)})")
+
+    p = Pipeline(tazelik=args.tazelik, zorla=zorla)
+    if args.durum:
+        durum_yazdir(p)
+        return 0
+
+    print("=" * 60)
+    print(f"  Halka Arz Pipeline — {p.bugun:%Y-%m-%d %H:%M} | hedef: {', '.join(hedefler)}")
+    print("=" * 60)
+    try:
+        for ad in hedefler:
+            p.calistir(ad)
+    except RuntimeError as e:
+        print(f"[HATA] {e}")
+        return 1
+    calisan = [a for a, d in p.durum.items() if d == "çalıştı"]
+    print(f"\n[BİLGİ] {len(calisan)}/{len(p.durum)} aşama çalıştı"
+          + (f": {', '.join(calisan)}" if calisan else " (hepsi önbellekten)"))
+    return 0
+
+
+if __name__ == "__main__":
+    with olcum.calistirma("pipeline"):
+        try:
+            kod = main()
+        finally:
+            import main as bot
+            fs_maliyet.gunluk_ozet_yaz("pipeline", bot.FIREBASE_PROJECT_ID, bot.get_firestore_token)
+    sys.exit(kod)
@@ -11,9 +11,13 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 import requests
-import yfinance as yf
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+
+from fiyat_saglayici import get_provider
+import bildirim_kutusu
+import durum_deposu
+import fcm_gonderici
+import ipo_deposu
+import olcum
 
 # --- Yapılandırma ---
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
@@ -25,8 +29,6 @@ FIREBASE_PROJECT_ID = os.environ.get("FIREBASE_PROJECT_ID", "")
 FIREBASE_SA_KEY_JSON = os.environ.get("FIREBASE_SA_KEY_JSON", "")  # Service Account JSON string
 FIREBASE_RTDB_URL = os.environ.get("FIREBASE_RTDB_URL", "")        # https://proje-default-rtdb.firebaseio.com
 
-FCM_V1_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
-
 # BIST limitleri
 TAVAN_CARPANI = 1.10
 TABAN_CARPANI = 0.90
@@ -36,18 +38,27 @@ TABAN_ESIGI = 1.001   # %0.1 tolerans
 
 # ─── Firebase Auth ────────────────────────────────────────────────────────────
 
+_fcm_credentials = None  # Bildirim kutusu mesajları aynı token'ı kullanır; süresi dolunca yenilenir
+
+
 def get_fcm_access_token() -> Optional[str]:
     """Firebase Service Account ile OAuth2 access token alır (FCM için)."""
+    global _fcm_credentials
     if not FIREBASE_SA_KEY_JSON:
         print("[UYARI] FIREBASE_SA_KEY_JSON ayarlanmadı.")
         return None
+    if _fcm_credentials is not None and _fcm_credentials.valid:
+        return _fcm_credentials.token
     try:
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import Request
         sa_info = json.loads(FIREBASE_SA_KEY_JSON)
         credentials = service_account.Credentials.from_service_account_info(
             sa_info,
             scopes=["https://www.googleapis.com/auth/firebase.messaging"],
         )
         credentials.refresh(Request())
+        _fcm_credentials = credentials
         return credentials.token
     except Exception as e:
         print(f"[HATA] FCM access token alınamadı: {e}")
@@ -60,6 +71,8 @@ def get_rtdb_access_token() -> Optional[str]:
         print("[UYARI] FIREBASE_SA_KEY_JSON ayarlanmadı.")
         return None
     try:
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import Request
         sa_info = json.loads(FIREBASE_SA_KEY_JSON)
         credentials = service_account.Credentials.from_service_account_info(
             sa_info,
@@ -75,60 +88,44 @@ def get_rtdb_access_token() -> Optional[str]:
 
 # ─── FCM Bildirimleri ─────────────────────────────────────────────────────────
 
-def send_fcm_notification(title: str, body: str, data: Optional[dict] = None) -> bool:
-    """FCM v1 API ile bildirim gönderir (topic: halka_arz)."""
-    if not FIREBASE_PROJECT_ID:
-        print(f"[SİMÜLE] {title} — {body}")
-        return False
+# FCM v1: kalıcı bağlantı, hız sınırı, 429/503 yeniden deneme (fcm_gonderici).
+# send_fcm_notification(title, body, data=None, kosul=None) → bool; .toplu([...]) → mesaj başına sonuç.
+# FIREBASE_PROJECT_ID yoksa mesajlar [SİMÜLE] olarak basılır.
+send_fcm_notification = fcm_gonderici.FcmGonderici(FIREBASE_PROJECT_ID, get_fcm_access_token)
 
-    access_token = get_fcm_access_token()
-    if not access_token:
-        return False
 
-    url = FCM_V1_URL.format(project_id=FIREBASE_PROJECT_ID)
-    message = {
-        "message": {
-            "topic": "halka_arz",
-            "notification": {"title": title, "body": body},
-            "android": {
-                "priority": "high",
-                "notification": {
-                    "sound": "default",
-                    "channel_id": "halka_arz_channel",
-                    "click_action": "FLUTTER_NOTIFICATION_CLICK",
-                },
-            },
-            "apns": {"payload": {"aps": {"sound": "default", "badge": 1}}},
-            "data": {k: str(v) for k, v in (data or {}).items()},
-        }
-    }
+# ─── Firebase Realtime Database ───────────────────────────────────────────────
+
+# Son yayınlanan fiyatlar state'te süresiz tutulur: {"surum": prices_meta/updated_at, "fiyatlar": {KOD: fiyat}}.
+# RTDB'deki sürüm işareti kayıtlıyla aynıysa /prices başkası tarafından değişmemiştir → tüm düğüm indirilmez.
+RTDB_YAYIN_ANAHTARI = "rtdb_yayinlanan"
 
+
+def _rtdb_oku(base: str, path: str, headers: dict):
     try:
-        resp = requests.post(
-            url, json=message,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json; UTF-8",
-            },
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            print(f"[BİLDİRİM ✓] {title} — {body}")
-            return True
-        print(f"[HATA] FCM v1 ({resp.status_code}): {resp.text[:200]}")
-        return False
-    except requests.RequestException as e:
-        print(f"[HATA] FCM isteği: {e}")
-        return False
+        resp = requests.get(f"{base}/{path}.json", headers=headers, timeout=15)
+        return resp.json() if resp.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
 
 
-# ─── Firebase Realtime Database ───────────────────────────────────────────────
+def _yayinlanan_fiyatlar(base: str, headers: dict, state) -> tuple[dict, object]:
+    """(RTDB'de bilinen fiyatlar, prices_meta/updated_at). Sürüm tutarsa yerel kopya, değilse /prices."""
+    surum = _rtdb_oku(base, "prices_meta/updated_at", headers)
+    kayit = state.get(RTDB_YAYIN_ANAHTARI) if state is not None else None
+    if surum is not None and isinstance(kayit, dict) and kayit.get("surum") == surum:
+        return dict(kayit.get("fiyatlar") or {}), surum
+    mevcut = _rtdb_oku(base, "prices", headers)
+    return (dict(mevcut) if isinstance(mevcut, dict) else {}), surum
 
-def write_prices_to_rtdb(prices: dict[str, float]) -> bool:
+
+def write_prices_to_rtdb(prices: dict[str, float], state=None) -> bool:
     """
-    Fiyatları Firebase Realtime Database'e yazar.
-    Tek endpoint: /prices.json
-    Format: {"EMPAE": 72.4, "ATATR": 41.2, ...}
+    Fiyatları Firebase Realtime Database'e yazar — sadece değişenleri.
+    Format: {"EMPAE": 72.4, "ATATR": 41.2, ...} → /prices/{KOD}
+    Son yayınlanan fiyatlarla karşılaştırılır (state verilirse yerel kopya,
+    /prices_meta sürümü değişmişse /prices); değişen anahtarlar ve
+    /prices_meta/updated_at sürüm işareti tek multi-path PATCH ile gider.
     """
     if not FIREBASE_RTDB_URL:
         print("[UYARI] FIREBASE_RTDB_URL ayarlanmadı, RTDB yazma atlandı.")
@@ -142,19 +139,39 @@ def write_prices_to_rtdb(prices: dict[str, float]) -> bool:
     if not token:
         return False
 
-    url = f"{FIREBASE_RTDB_URL.rstrip('/')}/prices.json"
+    base = FIREBASE_RTDB_URL.rstrip('/')
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+
+    yayinlanan, surum = _yayinlanan_fiyatlar(base, headers, state)
+    degisen = {k: v for k, v in prices.items() if yayinlanan.get(k) != v}
+    bastirilan = len(prices) - len(degisen)
+    if not degisen:
+        if state is not None and surum is not None:
+            state.koy(RTDB_YAYIN_ANAHTARI, {"surum": surum, "fiyatlar": yayinlanan}, ttl=None)
+        print(f"[RTDB] 0 yayınlandı, {bastirilan} değişmedi → yazım yok.")
+        return True
+
+    update = {f"prices/{k}": v for k, v in degisen.items()}
+    update["prices_meta/updated_at"] = {".sv": "timestamp"}
+
+    url = f"{base}/.json"
     try:
         resp = requests.patch(  # PATCH: mevcut verileri silmeden günceller
             url,
-            json=prices,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
+            json=update,
+            headers=headers,
             timeout=15,
         )
         if resp.status_code == 200:
-            print(f"[RTDB ✓] {len(prices)} fiyat yazıldı → {url}")
+            print(f"[RTDB ✓] {len(degisen)} yayınlandı, {bastirilan} değişmedi → {base}")
+            if state is not None:
+                yayinlanan.update(degisen)
+                surum = _rtdb_oku(base, "prices_meta/updated_at", headers)  # Sunucu zamanı: yazımdan sonra okunur
+                if surum is not None:
+                    state.koy(RTDB_YAYIN_ANAHTARI, {"surum": surum, "fiyatlar": yayinlanan}, ttl=None)
             return True
         print(f"[HATA] RTDB ({resp.status_code}): {resp.text[:200]}")
         return False
@@ -166,20 +183,19 @@ def write_prices_to_rtdb(prices: dict[str, float]) -> bool:
 # ─── Fiyat Çekme ─────────────────────────────────────────────────────────────
 
 def get_stock_data(ticker: str) -> Optional[dict]:
-    """Yahoo Finance'den hisse verisi çeker."""
+    """Hisse verisi çeker (varsayılan Yahoo, bkz. fiyat_saglayici)."""
     try:
         bist_ticker = f"{ticker}.IS"
-        stock = yf.Ticker(bist_ticker)
-        hist = stock.history(period="2d")
+        hist = get_provider().history(ticker, period="2d")
 
-        if hist.empty or len(hist) < 1:
+        if not hist:
             print(f"[UYARI] {bist_ticker} için veri bulunamadı.")
             return None
 
-        current_price = float(hist["Close"].iloc[-1])
-        previous_close = float(hist["Close"].iloc[-2]) if len(hist) >= 2 else current_price
-        today_high = float(hist["High"].iloc[-1])
-        today_low = float(hist["Low"].iloc[-1])
+        current_price = hist[-1].kapanis
+        previous_close = hist[-2].kapanis if len(hist) >= 2 else current_price
+        today_high = hist[-1].yuksek
+        today_low = hist[-1].dusuk
 
         return {
             "ticker": ticker,
@@ -201,8 +217,8 @@ def get_stock_data(ticker: str) -> Optional[dict]:
 #   tavan  → normal = "Tavan Bozdu!"
 #   normal → taban  = "Taban Yaptı!"
 #   taban  → normal = "Taban Bozdu!"
-#   tavan  → taban  = "Tavan Bozdu!" + "Taban Yaptı!" (iki bildirim)
-#   taban  → tavan  = "Taban Bozdu!" + "Tavan Yaptı!" (iki bildirim)
+#   tavan  → taban  = "Tavan Bozdu!" + "Taban Yaptı!" (tek mesajda birleşir)
+#   taban  → tavan  = "Taban Bozdu!" + "Tavan Yaptı!" (tek mesajda birleşir)
 #
 # Aynı durumda kalınca (örn. tavan → tavan) bildirim GİTMEZ.
 
@@ -235,8 +251,8 @@ def get_previous_state(ticker: str, state: dict) -> str:
 
 
 def set_stock_state(ticker: str, new_state: str, state: dict):
-    """Hissenin durumunu state'e yaz."""
-    state[f"stock_state_{ticker}"] = new_state
+    """Hissenin durumunu state'e yaz (süresiz; sadece zaman damgası 7 günde düşer)."""
+    state.koy(f"stock_state_{ticker}", new_state, ttl=None)
     state[f"stock_state_ts_{ticker}"] = datetime.now().isoformat()
 
 
@@ -264,10 +280,11 @@ def check_yeni_arz(ipo: dict, state: dict) -> bool:
 
 # ─── Ana İşlem Bloğu ──────────────────────────────────────────────────────────
 
-def process_islem_gorenler(ipos: list[dict], state: dict) -> tuple[dict, dict[str, float]]:
+def process_islem_gorenler(ipos: list[dict], state: dict,
+                           kutu: bildirim_kutusu.BildirimKutusu) -> tuple[dict, dict[str, float]]:
     """
     İşlem gören hisselerin fiyatlarını kontrol eder.
-    Durum makinesi ile bildirim gönderir — sadece durum değişince.
+    Durum makinesi ile bildirimi kutuya atar — sadece durum değişince.
     Dönüş: (güncel state, {ticker: fiyat} dict)
     """
     islem_gorenler = [i for i in ipos if i.get("durum") == "islem_goruyor"]
@@ -308,46 +325,46 @@ def process_islem_gorenler(ipos: list[dict], state: dict) -> tuple[dict, dict[st
         if current_state == "tavan" and previous_state != "tavan":
             # Eğer tabandan geliyorsa önce "Taban Bozdu" gönder
             if previous_state == "taban":
-                send_fcm_notification(
-                    title="📈 Taban Bozdu!",
-                    body=f"{adi} tabandan çıktı! Taban: ₺{taban} → Anlık: ₺{sd['current_price']}",
-                    data={"type": "taban_bozdu", "ticker": ticker},
+                kutu.ekle(
+                    "taban_bozdu", "📈 Taban Bozdu!",
+                    f"{adi} tabandan çıktı! Taban: ₺{taban} → Anlık: ₺{sd['current_price']}",
+                    kod=ticker,
                 )
-            send_fcm_notification(
-                title="🚀 Tavan Yaptı!",
-                body=f"{adi} tavan yaptı! Tavan: ₺{tavan} | Anlık: ₺{sd['current_price']}",
-                data={"type": "tavan_yapti", "ticker": ticker},
+            kutu.ekle(
+                "tavan_yapti", "🚀 Tavan Yaptı!",
+                f"{adi} tavan yaptı! Tavan: ₺{tavan} | Anlık: ₺{sd['current_price']}",
+                kod=ticker,
             )
 
         # tavan → normal/taban = "Tavan Bozdu!"
         elif previous_state == "tavan" and current_state != "tavan":
-            send_fcm_notification(
-                title="⚠️ Tavan Bozdu!",
-                body=f"{adi} tavan bozdu! Tavan: ₺{tavan} → Anlık: ₺{sd['current_price']}",
-                data={"type": "tavan_bozdu", "ticker": ticker},
+            kutu.ekle(
+                "tavan_bozdu", "⚠️ Tavan Bozdu!",
+                f"{adi} tavan bozdu! Tavan: ₺{tavan} → Anlık: ₺{sd['current_price']}",
+                kod=ticker,
             )
             # Eğer doğrudan tabana düştüyse "Taban Yaptı" da gönder
             if current_state == "taban":
-                send_fcm_notification(
-                    title="📉 Taban Yaptı!",
-                    body=f"{adi} tabana indi! Taban: ₺{taban} | Anlık: ₺{sd['current_price']}",
-                    data={"type": "taban_yapti", "ticker": ticker},
+                kutu.ekle(
+                    "taban_yapti", "📉 Taban Yaptı!",
+                    f"{adi} tabana indi! Taban: ₺{taban} | Anlık: ₺{sd['current_price']}",
+                    kod=ticker,
                 )
 
         # normal/tavan → taban = "Taban Yaptı!"
         elif current_state == "taban" and previous_state != "taban":
-            send_fcm_notification(
-                title="📉 Taban Yaptı!",
-                body=f"{adi} tabana indi! Taban: ₺{taban} | Anlık: ₺{sd['current_price']}",
-                data={"type": "taban_yapti", "ticker": ticker},
+            kutu.ekle(
+                "taban_yapti", "📉 Taban Yaptı!",
+                f"{adi} tabana indi! Taban: ₺{taban} | Anlık: ₺{sd['current_price']}",
+                kod=ticker,
             )
 
         # taban → normal = "Taban Bozdu!"
         elif previous_state == "taban" and current_state == "normal":
-            send_fcm_notification(
-                title="📈 Taban Bozdu!",
-                body=f"{adi} tabandan çıktı! Taban: ₺{taban} → Anlık: ₺{sd['current_price']}",
-                data={"type": "taban_bozdu", "ticker": ticker},
+            kutu.ekle(
+                "taban_bozdu", "📈 Taban Bozdu!",
+                f"{adi} tabandan çıktı! Taban: ₺{taban} → Anlık: ₺{sd['current_price']}",
+                kod=ticker,
             )
 
         # Durumu güncelle
@@ -356,79 +373,51 @@ def process_islem_gorenler(ipos: list[dict], state: dict) -> tuple[dict, dict[st
     return state, prices
 
 
-def process_talep_toplayanlar(ipos: list[dict], state: dict) -> dict:
-    """Talep toplayan arzların süresini kontrol eder."""
+def process_talep_toplayanlar(ipos: list[dict], state: dict, kutu: bildirim_kutusu.BildirimKutusu) -> dict:
+    """Talep toplayan arzların süresini kontrol eder (kayıt, bildirim teslim edilince düşülür)."""
     for ipo in ipos:
         if ipo.get("durum") != "talep_topluyor":
             continue
         adi = ipo.get("sirket_adi", ipo["sirket_kodu"])
         if check_sure_bitiyor(ipo, state):
-            send_fcm_notification(
-                title="⏰ Son 30 Dakika!",
-                body=f"{adi} halka arzı birazdan kapanıyor! Acele edin.",
-                data={"type": "sure_bitiyor", "ticker": ipo["sirket_kodu"]},
-            )
             bitis = datetime.fromisoformat(ipo["talep_bitis"].replace("Z", ""))
-            state[f"sure_bitiyor_{ipo['sirket_kodu']}_{bitis.strftime('%Y-%m-%d')}"] = datetime.now().isoformat()
+            kutu.ekle(
+                "sure_bitiyor", "⏰ Son 30 Dakika!",
+                f"{adi} halka arzı birazdan kapanıyor! Acele edin.",
+                kod=ipo["sirket_kodu"],
+                anahtar=f"sure_bitiyor_{ipo['sirket_kodu']}_{bitis.strftime('%Y-%m-%d')}",
+                deger=datetime.now().isoformat(),
+                ozet="⏰ {n} Halka Arz Son 30 Dakikada!",
+            )
     return state
 
 
-def process_yeni_arzlar(ipos: list[dict], state: dict) -> dict:
-    """Yeni eklenen halka arzlar için bildirim gönderir."""
+def process_yeni_arzlar(ipos: list[dict], state: dict, kutu: bildirim_kutusu.BildirimKutusu) -> dict:
+    """Yeni eklenen halka arzlar için bildirimi kutuya atar (birden çoksa tek özet mesajı)."""
     for ipo in ipos:
         if check_yeni_arz(ipo, state):
             adi = ipo.get("sirket_adi", ipo["sirket_kodu"])
             fiyat = ipo.get("arz_fiyati", 0)
             katilim = " ✅ Katılım" if ipo.get("katilim_endeksine_uygun") else ""
-            send_fcm_notification(
-                title="🆕 Yeni Halka Arz!",
-                body=f"{adi} — ₺{fiyat}{katilim}",
-                data={"type": "yeni_arz", "ticker": ipo["sirket_kodu"]},
+            kutu.ekle(
+                "yeni_arz", "🆕 Yeni Halka Arz!", f"{adi} — ₺{fiyat}{katilim}",
+                kod=ipo["sirket_kodu"],
+                anahtar=f"yeni_arz_{ipo['sirket_kodu']}",
+                deger=datetime.now().isoformat(),
+                ozet="🆕 {n} Yeni Halka Arz!",
             )
-            state[f"yeni_arz_{ipo['sirket_kodu']}"] = datetime.now().isoformat()
     return state
 
 
-def cleanup_old_states(state: dict) -> dict:
-    """7 günden eski bildirim kayıtlarını temizler."""
-    cutoff = datetime.now() - timedelta(days=7)
-    return {
-        k: v for k, v in state.items()
-        if _safe_ts(v) > cutoff
-    }
-
-
-def _safe_ts(ts_str: str) -> datetime:
-    try:
-        return datetime.fromisoformat(ts_str)
-    except (ValueError, TypeError):
-        return datetime.now()
-
-
 # ─── State IO ─────────────────────────────────────────────────────────────────
 
-def load_ipos() -> list[dict]:
-    if not os.path.exists(IPOS_FILE):
-        print("[HATA] IPO veri dosyası bulunamadı.")
-        return []
-    with open(IPOS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+def load_state() -> durum_deposu.DurumDeposu:
+    """Bildirim kayıtları 7 gün sonra düşer (stock_state_* ve rtdb_yayinlanan süresiz)."""
+    return durum_deposu.DurumDeposu(durum_deposu.DosyaArkaUcu(STATE_FILE), ttl=7 * durum_deposu.GUN)
 
 
-def load_state() -> dict:
-    if not os.path.exists(STATE_FILE):
-        return {}
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
-
-
-def save_state(state: dict):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+def save_state(state: durum_deposu.DurumDeposu):
+    state.kaydet()
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
@@ -438,27 +427,34 @@ def main():
     print(f"Fiyat Takip & Bildirim — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("=" * 60)
 
-    ipos = load_ipos()
+    # Salt okuma: durum indeksinden sadece ilgili kayıtlar çekilir
+    with ipo_deposu.ac(IPOS_FILE) as depo:
+        ipos = depo.hepsi()
+        islem_gorenler = depo.durumdakiler("islem_goruyor")
+        talep_toplayanlar = depo.durumdakiler("talep_topluyor")
     if not ipos:
         print("[BİLGİ] İşlenecek IPO yok.")
         return
 
     state = load_state()
+    kutu = bildirim_kutusu.BildirimKutusu(send_fcm_notification, state=state)
     print(f"[BİLGİ] {len(ipos)} IPO | {len(state)} bildirim kaydı")
 
     # 1. Yeni arzlar bildirimi
-    state = process_yeni_arzlar(ipos, state)
+    state = process_yeni_arzlar(ipos, state, kutu)
 
     # 2. İşlem gören hisseler: fiyat çek + tavan/taban kontrol + RTDB yaz
-    state, prices = process_islem_gorenler(ipos, state)
+    state, prices = process_islem_gorenler(islem_gorenler, state, kutu)
     print(f"\n[RTDB] {len(prices)} fiyat yazılıyor...")
-    write_prices_to_rtdb(prices)
+    write_prices_to_rtdb(prices, state)
 
     # 3. Süre bitiyor bildirimi
-    state = process_talep_toplayanlar(ipos, state)
+    state = process_talep_toplayanlar(talep_toplayanlar, state, kutu)
+
+    # 4. Birleştirilmiş bildirimleri gönder (teslim edilenler state'e yazılır)
+    kutu.gonder()
 
-    # 4. Temizlik + kaydet
-    state = cleanup_old_states(state)
+    # 5. Süresi dolanları at + değiştiyse kaydet
     save_state(state)
 
     print("=" * 60)
@@ -466,4 +462,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("price_checker"):
+        main()
@@ -2,22 +2,42 @@
 """
 Halka Arz Canlı Fiyat Takibi — Yahoo Finance → Realtime Database
 =================================================================
-GitHub Actions: Her ~8 dk'da bir, hafta içi borsa saatlerinde (09:30–18:10 TR)
+GitHub Actions: Hafta içi borsa saatlerinde (09:30–18:10 TR)
 
 1. Firestore'dan "islem" durumundaki hisseleri çeker
 2. Yahoo Finance'ten anlık fiyatları alır (15 dk gecikmeli)
 3. Realtime Database'e yazar (/prices/{KOD})
 4. Dünkü kapanışla karşılaştırır: Tavan/Taban → FCM bildirim
+
+Kullanım:
+  python price_tracker.py                 → tek tur (eski cron davranışı)
+  python price_tracker.py --daemon        → seans boyunca tek süreç, her
+                                            --interval saniyede bir tur,
+                                            BORSA_KAPANIS'ta temiz çıkış
 """
 
+import argparse
 import json
 import os
-from datetime import datetime, timezone, timedelta
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import Optional
+from urllib.parse import quote
 
 import requests
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+
+import bildirim_kutusu
+import bist_takvimi
+import durum_deposu
+import fcm_gonderici
+import fiyat_serisi
+import fs_kodek
+import fs_maliyet
+import olcum
+from bist_takvimi import TR_TZ
+from fiyat_saglayici import get_provider
 
 # ─── Yapılandırma ─────────────────────────────────────────────────
 FIREBASE_PROJECT_ID = os.environ.get("FIREBASE_PROJECT_ID", "")
@@ -26,7 +46,6 @@ FIREBASE_RTDB_URL = os.environ.get("FIREBASE_RTDB_URL", "")
 
 FIRESTORE_COLLECTION = "halka_arzlar"
 STATE_DOC_PATH = "meta/price_tracker_state"
-FCM_V1_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
 
 # BIST tavan/taban kuralları
 TAVAN_CARPANI = 1.10
@@ -34,29 +53,28 @@ TABAN_CARPANI = 0.90
 TAVAN_ESIGI = 0.999   # %0.1 tolerans
 TABAN_ESIGI = 1.001
 
-# TR saat dilimi (UTC+3)
-TR_TZ = timezone(timedelta(hours=3))
+# Gün içi seri (RTDB /intraday/{KOD}/{GÜN} → {"t": [dk], "p": [fiyat]})
+INTRADAY_SAKLAMA_GUN = 5      # son kaç işlem günü tutulur
+INTRADAY_MAKS_NOKTA = 600     # bir hisse için günlük üst sınır
 
-# Borsa saatleri (TR)
-BORSA_ACILIS = (9, 30)   # 09:30
-BORSA_KAPANIS = (18, 10)  # 18:10
+# Daemon modu
+DAEMON_ARALIK_SN = int(os.environ.get("PRICE_TRACKER_INTERVAL", "300"))  # tur aralığı
+HISSE_YENILEME_SN = 30 * 60  # islem listesi bu sıklıkta Firestore'dan tazelenir
 
 
 # ═══════════════════════════════════════════════════════════════════
 # SAAT KONTROLÜ
 # ═══════════════════════════════════════════════════════════════════
 def borsa_acik_mi():
-    """Borsa şu an açık mı? (Hafta içi 09:30–18:10 TR)"""
+    """Borsa şu an açık mı? (BIST takvimi: tatil, arife yarım günü ve seans saatleri)"""
     now_tr = datetime.now(TR_TZ)
-    # Hafta sonu
-    if now_tr.weekday() >= 5:
-        print(f"[BİLGİ] Hafta sonu ({now_tr.strftime('%A')}) — çıkılıyor.")
+    # Hafta sonu / resmi tatil
+    tatil = bist_takvimi.tatil_adi(now_tr)
+    if tatil:
+        print(f"[BİLGİ] Borsa kapalı: {tatil} ({now_tr.strftime('%Y-%m-%d')}) — çıkılıyor.")
         return False
-    # Saat kontrolü
-    saat = now_tr.hour * 60 + now_tr.minute
-    acilis = BORSA_ACILIS[0] * 60 + BORSA_ACILIS[1]
-    kapanis = BORSA_KAPANIS[0] * 60 + BORSA_KAPANIS[1]
-    if saat < acilis or saat > kapanis:
+    # Saat kontrolü (arife günleri erken kapanış)
+    if not bist_takvimi.borsa_acik_mi(now_tr):
         print(f"[BİLGİ] Borsa kapalı ({now_tr.strftime('%H:%M')} TR) — çıkılıyor.")
         return False
     return True
@@ -65,14 +83,28 @@ def borsa_acik_mi():
 # ═══════════════════════════════════════════════════════════════════
 # FIREBASE AUTH
 # ═══════════════════════════════════════════════════════════════════
+# Token'lar süreç boyunca saklanır; sadece süresi dolunca yenilenir.
+_CREDS_CACHE = {}
+
+# Tek HTTP oturumu → Firestore/RTDB/FCM bağlantıları turlar arasında yeniden kullanılır
+_http = requests.Session()
+
+@olcum.asama("auth")
 def _get_credentials(scopes):
     if not FIREBASE_SA_KEY_JSON:
         print("[UYARI] FIREBASE_SA_KEY_JSON ayarlanmadı.")
         return None
+    key = tuple(scopes)
+    creds = _CREDS_CACHE.get(key)
+    if creds is not None and creds.valid:
+        return creds
     try:
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import Request
         sa_info = json.loads(FIREBASE_SA_KEY_JSON)
         creds = service_account.Credentials.from_service_account_info(sa_info, scopes=scopes)
         creds.refresh(Request())
+        _CREDS_CACHE[key] = creds
         return creds
     except Exception as e:
         print(f"[HATA] Firebase credentials: {e}")
@@ -97,51 +129,41 @@ def get_rtdb_token():
 def _fs_url(path):
     return f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/{path}"
 
-def _from_fv(fv):
-    if "stringValue" in fv: return fv["stringValue"]
-    if "integerValue" in fv: return int(fv["integerValue"])
-    if "doubleValue" in fv: return fv["doubleValue"]
-    if "booleanValue" in fv: return fv["booleanValue"]
-    if "nullValue" in fv: return None
-    if "arrayValue" in fv: return [_from_fv(v) for v in fv.get("arrayValue", {}).get("values", [])]
-    if "mapValue" in fv: return {k: _from_fv(v) for k, v in fv.get("mapValue", {}).get("fields", {}).items()}
-    return None
-
-def _to_fv(val):
-    if val is None: return {"nullValue": None}
-    if isinstance(val, bool): return {"booleanValue": val}
-    if isinstance(val, int): return {"integerValue": str(val)}
-    if isinstance(val, float): return {"doubleValue": val}
-    if isinstance(val, str): return {"stringValue": val}
-    if isinstance(val, list): return {"arrayValue": {"values": [_to_fv(v) for v in val]}}
-    if isinstance(val, dict): return {"mapValue": {"fields": {k: _to_fv(v) for k, v in val.items()}}}
-    return {"stringValue": str(val)}
+# Value JSON: halka_arzlar şeması derlenmiş, şemada olmayan alanlar/dokümanlar genel yoldan
+_to_fv, _from_fv = fs_kodek.to_fv, fs_kodek.from_fv
+FS_SEMA = fs_kodek.HALKA_ARZ
 
+@olcum.asama("firestore")
 def fs_get(doc_path):
     token = get_firestore_token()
     if not token: return None
     try:
-        r = requests.get(_fs_url(doc_path), headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        r = _http.get(_fs_url(doc_path), headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        fs_maliyet.yanit_say("okuma", r)
         if r.status_code == 200:
-            return {k: _from_fv(v) for k, v in r.json().get("fields", {}).items()}
+            return FS_SEMA.coz(r.json().get("fields", {}))
         if r.status_code == 404: return {}
         return None
     except: return None
 
+@olcum.asama("firestore")
 def fs_set(doc_path, data, merge=False):
     token = get_firestore_token()
     if not token: return False
-    body = {"fields": {k: _to_fv(v) for k, v in data.items()}}
+    body = {"fields": FS_SEMA.kodla(data)}
     url = _fs_url(doc_path)
     try:
         if merge:
-            fp = "&".join([f"updateMask.fieldPaths={k}" for k in data.keys()])
-            r = requests.patch(f"{url}?{fp}", json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
+            fp = "&".join([f"updateMask.fieldPaths={quote(fs_kodek.alan_yolu(k))}" for k in data.keys()])
+            r = _http.patch(f"{url}?{fp}", json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
         else:
-            r = requests.patch(url, json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
+            r = _http.patch(url, json=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
+        fs_maliyet.yanit_say("yazma", r)
         return r.status_code == 200
     except: return False
 
+HISSE_ALANLARI = ("durum", "sirket_adi", fiyat_serisi.HARITA, fiyat_serisi.SERI)  # Döngünün kullandıkları; gerisi çözülmez
+
 def get_islem_hisseleri():
     """Firestore'dan durum='islem' olan hisseleri çeker."""
     token = get_firestore_token()
@@ -151,14 +173,15 @@ def get_islem_hisseleri():
         while True:
             params = {"pageSize": 100}
             if pt: params["pageToken"] = pt
-            r = requests.get(_fs_url(FIRESTORE_COLLECTION), params=params, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+            r = _http.get(_fs_url(FIRESTORE_COLLECTION), params=params, headers={"Authorization": f"Bearer {token}"}, timeout=30)
             if r.status_code != 200: break
             res = r.json()
+            fs_maliyet.yanit_say("okuma", r, max(len(res.get("documents", [])), 1))
             for doc in res.get("documents", []):
-                p = {k: _from_fv(v) for k, v in doc.get("fields", {}).items()}
+                p = FS_SEMA.coz(doc.get("fields", {}), HISSE_ALANLARI)
                 p["_doc_id"] = doc["name"].split("/")[-1]
                 if p.get("durum") == "islem":
-                    docs.append(p)
+                    docs.append(fiyat_serisi.cozulmus(p))
             pt = res.get("nextPageToken")
             if not pt: break
         return docs
@@ -168,86 +191,173 @@ def get_islem_hisseleri():
 # ═══════════════════════════════════════════════════════════════════
 # RTDB
 # ═══════════════════════════════════════════════════════════════════
+# RTDB'de yayınlandığı bilinen son fiyatlar {KOD: fiyat}; None = henüz okunmadı.
+# Daemon modunda süreç boyunca yaşar; tek tur modunda ilk yazımda RTDB'den tohumlanır.
+_yayinlanan = None
+
+
+def _rtdb_url(path):
+    return f"{FIREBASE_RTDB_URL.rstrip('/')}/{path}.json"
+
+def rtdb_get(path, token, shallow=False):
+    params = {"shallow": "true"} if shallow else None
+    try:
+        r = _http.get(_rtdb_url(path), params=params, headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        if r.status_code == 200:
+            return r.json()
+        return None
+    except: return None
+
+@olcum.asama("rtdb")
 def rtdb_write_prices(prices):
-    """Realtime Database'e fiyatları yazar. Format: /prices/{KOD}: fiyat"""
+    """
+    Realtime Database'e sadece DEĞİŞEN fiyatları yazar. Format: /prices/{KOD}: fiyat
+    Aynı multi-path PATCH ile /prices_meta/updated_at (sunucu zamanı) güncellenir;
+    istemciler bu sürüm işaretini karşılaştırıp /prices.json indirmesini atlayabilir.
+    """
+    global _yayinlanan
     if not FIREBASE_RTDB_URL or not prices: return False
     token = get_rtdb_token()
     if not token: return False
-    url = f"{FIREBASE_RTDB_URL.rstrip('/')}/prices.json"
+
+    if _yayinlanan is None:
+        mevcut = rtdb_get("prices", token)
+        _yayinlanan = dict(mevcut) if isinstance(mevcut, dict) else {}
+
+    degisen = {k: v for k, v in prices.items() if _yayinlanan.get(k) != v}
+    bastirilan = len(prices) - len(degisen)
+    if not degisen:
+        print(f"  [RTDB] 0 yayınlandı, {bastirilan} değişmedi → yazım yok.")
+        return True
+
+    guncelleme = {f"prices/{k}": v for k, v in degisen.items()}
+    guncelleme["prices_meta/updated_at"] = {".sv": "timestamp"}
     try:
-        r = requests.patch(url, json=prices, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
+        r = _http.patch(_rtdb_url(""), json=guncelleme, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
         if r.status_code == 200:
-            print(f"  [RTDB ✓] {len(prices)} fiyat yazıldı.")
+            _yayinlanan.update(degisen)
+            print(f"  [RTDB ✓] {len(degisen)} yayınlandı, {bastirilan} değişmedi.")
             return True
         return False
     except: return False
 
 
-# ═══════════════════════════════════════════════════════════════════
-# FCM
-# ═══════════════════════════════════════════════════════════════════
-def send_fcm(title, body, data=None):
-    if not FIREBASE_PROJECT_ID: return False
-    token = get_fcm_token()
+# ─── Gün içi seri ──────────────────────────────────────────────────
+# /intraday/{KOD}/{GÜN}/t → seans açılışından (09:30 TR) itibaren dakika, /p → fiyat (paralel diziler)
+# GÜN ve dakikalar Europe/Istanbul saatiyle; okuyan istemci cihaz saat dilimine değil TR_TZ'ye göre çevirmeli.
+# /intraday_meta/{GÜN}/{KOD} → {"n": nokta sayısı, "t": son dakika}
+# Diziler indeksli anahtarlarla büyütülür (…/t/{n}); RTDB ardışık anahtarları
+# okurken dizi olarak döndürür → istemci tek okumayla günün grafiğini alır.
+_intraday = {"gun": None, "sayac": {}}
+
+
+def _intraday_temizle(token, bugun):
+    """INTRADAY_SAKLAMA_GUN'den eski günleri siler (günün ilk turunda bir kez)."""
+    gunler = rtdb_get("intraday_meta", token, shallow=True)
+    if not isinstance(gunler, dict):
+        return
+
+    sinir = bugun
+    for _ in range(INTRADAY_SAKLAMA_GUN - 1):
+        sinir = bist_takvimi.onceki_islem_gunu(sinir)
+    eskiler = sorted(g for g in gunler if g < sinir.isoformat())
+    if not eskiler:
+        return
+
+    silme = {}
+    for gun in eskiler:
+        kodlar = rtdb_get(f"intraday_meta/{gun}", token, shallow=True)
+        for kod in (kodlar if isinstance(kodlar, dict) else {}):
+            silme[f"intraday/{kod}/{gun}"] = None
+        silme[f"intraday_meta/{gun}"] = None
+    try:
+        r = _http.patch(_rtdb_url(""), json=silme, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=30)
+        if r.status_code == 200:
+            print(f"  [INTRADAY] {len(eskiler)} eski gün silindi ({eskiler[0]}…{eskiler[-1]}).")
+    except: pass
+
+
+@olcum.asama("rtdb_intraday")
+def rtdb_append_intraday(prices, now_tr):
+    """Turun fiyatlarını günlük seriye ekler (aynı dakikaya ikinci nokta eklenmez)."""
+    if not FIREBASE_RTDB_URL or not prices: return False
+    seans = bist_takvimi.seans(now_tr)
+    if not seans: return False
+    token = get_rtdb_token()
     if not token: return False
-    msg = {
-        "message": {
-            "topic": "halka_arz",
-            "notification": {"title": title, "body": body},
-            "android": {"priority": "high", "notification": {"sound": "default", "channel_id": "halka_arz_channel", "click_action": "FLUTTER_NOTIFICATION_CLICK"}},
-            "apns": {"payload": {"aps": {"sound": "default", "badge": 1}}},
-            "data": {k: str(v) for k, v in (data or {}).items()},
-        }
-    }
+
+    gun = now_tr.date().isoformat()
+    if _intraday["gun"] != gun:
+        # Gün değişti (veya soğuk başlangıç) → sayaçları RTDB'den tohumla, eski günleri sil
+        mevcut = rtdb_get(f"intraday_meta/{gun}", token)
+        _intraday["gun"] = gun
+        _intraday["sayac"] = dict(mevcut) if isinstance(mevcut, dict) else {}
+        if not _intraday["sayac"]:
+            _intraday_temizle(token, now_tr.date())
+
+    dakika = max(int((now_tr - seans[0]).total_seconds() // 60), 0)
+    guncelleme, eklenen = {}, {}
+    for kod, fiyat in prices.items():
+        sayac = _intraday["sayac"].get(kod) or {"n": 0, "t": -1}
+        if sayac["t"] >= dakika or sayac["n"] >= INTRADAY_MAKS_NOKTA:
+            continue
+        n = sayac["n"]
+        guncelleme[f"intraday/{kod}/{gun}/t/{n}"] = dakika
+        guncelleme[f"intraday/{kod}/{gun}/p/{n}"] = fiyat
+        eklenen[kod] = {"n": n + 1, "t": dakika}
+        guncelleme[f"intraday_meta/{gun}/{kod}"] = eklenen[kod]
+    if not guncelleme:
+        return True
+
     try:
-        r = requests.post(FCM_V1_URL.format(project_id=FIREBASE_PROJECT_ID), json=msg,
-                          headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json; UTF-8"}, timeout=10)
+        r = _http.patch(_rtdb_url(""), json=guncelleme, headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}, timeout=15)
         if r.status_code == 200:
-            print(f"  [FCM ✓] {title}")
+            _intraday["sayac"].update(eklenen)
+            print(f"  [INTRADAY ✓] {len(eklenen)} hisseye nokta eklendi (dk {dakika}).")
             return True
         return False
     except: return False
 
 
+# ═══════════════════════════════════════════════════════════════════
+# FCM
+# ═══════════════════════════════════════════════════════════════════
+# Kalıcı bağlantı + hız sınırı + 429/503 yeniden deneme (fcm_gonderici); send_fcm(title, body, data, kosul) → bool,
+# send_fcm.toplu([...]) → mesaj başına sonuç. Token her toplu gönderimde get_fcm_token'dan (önbellekli) alınır.
+send_fcm = fcm_gonderici.FcmGonderici(FIREBASE_PROJECT_ID, lambda: get_fcm_token())
+
+
 # ═══════════════════════════════════════════════════════════════════
 # YAHOO FINANCE
 # ═══════════════════════════════════════════════════════════════════
+@olcum.asama("yahoo")
 def fetch_live_prices(ticker_list):
-    """Yahoo Finance'ten canlı fiyat çeker. Dönüş: {KOD: fiyat}"""
+    """Canlı fiyat çeker (varsayılan Yahoo, bkz. fiyat_saglayici). Dönüş: {KOD: fiyat}"""
     if not ticker_list: return {}
     try:
-        import yfinance as yf
-        prices = {}
-        symbols = " ".join([f"{t}.IS" for t in ticker_list])
-        tickers = yf.Tickers(symbols)
-        for kod in ticker_list:
-            sym = f"{kod}.IS"
-            try:
-                info = tickers.tickers[sym].fast_info
-                price = round(float(info.last_price), 2)
-                prices[kod] = price
-            except Exception:
-                try:
-                    tk = yf.Ticker(sym)
-                    hist = tk.history(period="1d")
-                    if not hist.empty:
-                        prices[kod] = round(float(hist["Close"].iloc[-1]), 2)
-                except Exception as e:
-                    print(f"    {kod} fiyat alınamadı: {e}")
-        return prices
+        return get_provider().latest(ticker_list)
     except ImportError:
         print("  [HATA] yfinance yüklü değil!")
         return {}
+    except Exception as e:
+        print(f"  [HATA] Fiyatlar alınamadı: {e}")
+        return {}
 
 
 # ═══════════════════════════════════════════════════════════════════
 # TAVAN / TABAN KONTROLÜ
 # ═══════════════════════════════════════════════════════════════════
-def check_tavan_taban(kod, adi, current_price, onceki_kapanis, state):
+def check_tavan_taban(kod, adi, current_price, onceki_kapanis, state, kutu=None):
     """
     Bugünkü fiyatı dünkü kapanışla karşılaştırır.
-    Tavan/Taban durumu değiştiyse bildirim gönderir.
+    Tavan/Taban durumu değiştiyse bildirimi kutuya atar (aynı hissenin iki
+    geçişi tek mesajda birleşir); kutu verilmezse hemen gönderilir.
     """
+    if kutu is None:
+        kutu = bildirim_kutusu.BildirimKutusu(send_fcm)
+        state = check_tavan_taban(kod, adi, current_price, onceki_kapanis, state, kutu)
+        kutu.gonder()
+        return state
     if not onceki_kapanis or onceki_kapanis <= 0:
         return state
 
@@ -270,60 +380,97 @@ def check_tavan_taban(kod, adi, current_price, onceki_kapanis, state):
     # ─── Durum değişikliği bildirimleri ───
     if new_state == "tavan" and prev_state != "tavan":
         if prev_state == "taban":
-            send_fcm("📈 Taban Bozdu!", f"{adi} tabandan çıktı! ₺{taban} → ₺{current_price}", {"type": "taban_bozdu", "ticker": kod})
-        send_fcm("🚀 Tavan Yaptı!", f"{adi} tavan yaptı! ₺{tavan} | ₺{current_price}", {"type": "tavan_yapti", "ticker": kod})
+            kutu.ekle("taban_bozdu", "📈 Taban Bozdu!", f"{adi} tabandan çıktı! ₺{taban} → ₺{current_price}", kod=kod)
+        kutu.ekle("tavan_yapti", "🚀 Tavan Yaptı!", f"{adi} tavan yaptı! ₺{tavan} | ₺{current_price}", kod=kod)
 
     elif prev_state == "tavan" and new_state != "tavan":
-        send_fcm("⚠️ Tavan Bozdu!", f"{adi} tavan bozdu! ₺{tavan} → ₺{current_price}", {"type": "tavan_bozdu", "ticker": kod})
+        kutu.ekle("tavan_bozdu", "⚠️ Tavan Bozdu!", f"{adi} tavan bozdu! ₺{tavan} → ₺{current_price}", kod=kod)
         if new_state == "taban":
-            send_fcm("📉 Taban Yaptı!", f"{adi} tabana indi! ₺{taban} | ₺{current_price}", {"type": "taban_yapti", "ticker": kod})
+            kutu.ekle("taban_yapti", "📉 Taban Yaptı!", f"{adi} tabana indi! ₺{taban} | ₺{current_price}", kod=kod)
 
     elif new_state == "taban" and prev_state != "taban":
-        send_fcm("📉 Taban Yaptı!", f"{adi} tabana indi! ₺{taban} | ₺{current_price}", {"type": "taban_yapti", "ticker": kod})
+        kutu.ekle("taban_yapti", "📉 Taban Yaptı!", f"{adi} tabana indi! ₺{taban} | ₺{current_price}", kod=kod)
 
     elif prev_state == "taban" and new_state == "normal":
-        send_fcm("📈 Taban Bozdu!", f"{adi} tabandan çıktı! ₺{taban} → ₺{current_price}", {"type": "taban_bozdu", "ticker": kod})
+        kutu.ekle("taban_bozdu", "📈 Taban Bozdu!", f"{adi} tabandan çıktı! ₺{taban} → ₺{current_price}", kod=kod)
 
     state[f"tt_{kod}"] = new_state
     return state
 
 
 # ═══════════════════════════════════════════════════════════════════
-# ANA FONKSİYON
+# TAKİP TURU
 # ═══════════════════════════════════════════════════════════════════
-def main():
-    now_tr = datetime.now(TR_TZ)
-    print("=" * 60)
-    print(f"  Canlı Fiyat Takibi — {now_tr.strftime('%Y-%m-%d %H:%M')} TR")
-    print("=" * 60)
+class TakipOturumu:
+    """
+    Turlar arasında bellekte tutulan durum.
+    Tek tur modunda her çalıştırmada sıfırdan oluşturulur; daemon modunda
+    seans boyunca yaşar → Firestore'dan sadece gerektiğinde okunur/yazılır.
+    """
 
-    # Borsa açık mı kontrol et
-    if not borsa_acik_mi():
-        return
+    def __init__(self):
+        self.hisseler = []
+        self.hisseler_ts = 0.0      # son Firestore taraması (monotonic)
+        self.state = None           # tavan/taban durumları (durum_deposu, süresiz)
+        self.yazilan_gecmis = {}    # {KOD: (tarih, fiyat)} → son fiyat_gecmisi yazımı
+
+    def hisseleri_yenile(self, zorla=False):
+        yas = time.monotonic() - self.hisseler_ts
+        if not zorla and self.hisseler and yas < HISSE_YENILEME_SN:
+            return self.hisseler
+        hisseler = get_islem_hisseleri()
+        if hisseler or not self.hisseler:
+            self.hisseler = hisseler
+        self.hisseler_ts = time.monotonic()
+        return self.hisseler
+
+    def state_yukle(self):
+        if self.state is None:
+            self.state = durum_deposu.DurumDeposu(durum_deposu.FirestoreArkaUcu(STATE_DOC_PATH, fs_get, fs_set))
+        return self.state
+
+    def state_kaydet(self):
+        """State'te değişen anahtarları Firestore'a yazar (alan düzeyinde). Yazım olduysa True."""
+        if self.state is None or not self.state.kirli_mi():
+            return False
+        return self.state.kaydet()
+
+
+@olcum.asama("tur")
+def takip_turu(oturum):
+    """Tek fiyat turu: fiyat çek → RTDB → tavan/taban → fiyat_gecmisi. Dönüş: fiyat sayısı."""
+    now_tr = datetime.now(TR_TZ)
 
     # 1. Firestore'dan işlem gören hisseleri çek
     print("\n[1/3] İşlem gören hisseler Firestore'dan çekiliyor...")
-    hisseler = get_islem_hisseleri()
+    olcum.adim("hisseler")
+    hisseler = oturum.hisseleri_yenile()
     if not hisseler:
         print("  İşlem gören hisse bulunamadı.")
-        return
+        return 0
     print(f"  {len(hisseler)} işlem gören hisse bulundu.")
 
     # 2. Yahoo Finance'ten fiyat çek
     print("\n[2/3] Yahoo Finance'ten fiyatlar çekiliyor...")
+    olcum.adim("fiyat")
     kodlar = [h["_doc_id"] for h in hisseler]
     fiyatlar = fetch_live_prices(kodlar)
     if not fiyatlar:
         print("  Fiyat alınamadı.")
-        return
+        return 0
     print(f"  {len(fiyatlar)} fiyat alındı.")
 
     # 3. RTDB'ye yaz + Tavan/Taban kontrolü
     print("\n[3/3] RTDB'ye yazılıyor ve tavan/taban kontrol ediliyor...")
+    olcum.adim("yayin_kontrol")
     rtdb_write_prices(fiyatlar)
+    rtdb_append_intraday(fiyatlar, now_tr)
 
     # State'i oku (tavan/taban durumları)
-    state = fs_get(STATE_DOC_PATH) or {}
+    state = oturum.state_yukle()
+    kutu = bildirim_kutusu.BildirimKutusu(send_fcm)
+    bugun_str = now_tr.strftime("%Y-%m-%d")
+    onceki_gun_str = bist_takvimi.onceki_islem_gunu(now_tr).isoformat()
 
     for hisse in hisseler:
         kod = hisse["_doc_id"]
@@ -336,10 +483,11 @@ def main():
         fiyat_gecmisi = hisse.get("fiyat_gecmisi", {})
         if not isinstance(fiyat_gecmisi, dict): fiyat_gecmisi = {}
 
-        # Bugünden önceki en son kayıtlı fiyatı bul (= dünkü kapanış)
-        bugun_str = now_tr.strftime("%Y-%m-%d")
-        gecmis_tarihleri = sorted([t for t in fiyat_gecmisi.keys() if t < bugun_str], reverse=True)
-        onceki_kapanis = fiyat_gecmisi.get(gecmis_tarihleri[0]) if gecmis_tarihleri else None
+        # Önceki işlem gününün kapanışı; kayıt yoksa bugünden önceki en son kayıt
+        onceki_kapanis = fiyat_gecmisi.get(onceki_gun_str)
+        if onceki_kapanis is None:
+            gecmis_tarihleri = sorted([t for t in fiyat_gecmisi.keys() if t < bugun_str], reverse=True)
+            onceki_kapanis = fiyat_gecmisi.get(gecmis_tarihleri[0]) if gecmis_tarihleri else None
 
         if onceki_kapanis:
             try:
@@ -348,22 +496,130 @@ def main():
                 onceki_kapanis = None
 
         if onceki_kapanis:
-            state = check_tavan_taban(kod, adi, fiyat, onceki_kapanis, state)
+            state = check_tavan_taban(kod, adi, fiyat, onceki_kapanis, state, kutu)
             print(f"  {kod}: ₺{fiyat} (dünkü: ₺{onceki_kapanis})")
         else:
             print(f"  {kod}: ₺{fiyat} (dünkü fiyat yok, tavan/taban kontrolü atlandı)")
 
-        # Bugünkü fiyatı fiyat_gecmisi'ne ekle (grafik için)
+        # Bugünkü fiyatı fiyat_gecmisi'ne ekle (grafik için) — fiyat değişmediyse yazma
+        if oturum.yazilan_gecmis.get(kod) == (bugun_str, fiyat):
+            continue
         fiyat_gecmisi[bugun_str] = fiyat
-        fs_set(f"{FIRESTORE_COLLECTION}/{kod}", {"fiyat_gecmisi": fiyat_gecmisi}, merge=True)
+        hisse["fiyat_gecmisi"] = fiyat_gecmisi
+        if fs_set(f"{FIRESTORE_COLLECTION}/{kod}", fiyat_serisi.yazilacak(fiyat_gecmisi), merge=True):
+            oturum.yazilan_gecmis[kod] = (bugun_str, fiyat)
+
+    kutu.gonder()
+    oturum.state_kaydet()
+    return len(fiyatlar)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DAEMON
+# ═══════════════════════════════════════════════════════════════════
+_durdur = threading.Event()
+
+
+def _sinyal_yakala(signum, frame):
+    print(f"\n[BİLGİ] Sinyal alındı ({signum}) — tur bitince çıkılacak.")
+    _durdur.set()
+
+
+def daemon(aralik_sn=DAEMON_ARALIK_SN, maks_sure_dk=0):
+    """
+    Seans boyunca tek süreçte çalışır: her aralik_sn'de bir takip turu.
+    Açılıştan önce başlatılırsa açılışı bekler; seans kapanışında (arife
+    günleri 12:40, diğer günler BORSA_KAPANIS) veya maks_sure_dk dolunca /
+    SIGTERM gelince state'i kaydedip çıkar.
+    """
+    signal.signal(signal.SIGTERM, _sinyal_yakala)
+    signal.signal(signal.SIGINT, _sinyal_yakala)
+
+    now_tr = datetime.now(TR_TZ)
+    seans = bist_takvimi.seans(now_tr)
+    if not seans:
+        print(f"[BİLGİ] Borsa kapalı: {bist_takvimi.tatil_adi(now_tr)} — çıkılıyor.")
+        return
+    acilis, kapanis = seans
+    if now_tr >= kapanis:
+        print(f"[BİLGİ] Seans bitti ({now_tr.strftime('%H:%M')} TR) — çıkılıyor.")
+        return
+
+    bitis = kapanis
+    if maks_sure_dk:
+        bitis = min(bitis, now_tr + timedelta(minutes=maks_sure_dk))
+    print(f"[DAEMON] Aralık: {aralik_sn} sn | Bitiş: {bitis.strftime('%H:%M')} TR")
+
+    if now_tr < acilis:
+        bekle = (acilis - now_tr).total_seconds()
+        print(f"[DAEMON] Açılış bekleniyor ({acilis.strftime('%H:%M')} TR, {int(bekle)} sn)...")
+        if _durdur.wait(bekle):
+            return
+
+    oturum = TakipOturumu()
+    tur = 0
+    try:
+        while not _durdur.is_set():
+            baslangic = time.monotonic()
+            now_tr = datetime.now(TR_TZ)
+            if now_tr >= bitis:
+                break
+            tur += 1
+            print("\n" + "─" * 60)
+            print(f"  Tur {tur} — {now_tr.strftime('%H:%M:%S')} TR")
+            try:
+                takip_turu(oturum)
+            except Exception as e:
+                # Tek turdaki hata süreci öldürmesin; sonraki turda tekrar denenir
+                print(f"  [HATA] Tur {tur}: {e}")
+
+            kalan = (bitis - datetime.now(TR_TZ)).total_seconds()
+            bekle = min(max(aralik_sn - (time.monotonic() - baslangic), 0), kalan)
+            if bekle <= 0 or _durdur.wait(bekle):
+                break
+    finally:
+        oturum.state_kaydet()
+        print("\n" + "=" * 60)
+        print(f"  Daemon kapandı — {tur} tur çalıştı.")
+        print("=" * 60)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ANA FONKSİYON
+# ═══════════════════════════════════════════════════════════════════
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Halka arz canlı fiyat takibi")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Seans boyunca tek süreçte çalış, kapanışta çık")
+    parser.add_argument("--interval", type=int, default=DAEMON_ARALIK_SN,
+                        help="Daemon tur aralığı (sn), varsayılan PRICE_TRACKER_INTERVAL veya 300")
+    parser.add_argument("--max-runtime", type=int, default=0,
+                        help="Daemon en fazla kaç dakika çalışsın (0 = kapanışa kadar)")
+    args = parser.parse_args(argv)
+
+    now_tr = datetime.now(TR_TZ)
+    print("=" * 60)
+    print(f"  Canlı Fiyat Takibi — {now_tr.strftime('%Y-%m-%d %H:%M')} TR")
+    print("=" * 60)
+
+    if args.daemon:
+        daemon(aralik_sn=max(args.interval, 30), maks_sure_dk=args.max_runtime)
+        return
+
+    # Borsa açık mı kontrol et
+    if not borsa_acik_mi():
+        return
 
-    # State'i kaydet
-    fs_set(STATE_DOC_PATH, state, merge=False)
+    adet = takip_turu(TakipOturumu())
 
     print("\n" + "=" * 60)
-    print(f"  {len(fiyatlar)} fiyat güncellendi.")
+    print(f"  {adet} fiyat güncellendi.")
     print("=" * 60)
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("price_tracker"):
+        try:
+            main()
+        finally:
+            fs_maliyet.gunluk_ozet_yaz("price_tracker", FIREBASE_PROJECT_ID, get_firestore_token)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Profil — cProfile + tracemalloc Anahtarı
+=========================================
+olcum.calistirma() ile sarılan her giriş betiği profillenebilir:
+
+  python backend/main.py --profile                 # tüm çalıştırma
+  python backend/kap_scraper.py --profile=ayristir # sadece "ayristir" aşamaları
+  HALKARZ_PROFILE=1 python backend/price_tracker.py --daemon
+  HALKARZ_PROFILE=ayristir,yahoo python backend/main.py
+
+Aşama adı, olcum.asama()/adim() adlarıyla eşleşir (örn. "ayristir" → detay
+sayfası HTML ayrıştırma, BeautifulSoup dahil; ağ beklemesi hariç).
+
+Çıktılar HALKARZ_PROFILE_DIR (varsayılan data/reports/) altına:
+  <betik>.prof         → snakeviz / `python -m pstats` ile açılır
+  <betik>_bellek.txt   → tracemalloc en çok ayıran 30 satır + tepe bellek
+                         (aşama modunda satırlar her aşamanın ilk çağrısından)
+Çalıştırma sonunda kümülatif süreye göre ilk 20 fonksiyon yazdırılır.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+import olcum
+
+ILK_N = 20
+BELLEK_ILK_N = 30
+TUM = ("1", "true", "tum", "all")
+
+
+def ayar_oku(argv=None) -> Optional[str]:
+    """
+    --profile[=aşama,...] argümanını argv'den çıkarır (betiklerin kendi
+    argparse'ı görmesin) ve HALKARZ_PROFILE ile birleştirir.
+    Dönüş: None (kapalı) | "" (tüm çalıştırma) | "aşama1,aşama2".
+    """
+    argv = sys.argv if argv is None else argv
+    deger = os.environ.get("HALKARZ_PROFILE", "").strip() or None
+    for arg in list(argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            argv.remove(arg)
+            deger = arg.partition("=")[2] or "1"
+    if deger is None or deger.lower() in ("0", "false", ""):
+        return None
+    return "" if deger.lower() in TUM else deger
+
+
+class Profilci:
+    def __init__(self, betik: str, asamalar: set[str]):
+        self.betik = betik
+        self.asamalar = asamalar          # Boş → tüm çalıştırma
+        self.prof = cProfile.Profile()
+        self.derinlik = 0                 # İç içe hedef aşamalar tek sayılır
+        self.baslangic_snap = None
+        self.baslangic_bellek = 0
+        self.cagri = Counter()            # Aşama → çağrı sayısı
+        self.ayrilan = Counter()          # (dosya, satır) → bayt (her aşamanın ilk çağrısından)
+        self.net = 0                      # Tüm aşama çağrılarında net ayrılan bayt (get_traced_memory farkı)
+        self.tepe = 0
+
+    # ── Tüm çalıştırma ──
+    def baslat(self):
+        tracemalloc.start(10)
+        if not self.asamalar:
+            self.prof.enable()
+
+    # ── Aşama modu ──
+    def gir(self, ad):
+        if ad not in self.asamalar:
+            return
+        self.derinlik += 1
+        if self.derinlik == 1:
+            tracemalloc.reset_peak()
+            self.baslangic_bellek = tracemalloc.get_traced_memory()[0]
+            if not self.cagri[ad]:
+                # Anlık görüntü pahalı (tüm izlenen bloklar): satır dökümü sadece aşamanın ilk çağrısından
+                self.baslangic_snap = tracemalloc.take_snapshot()
+            self.cagri[ad] += 1
+            self.prof.enable()
+
+    def cik(self, ad):
+        if ad not in self.asamalar or not self.derinlik:
+            return
+        self.derinlik -= 1
+        if self.derinlik == 0:
+            self.prof.disable()
+            simdiki, tepe = tracemalloc.get_traced_memory()
+            self.tepe = max(self.tepe, tepe)
+            self.net += simdiki - self.baslangic_bellek
+            if self.baslangic_snap is not None:
+                for fark in tracemalloc.take_snapshot().compare_to(self.baslangic_snap, "lineno"):
+                    if fark.size_diff > 0:
+                        kare = fark.traceback[0]
+                        self.ayrilan[(kare.filename, kare.lineno)] += fark.size_diff
+                self.baslangic_snap = None
+
+    def _bellek_raporu(self) -> str:
+        if self.asamalar:
+            satirlar = self.ayrilan.most_common(BELLEK_ILK_N)
+            tepe = self.tepe
+        else:
+            tepe = tracemalloc.get_traced_memory()[1]
+            satirlar = [((s.traceback[0].filename, s.traceback[0].lineno), s.size)
+                        for s in tracemalloc.take_snapshot().statistics("lineno")[:BELLEK_ILK_N]]
+        kapsam = ", ".join(sorted(self.asamalar)) or "tüm çalıştırma"
+        cikti = [f"# {self.betik} — {kapsam}", f"# Tepe izlenen bellek: {tepe / 1024 / 1024:.1f} MB"]
+        if self.asamalar:
+            cagrilar = ", ".join(f"{ad}×{n}" for ad, n in sorted(self.cagri.items()))
+            cikti.append(f"# Çağrılar: {cagrilar or '-'} — net ayrılan {self.net / 1024 / 1024:.1f} MB"
+                         " (satır dökümü her aşamanın ilk çağrısından)")
+        cikti.append("")
+        for (dosya, satir), bayt in satirlar:
+            cikti.append(f"{bayt / 1024:10.1f} KB  {dosya}:{satir}")
+        return "\n".join(cikti) + "\n"
+
+    def bitir(self):
+        if not self.asamalar:
+            self.prof.disable()
+        dizin = os.environ.get("HALKARZ_PROFILE_DIR") or olcum.RAPOR_DIZINI
+        os.makedirs(dizin, exist_ok=True)
+        prof_yolu = os.path.join(dizin, f"{self.betik}.prof")
+        bellek_yolu = os.path.join(dizin, f"{self.betik}_bellek.txt")
+
+        bellek = self._bellek_raporu()
+        tracemalloc.stop()
+        with open(bellek_yolu, "w", encoding="utf-8") as f:
+            f.write(bellek)
+
+        try:
+            self.prof.dump_stats(prof_yolu)
+            akis = io.StringIO()
+            pstats.Stats(self.prof, stream=akis).sort_stats("cumulative").print_stats(ILK_N)
+        except TypeError:
+            # Hedef aşama hiç çalışmadıysa profil boştur
+            print(f"[UYARI] Profil boş: '{', '.join(sorted(self.asamalar))}' aşaması çalışmadı.")
+            return
+        print("\n" + "=" * 60)
+        print(f"  PROFİL — kümülatif süreye göre ilk {ILK_N}")
+        print("=" * 60)
+        print(akis.getvalue().strip())
+        print(f"\n[BİLGİ] Profil: {prof_yolu} | Bellek: {bellek_yolu}")
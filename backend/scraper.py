@@ -11,14 +11,22 @@ Halka Arz Veri Çekme ve Güncelleme Motoru
 import json
 import os
 import re
-import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import requests
-import yfinance as yf
 from bs4 import BeautifulSoup
 
+from fiyat_saglayici import get_provider
+import dayanikli_http
+import durum_deposu
+import http_kaset
+import ipo_deposu
+import olcum
+import veri_dosyasi
+from ipo_deposu import IpoDeposu
+from ipo_modeli import Ipo
+
 # --- Yapılandırma ---
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 OUTPUT_FILE = os.path.join(DATA_DIR, "ipos.json")
@@ -109,8 +117,8 @@ def send_notification(title: str, body: str, data: Optional[dict] = None) -> boo
 def safe_request(url: str, timeout: int = 15) -> Optional[requests.Response]:
     """Rate-limited HTTP GET."""
     try:
-        time.sleep(REQUEST_DELAY)
-        response = requests.get(url, headers=HEADERS, timeout=timeout)
+        http_kaset.bekle(REQUEST_DELAY)
+        response = dayanikli_http.getir(url, headers=HEADERS, timeout=timeout)
         response.raise_for_status()
         return response
     except requests.RequestException as e:
@@ -187,10 +195,7 @@ def parse_halkarz_com() -> list[dict]:
 
             bist_span = article.find("span", class_="il-bist-kod")
             sirket_kodu = bist_span.get_text(strip=True).upper() if bist_span else ""
-            if not sirket_kodu:
-                # Geçici benzersiz anahtar
-                import hashlib
-                sirket_kodu = "TAS_" + hashlib.md5(sirket_adi.encode()).hexdigest()[:4].upper()
+            # Kod yoksa boş kalır: merge_ipo_data ad indeksinden eşler, kod açıklanınca bağlar
 
             # ── Tarih ────────────────────────────────────────────
             tarih_span = article.find("span", class_="il-halka-arz-tarihi")
@@ -231,97 +236,65 @@ def parse_halkarz_com() -> list[dict]:
 
 # ─── YARDIMCI DOSYA OPERASYONLARİ ────────────────────────────────
 
-def load_existing_data() -> list[dict]:
-    if not os.path.exists(OUTPUT_FILE):
-        return []
-    try:
-        with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"[HATA] Mevcut veri okunamadı: {e}")
-        return []
-
-
 def load_manual_data() -> list[dict]:
     if not os.path.exists(MANUAL_FILE):
         return []
     try:
-        with open(MANUAL_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        return veri_dosyasi.json_oku(MANUAL_FILE)
+    except (ValueError, IOError) as e:
         print(f"[HATA] Manuel veri okunamadı: {e}")
         return []
 
 
-def load_notification_state() -> dict:
-    if not os.path.exists(STATE_FILE):
-        return {}
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
-
-
-def save_notification_state(state: dict):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+def load_notification_state() -> durum_deposu.DurumDeposu:
+    """price_checker ile ortak dosya: aynı kayıt biçimi ve 7 günlük ömür."""
+    return durum_deposu.DurumDeposu(durum_deposu.DosyaArkaUcu(STATE_FILE), ttl=7 * durum_deposu.GUN)
 
 
-def save_data(ipos: list[dict]):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(ipos, f, ensure_ascii=False, indent=2)
-    print(f"[BİLGİ] {len(ipos)} IPO kaydedildi → {OUTPUT_FILE}")
+def save_notification_state(state: durum_deposu.DurumDeposu):
+    state.kaydet()
 
 
 # ─── BİRLEŞTİRME ─────────────────────────────────────────────────
 
-def merge_ipo_data(existing: list[dict], new_data: list[dict]) -> list[dict]:
+def merge_ipo_data(depo: IpoDeposu, new_data: list[dict]) -> tuple[int, int]:
     """
-    Mevcut ve yeni verileri birleştirir.
+    Yeni verileri IPO deposuna birleştirir (sadece değişen satırlar yazılır).
     Öncelik: Mevcut veri korunur, yeni veriden sadece eksik alanlar eklenir.
     Özel durum: Eğer yeni veri 'islem_goruyor' diyorsa mutlaka güncelle.
+    Dönüş: (yeni, güncellenen) kayıt sayısı
     """
-    merged = {item["sirket_kodu"]: item for item in existing}
+    yeni = guncellenen = 0
 
     for item in new_data:
-        code = item["sirket_kodu"]
-        if code in merged:
-            existing_item = merged[code]
+        code = depo.esle(item["sirket_kodu"], item.get("sirket_adi", ""))
+        existing_item = depo.getir(code) if code else None
+        if existing_item:
+            degisiklik = {}
             # Durum güncelleme
             new_durum = item.get("durum", "")
             old_durum = existing_item.get("durum", "")
 
             # İşlem görmeye başladıysa veya yeni borsa tarihi geldiyse güncelle
-            if new_durum == "islem_goruyor" or (new_durum and new_durum != old_durum):
-                existing_item["durum"] = new_durum
+            if new_durum and new_durum != old_durum:
+                degisiklik["durum"] = new_durum
 
             # Borsa tarihi yoksa veya geldi ise güncelle
             if item.get("borsada_islem_tarihi") and not existing_item.get("borsada_islem_tarihi"):
-                existing_item["borsada_islem_tarihi"] = item["borsada_islem_tarihi"]
+                degisiklik["borsada_islem_tarihi"] = item["borsada_islem_tarihi"]
 
-            existing_item["guncelleme_zamani"] = datetime.now().isoformat()
-            merged[code] = existing_item
+            if degisiklik:
+                degisiklik["guncelleme_zamani"] = datetime.now().isoformat()
+                depo.guncelle(code, degisiklik)
+                guncellenen += 1
         else:
-            # Yeni şirket — temel yapı oluştur
-            item.setdefault("arz_fiyati", 0)
-            item.setdefault("toplam_lot", 0)
-            item.setdefault("dagitim_sekli", "Eşit")
-            item.setdefault("konsorsiyum_lideri", "")
-            item.setdefault("iskonto_orani", 0.0)
-            item.setdefault("fon_kullanim_yeri", {"yatirim": 0, "borc_odeme": 0, "isletme_sermayesi": 0})
-            item.setdefault("katilim_endeksine_uygun", False)
-            item.setdefault("talep_baslangic", "")
-            item.setdefault("talep_bitis", "")
-            item.setdefault("son_katilimci_sayilari", [])
-            item.setdefault("sparkline", [])
-            item.setdefault("sparkline_dates", [])
-            item["guncelleme_zamani"] = datetime.now().isoformat()
-            merged[code] = item
-
-    return list(merged.values())
+            # Yeni şirket — temel yapı modelin varsayılanlarından
+            ipo = Ipo.from_dict(item)
+            ipo.guncelleme_zamani = datetime.now().isoformat()
+            depo.ekle(ipo.to_dict())
+            yeni += 1
+
+    return yeni, guncellenen
 
 
 # ─── SPARKLINE (YAHOO FINANCE) ────────────────────────────────────
@@ -334,61 +307,60 @@ def fetch_historical_sparklines(ipos: list[dict]) -> list[dict]:
 
         try:
             ticker = f"{ipo['sirket_kodu']}.IS"
-            hist = yf.Ticker(ticker).history(period="1y", interval="1d")
-
-            if hist.empty:
+            bars = get_provider().history(ipo["sirket_kodu"], period="1y")
+            if not bars:
                 continue
+            sparkline_hesapla(ipo, [b.kapanis for b in bars], [b.tarih for b in bars])
+            print(f"[YAHOO] {ticker} → {ipo['tavan_gun']} tavan, fiyat {bars[-1].kapanis:.2f}")
+        except Exception as e:
+            print(f"[HATA] Yahoo Finance {ipo['sirket_kodu']}: {e}")
 
-            closes = hist["Close"].dropna().tolist()
-            dates  = [d.strftime("%Y-%m-%d") for d in hist.index]
-            if not closes:
-                continue
+    return ipos
 
-            ipo["ilk_gun_kapanis"] = float(closes[0])
-            ipo["max_fiyat"]       = float(max(closes))
-            ipo["min_fiyat"]       = float(min(closes))
-
-            # Tavan gün sayısı
-            tavan_count = 0
-            arz_fiyati  = float(ipo.get("arz_fiyati", 0))
-            if arz_fiyati > 0 and (closes[0] - arz_fiyati) / arz_fiyati >= 0.095:
-                tavan_count += 1
-            for i in range(1, len(closes)):
-                if closes[i-1] > 0 and (closes[i] - closes[i-1]) / closes[i-1] >= 0.095:
-                    tavan_count += 1
-            ipo["tavan_gun"] = tavan_count
-
-            # Son 6 ayda çıkanların tüm grafiği, eskiler için son 30 gün
-            include_full = False
-            islem_str = ipo.get("borsada_islem_tarihi", "")
-            if islem_str:
-                try:
-                    islem_date = datetime.fromisoformat(islem_str.replace("Z", ""))
-                    if datetime.now() - islem_date <= timedelta(days=180):
-                        include_full = True
-                except Exception:
-                    pass
-
-            if include_full:
-                ipo["sparkline"]       = [float(x) for x in closes]
-                ipo["sparkline_dates"] = dates
-            else:
-                ipo["sparkline"]       = [float(x) for x in closes[-30:]] if len(closes) > 30 else [float(x) for x in closes]
-                ipo["sparkline_dates"] = dates[-30:] if len(dates) > 30 else dates
 
-            ipo["static_fetched"]    = True
-            ipo["static_fetched_at"] = datetime.now().isoformat()
+def sparkline_hesapla(ipo: dict, closes: list[float], dates: list[str]) -> dict:
+    """Kapanış serisinden ilk gün/max/min, tavan gün sayısı ve sparkline alanlarını ipo'ya yazar."""
+    ipo["ilk_gun_kapanis"] = float(closes[0])
+    ipo["max_fiyat"]       = float(max(closes))
+    ipo["min_fiyat"]       = float(min(closes))
+
+    # Tavan gün sayısı
+    tavan_count = 0
+    arz_fiyati  = float(ipo.get("arz_fiyati", 0))
+    if arz_fiyati > 0 and (closes[0] - arz_fiyati) / arz_fiyati >= 0.095:
+        tavan_count += 1
+    for i in range(1, len(closes)):
+        if closes[i-1] > 0 and (closes[i] - closes[i-1]) / closes[i-1] >= 0.095:
+            tavan_count += 1
+    ipo["tavan_gun"] = tavan_count
+
+    # Son 6 ayda çıkanların tüm grafiği, eskiler için son 30 gün
+    include_full = False
+    islem_str = ipo.get("borsada_islem_tarihi", "")
+    if islem_str:
+        try:
+            islem_date = datetime.fromisoformat(islem_str.replace("Z", ""))
+            if datetime.now() - islem_date <= timedelta(days=180):
+                include_full = True
+        except Exception:
+            pass
 
-            print(f"[YAHOO] {ticker} → {tavan_count} tavan, fiyat {closes[-1]:.2f}")
-        except Exception as e:
-            print(f"[HATA] Yahoo Finance {ipo['sirket_kodu']}: {e}")
+    if include_full:
+        ipo["sparkline"]       = [float(x) for x in closes]
+        ipo["sparkline_dates"] = dates
+    else:
+        ipo["sparkline"]       = [float(x) for x in closes[-30:]] if len(closes) > 30 else [float(x) for x in closes]
+        ipo["sparkline_dates"] = dates[-30:] if len(dates) > 30 else dates
 
-    return ipos
+    ipo["static_fetched"]    = True
+    ipo["static_fetched_at"] = datetime.now().isoformat()
+    return ipo
 
 
 # ─── BİLDİRİM ────────────────────────────────────────────────────
 
-def notify_new_ipos(existing_codes: set, all_ipos: list[dict], state: dict) -> dict:
+def notify_new_ipos(existing_codes: set, all_ipos: list[dict],
+                    state: durum_deposu.DurumDeposu) -> durum_deposu.DurumDeposu:
     """Yeni eklenen IPO'lar için bildirim gönderir."""
     for ipo in all_ipos:
         code      = ipo["sirket_kodu"]
@@ -410,36 +382,40 @@ def main():
     print(f"Halka Arz Veri Motoru — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("=" * 60)
 
-    # 1. Mevcut veriyi yükle
-    existing_data  = load_existing_data()
-    existing_codes = {item["sirket_kodu"] for item in existing_data}
-    print(f"[BİLGİ] Mevcut: {len(existing_data)} IPO")
-
-    # 2. halkarz.com'dan tüm listeyi çek (ana kaynak)
-    halkarz_data = parse_halkarz_com()
+    # 1. IPO deposunu aç (çıkışta değişiklik varsa ipos.json dışa aktarılır)
+    with ipo_deposu.ac(OUTPUT_FILE) as depo:
+        existing_codes = depo.kodlar()
+        print(f"[BİLGİ] Mevcut: {len(depo)} IPO")
 
-    # 3. Manuel veriler
-    manual_data = load_manual_data()
-    print(f"[BİLGİ] Manuel: {len(manual_data)} kayıt")
+        # 2. halkarz.com'dan tüm listeyi çek (ana kaynak)
+        halkarz_data = parse_halkarz_com()
 
-    # 4. Birleştir
-    merged = merge_ipo_data(existing_data, halkarz_data + manual_data)
+        # 3. Manuel veriler
+        manual_data = load_manual_data()
+        print(f"[BİLGİ] Manuel: {len(manual_data)} kayıt")
 
-    # 5. Yahoo Finance'den grafik verileri
-    print("[BİLGİ] Grafik verileri güncelleniyor (YFinance)...")
-    merged = fetch_historical_sparklines(merged)
+        # 4. Birleştir
+        yeni, guncellenen = merge_ipo_data(depo, halkarz_data + manual_data)
+        print(f"[BİLGİ] Birleştirme: {yeni} yeni, {guncellenen} güncellenen")
 
-    # 6. Bildirimler
-    state = load_notification_state()
-    state = notify_new_ipos(existing_codes, merged, state)
-    save_notification_state(state)
+        # 5. Yahoo Finance'den grafik verileri (sadece işlem görenler, durum indeksinden)
+        print("[BİLGİ] Grafik verileri güncelleniyor (YFinance)...")
+        gercek_kodlar = depo.kodlar()  # Kodsuz/TAS_ kayıtların Yahoo sembolü yok
+        islem = [i for i in depo.durumdakiler("islem_goruyor") if i["sirket_kodu"] in gercek_kodlar]
+        for ipo in fetch_historical_sparklines(islem):
+            depo.guncelle(ipo["sirket_kodu"], ipo)
 
-    # 7. Kaydet
-    save_data(merged)
+        # 6. Bildirimler
+        state = load_notification_state()
+        # Kodsuz kayıttan koda bağlananlar zaten biliniyordu — yeniden "yeni arz" sayılmaz
+        yeniler = [depo.getir(kod) for kod in sorted(depo.kodlar() - existing_codes - depo.baglanan)]
+        state = notify_new_ipos(existing_codes, yeniler, state)
+        save_notification_state(state)
 
     print("=" * 60)
     print("[BİLGİ] İşlem tamamlandı.")
 
 
 if __name__ == "__main__":
-    main()
+    with olcum.calistirma("scraper"):
+        main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Veri Dosyası — Atomik JSON Okuma/Yazma
+=======================================
+ipos.json ve notification_state.json tüm betiklerde buradan yazılır:
+
+  - Atomik: aynı dizinde geçici dosyaya yazılır, fsync edilir, os.replace ile
+    hedefin üzerine taşınır. Yazma sırasında çökme hedefi bozmaz.
+  - Hızlı: orjson kuruluysa onunla, değilse json ile (aynı çıktı biçimi).
+  - ipos_kaydet() ipos.json'un yanına istemciler için sıkıştırılmış bir kopya
+    da yazar: ipos.min.json.gz → {"sema": SEMA_SURUMU, "adet": n, "ipos": [...]}
+    (boşluksuz JSON, gzip mtime=0 → içerik değişmedikçe baytlar da değişmez).
+
+ipos.json'un kendisi, okuyan betikler ve git diff'i için girintili liste olarak kalır.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SEMA_SURUMU = 1
+SIKISTIRILMIS_EK = ".min.json.gz"
+
+
+def dumps(veri, girintili=True) -> bytes:
+    if orjson is not None:
+        secenek = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if girintili else 0)
+        return orjson.dumps(veri, option=secenek)
+    if girintili:
+        return json.dumps(veri, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(veri, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(veri):
+    return orjson.loads(veri) if orjson is not None else json.loads(veri)
+
+
+def atomik_yaz(path: str, icerik: bytes):
+    """icerik'i path'e atomik yazar (geçici dosya + fsync + os.replace)."""
+    dizin = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dizin, exist_ok=True)
+    fd, gecici = tempfile.mkstemp(dir=dizin, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(icerik)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici, path)
+    except BaseException:
+        try: os.remove(gecici)
+        except OSError: pass
+        raise
+
+
+def json_oku(path: str):
+    """JSON dosyasını okur. Yoksa FileNotFoundError; bozuksa ValueError (json.JSONDecodeError dahil)."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def json_yaz(path: str, veri, girintili=True):
+    atomik_yaz(path, dumps(veri, girintili))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ipos.json
+# ═══════════════════════════════════════════════════════════════════
+def sikistirilmis_yol(path: str) -> str:
+    kok, _ = os.path.splitext(path)
+    return kok + SIKISTIRILMIS_EK
+
+
+def ipos_kaydet(path: str, ipos: list[dict]):
+    """ipos.json (girintili liste) + ipos.min.json.gz (şema başlıklı, boşluksuz, gzip)."""
+    json_yaz(path, ipos)
+    zarf = {"sema": SEMA_SURUMU, "adet": len(ipos), "ipos": ipos}
+    atomik_yaz(sikistirilmis_yol(path), gzip.compress(dumps(zarf, girintili=False), compresslevel=9, mtime=0))
+
+
+def ipos_oku(path: str) -> list[dict]:
+    """ipos.json veya ipos.min.json.gz okur; şema başlıklı zarfı açar."""
+    if path.endswith(".gz"):
+        with open(path, "rb") as f:
+            veri = loads(gzip.decompress(f.read()))
+    else:
+        veri = json_oku(path)
+    if isinstance(veri, dict) and "ipos" in veri:
+        if veri.get("sema", 0) > SEMA_SURUMU:
+            print(f"[UYARI] {os.path.basename(path)} şema {veri['sema']} > {SEMA_SURUMU}; bilinmeyen alanlar olabilir.")
+        return veri["ipos"]
+    return veri
@@ -0,0 +1,115 @@
+import 'dart:typed_data';
+
+import 'package:cloud_firestore/cloud_firestore.dart';
+import 'package:flutter/foundation.dart';
+
+/// Firestore `halka_arzlar` fiyat geçmişi — backend/fiyat_serisi.py ile aynı biçimler.
+///
+///   fiyat_gecmisi: {"YYYY-MM-DD": kapanış}                       (harita)
+///   fiyat_serisi:  {"baslangic": "...", "gun": [...], "fiyat": [...]}  (sütun)
+///   fiyat_serisi:  Blob — delta kodlu paket (sürüm 1, küçük endian)     (paket)
+///
+/// Hangisi varsa `{tarih: fiyat}` haritasına çevrilir; ikisi birden varsa
+/// fiyat_gecmisi üstündür. Çözülemeyen seri yok sayılır.
+Map<String, dynamic> fiyatGecmisiOku(Map<String, dynamic> j) {
+  final harita = j['fiyat_gecmisi'];
+  final seri = j['fiyat_serisi'];
+  final sonuc = <String, dynamic>{};
+  if (seri != null) {
+    try {
+      if (seri is Blob) {
+        sonuc.addAll(_paketten(seri.bytes));
+      } else if (seri is Uint8List) {
+        sonuc.addAll(_paketten(seri));
+      } else if (seri is Map) {
+        sonuc.addAll(_sutundan(seri));
+      }
+    } catch (e) {
+      debugPrint('fiyat_serisi çözülemedi: $e');
+    }
+  }
+  if (harita is Map) sonuc.addAll(Map<String, dynamic>.from(harita));
+  return sonuc;
+}
+
+final DateTime _epoch = DateTime.utc(1970, 1, 1);
+
+String _iso(int gun) => _epoch.add(Duration(days: gun)).toIso8601String().substring(0, 10);
+
+Map<String, double> _sutundan(Map seri) {
+  final gunler = (seri['gun'] as List?) ?? const [];
+  final fiyatlar = (seri['fiyat'] as List?) ?? const [];
+  if (gunler.isEmpty) return {};
+  // UTC gün: yerel saatle ayrıştırmak (UTC+3) farkı bir gün eksik çıkarırdı
+  final p = seri['baslangic'].toString().split('-').map(int.parse).toList();
+  final basGun = DateTime.utc(p[0], p[1], p[2]).difference(_epoch).inDays;
+  final sonuc = <String, double>{};
+  for (var i = 0; i < gunler.length && i < fiyatlar.length; i++) {
+    sonuc[_iso(basGun + (gunler[i] as num).toInt())] = (fiyatlar[i] as num).toDouble();
+  }
+  return sonuc;
+}
+
+const int _ham = 255;
+
+Map<String, double> _paketten(Uint8List veri) {
+  if (veri.length < 4 || veri[0] != 1) {
+    throw FormatException('bilinmeyen paket sürümü');
+  }
+  final olcek = veri[1];
+  final genislik = veri[2];
+  final bd = ByteData.sublistView(veri);
+  var i = 3;
+
+  int varint() {
+    var n = 0, kay = 0;
+    while (true) {
+      final c = veri[i++];
+      n |= (c & 0x7F) << kay;
+      if (c < 0x80) return n;
+      kay += 7;
+    }
+  }
+
+  final n = varint();
+  if (n == 0) return {};
+  final gunler = List<int>.filled(n, 0);
+  gunler[0] = varint();
+  for (var k = 1; k < n; k++) {
+    var d = veri[i++];
+    if (d == 0) d = varint();
+    gunler[k] = gunler[k - 1] + d;
+  }
+
+  final sonuc = <String, double>{};
+  if (olcek == _ham) {
+    for (var k = 0; k < n; k++) {
+      sonuc[_iso(gunler[k])] = bd.getFloat64(i + 8 * k, Endian.little);
+    }
+    return sonuc;
+  }
+  final z = varint();
+  var tam = (z >> 1) ^ -(z & 1);
+  final bolen = _ondalik(olcek);
+  sonuc[_iso(gunler[0])] = tam / bolen;
+  for (var k = 1; k < n; k++) {
+    final o = i + genislik * (k - 1);
+    final fark = switch (genislik) {
+      1 => bd.getInt8(o),
+      2 => bd.getInt16(o, Endian.little),
+      4 => bd.getInt32(o, Endian.little),
+      _ => bd.getInt64(o, Endian.little),
+    };
+    tam += fark;
+    sonuc[_iso(gunler[k])] = tam / bolen;
+  }
+  return sonuc;
+}
+
+double _ondalik(int e) {
+  var b = 1.0;
+  for (var k = 0; k < e; k++) {
+    b *= 10;
+  }
+  return b;
+}
@@ -1,3 +1,5 @@
+import 'fiyat_serisi.dart';
+
 /// Halka Arz (IPO) veri modeli — Firestore `halka_arzlar` koleksiyonuyla eşleşir
 class IpoModel {
   final String sirketKodu;
@@ -60,7 +62,7 @@ class IpoModel {
       bireyselYuzde: json['bireysel_yuzde'] ?? 0,
       guncellemeZamani: json['guncelleme_zamani'] ?? '',
       sonFiyat: json['son_fiyat'],
-      fiyatGecmisi: Map<String, dynamic>.from(json['fiyat_gecmisi'] ?? {}),
+      fiyatGecmisi: fiyatGecmisiOku(json),
     );
   }
 
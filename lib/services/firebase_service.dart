@@ -1,3 +1,4 @@
+import 'dart:convert';
 import 'dart:io' show Platform;
 import 'package:flutter/foundation.dart';
 import 'package:firebase_core/firebase_core.dart';
@@ -5,6 +6,8 @@ import 'package:firebase_messaging/firebase_messaging.dart';
 import '../firebase_options.dart';
 import 'package:flutter_local_notifications/flutter_local_notifications.dart';
 import 'package:permission_handler/permission_handler.dart';
+import 'package:hive_flutter/hive_flutter.dart';
+import 'portfolio_service.dart';
 
 /// Firebase ve bildirim servisi
 class FirebaseService {
@@ -14,6 +17,19 @@ class FirebaseService {
   static bool _initialized = false;
   static bool _topicSubscribed = false;
 
+  /// Backend bildirimleri konu koşuluyla gönderir (backend/bildirim_konulari.py):
+  /// olay konuları herkese; tavan/taban yalnız portföydeki hisselerin
+  /// ticker_{KOD} konusundan gelir. halka_arz eski sürümler içindir — ona
+  /// abone kalan cihaz her bildirimi alır, bu yüzden aboneliği bırakılır.
+  static const List<String> _olayKonulari = [
+    'event_yeni_arz',
+    'event_talep',
+    'event_sure',
+    'event_islem',
+  ];
+  static const String _yayinKonusu = 'halka_arz';
+  static const String _hisseKonulariAnahtari = 'fcm_hisse_konulari';
+
   /// Firebase'i başlat
   static Future<bool> init() async {
     // Web platformunda Firebase yapılandırması farklı, şimdilik atla
@@ -71,10 +87,9 @@ class FirebaseService {
       print('[FCM] APNS token alındı ✓');
     }
 
-    // 'halka_arz' topic'ine abone ol
-    await messaging.subscribeToTopic('halka_arz');
-    _topicSubscribed = true;
-    print('[FCM] halka_arz topic abone olundu ✓');
+    // Olay ve portföy hissesi konularına abone ol
+    await _konularaAboneOl(messaging);
+    print('[FCM] Bildirim konularına abone olundu ✓');
 
     // Token al (debug için)
     final token = await messaging.getToken();
@@ -186,12 +201,45 @@ class FirebaseService {
     // Eğer başlangıçta APNS token geciktiği için topic aboneliği yapılamadıysa, şimdi tekrar dene
     if (!_topicSubscribed) {
       try {
-        await messaging.subscribeToTopic('halka_arz');
-        _topicSubscribed = true;
-        debugPrint('[FCM] İzin sonrası halka_arz topic abone olundu ✓');
+        await _konularaAboneOl(messaging);
+        debugPrint('[FCM] İzin sonrası bildirim konularına abone olundu ✓');
       } catch (e) {
         debugPrint('[FCM] İzin sonrası topic aboneliği de başarısız: $e');
       }
     }
   }
+
+  static Future<void> _konularaAboneOl(FirebaseMessaging messaging) async {
+    for (final konu in _olayKonulari) {
+      await messaging.subscribeToTopic(konu);
+    }
+    _topicSubscribed = true;
+    await messaging.unsubscribeFromTopic(_yayinKonusu);
+    await hisseKonulariniEsitle();
+  }
+
+  /// Portföydeki aktif hisselerin ticker_{KOD} konularına abone olur, çıkanları bırakır.
+  /// Portföy her değiştiğinde çağrılır; abone olunanlar Hive'da tutulur.
+  static Future<void> hisseKonulariniEsitle() async {
+    if (!_initialized || !_topicSubscribed) return;
+    try {
+      final box = Hive.box('portfolio');
+      final onceki = ((json.decode(box.get(_hisseKonulariAnahtari, defaultValue: '[]')) as List)
+          .cast<String>())
+          .toSet();
+      final istenen = PortfolioService.getActivePositions()
+          .map((i) => 'ticker_${i.sirketKodu.toUpperCase().replaceAll(RegExp(r'[^A-Z0-9_.~%-]'), '')}')
+          .toSet();
+      final messaging = FirebaseMessaging.instance;
+      for (final konu in istenen.difference(onceki)) {
+        await messaging.subscribeToTopic(konu);
+      }
+      for (final konu in onceki.difference(istenen)) {
+        await messaging.unsubscribeFromTopic(konu);
+      }
+      await box.put(_hisseKonulariAnahtari, json.encode(istenen.toList()));
+    } catch (e) {
+      debugPrint('[FCM] Hisse konuları eşitlenemedi: $e');
+    }
+  }
 }
@@ -3,6 +3,8 @@ import 'package:cloud_firestore/cloud_firestore.dart';
 import 'package:flutter/foundation.dart';
 import 'package:hive_flutter/hive_flutter.dart';
 
+import '../models/fiyat_serisi.dart';
+
 // ─── Model ───────────────────────────────────────────────────────────────────
 
 class HistoricalIpo {
@@ -128,15 +130,14 @@ class HistoricalIpo {
   // ── Helper Metodları (Gizlenmiş veya Silinmiş) ──
 
   /// fiyat_gecmisi map → sorted sparkline list
-  static List<double> _buildSparkline(Map<String, dynamic> j) {
+  static List<double> _buildSparkline(Map<String, dynamic> j, Map<String, dynamic> gecmis) {
     // Önce mevcut sparkline varsa onu kullan
     final existing = j['sparkline'] as List<dynamic>?;
     if (existing != null && existing.isNotEmpty) {
       return existing.map((e) => (e as num).toDouble()).toList();
     }
     // fiyat_gecmisi map'ten oluştur
-    final gecmis = j['fiyat_gecmisi'];
-    if (gecmis is Map && gecmis.isNotEmpty) {
+    if (gecmis.isNotEmpty) {
       final sorted = gecmis.entries.toList()
         ..sort((a, b) => a.key.toString().compareTo(b.key.toString()));
       return sorted
@@ -151,15 +152,14 @@ class HistoricalIpo {
   }
 
   /// fiyat_gecmisi map → sorted date list
-  static List<String> _buildSparklineDates(Map<String, dynamic> j) {
+  static List<String> _buildSparklineDates(Map<String, dynamic> j, Map<String, dynamic> gecmis) {
     // Önce mevcut sparkline_dates varsa onu kullan
     final existing = j['sparkline_dates'] as List<dynamic>?;
     if (existing != null && existing.isNotEmpty) {
       return existing.map((e) => e.toString()).toList();
     }
     // fiyat_gecmisi map'ten oluştur
-    final gecmis = j['fiyat_gecmisi'];
-    if (gecmis is Map && gecmis.isNotEmpty) {
+    if (gecmis.isNotEmpty) {
       final sorted = gecmis.keys.map((k) => k.toString()).toList()..sort();
       return sorted;
     }
@@ -167,7 +167,7 @@ class HistoricalIpo {
   }
 
   /// İlk işlem tarihini bul: bist_ilk_islem_tarihi → fiyat_gecmisi'nin ilk günü → fallback
-  static DateTime _resolveIslemTarihi(Map<String, dynamic> j) {
+  static DateTime _resolveIslemTarihi(Map<String, dynamic> j, Map<String, dynamic> gecmis) {
     // 1. bist_ilk_islem_tarihi veya alternatif alanlar
     final dateStr = (j['bist_ilk_islem_tarihi'] ?? j['borsada_islem_tarihi'] ?? j['islem_tarihi'] ?? '').toString();
     if (dateStr.isNotEmpty) {
@@ -175,8 +175,7 @@ class HistoricalIpo {
       if (dt != null) return dt;
     }
     // 2. fiyat_gecmisi map'inin en eski tarihi
-    final gecmis = j['fiyat_gecmisi'];
-    if (gecmis is Map && gecmis.isNotEmpty) {
+    if (gecmis.isNotEmpty) {
       final dates = gecmis.keys.map((k) => k.toString()).toList()..sort();
       final dt = DateTime.tryParse(dates.first);
       if (dt != null) return dt;
@@ -200,22 +199,24 @@ class HistoricalIpo {
   }
 
   factory HistoricalIpo.fromJson(Map<String, dynamic> j) {
+    // fiyat_gecmisi / fiyat_serisi bir kez çözülür; yardımcılar aynı haritayı kullanır
+    final gecmis = fiyatGecmisiOku(j);
     return HistoricalIpo(
       sirketKodu: (j['sirket_kodu'] ?? j['kod'] ?? '').toString().toUpperCase(),
       sirketAdi: j['sirket_adi'] ?? j['ad'] ?? '',
       arzFiyati: (j['arz_fiyati'] ?? 0).toDouble(),
       kisiBasiLot: (j['kisi_basi_lot'] ?? '').toString(),
       toplamLot: _safeInt(j['toplam_lot']),
-      islemTarihi: _resolveIslemTarihi(j),
+      islemTarihi: _resolveIslemTarihi(j, gecmis),
       katilimEndeksi: j['katilim_endeksine_uygun'] ?? j['katilim'] ?? false,
       sektor: j['sektor'] as String?,
       fonKullanim: j['fon_kullanim_yeri'] is String
           ? j['fon_kullanim_yeri']
           : null,
       sparkline:
-          _buildSparkline(j),
+          _buildSparkline(j, gecmis),
       sparklineDates:
-          _buildSparklineDates(j),
+          _buildSparklineDates(j, gecmis),
       staticFetched: j['static_fetched'] as bool?,
       staticFetchedAt: j['static_fetched_at'] != null
           ? DateTime.tryParse(j['static_fetched_at'])
@@ -1,6 +1,7 @@
 import 'dart:convert';
 import 'package:hive_flutter/hive_flutter.dart';
 import '../models/portfolio_item.dart';
+import 'firebase_service.dart';
 
 /// Portföy CRUD işlemleri ve kar/zarar hesaplamaları
 class PortfolioService {
@@ -106,5 +107,7 @@ class PortfolioService {
   static Future<void> _saveItemsList(Box box, List<PortfolioItem> items) async {
     final jsonStr = json.encode(items.map((i) => i.toJson()).toList());
     await box.put('portfolio_items', jsonStr);
+    // Aktif hisseler değişmiş olabilir → tavan/taban bildirim konularını eşitle
+    FirebaseService.hisseKonulariniEsitle();
   }
 }
@@ -9,6 +9,7 @@ import 'package:http/http.dart' as http;
 /// - `get()` kullanır, stream/onValue KULLANMAZ → bağlantı anında kapanır
 /// - 15 dakika Hive cache → aynı seansda defalarca açma maliyeti sıfır
 /// - 100 eş zamanlı bağlantı kotası: 1 kullanıcı sadece ~0.1 sn yer kaplar
+/// - /prices_meta/updated_at sürüm işareti değişmediyse /prices indirilmez
 
 class RealtimePriceService {
   static const String _boxName = 'rtdb_prices';
@@ -17,6 +18,7 @@ class RealtimePriceService {
   static String? _rtdbUrl; // Sadece web için (mobilde otomatik)
   static DateTime? _lastFetch;
   static Map<String, double> _cache = {};
+  static int? _version; // Son indirilen /prices'ın sunucu sürümü (updated_at)
 
   static Future<void> init() async {
     await Hive.openBox(_boxName);
@@ -33,12 +35,35 @@ class RealtimePriceService {
     if (lastFetchStr != null) {
       _lastFetch = DateTime.tryParse(lastFetchStr);
     }
+    _version = box.get('version') as int?;
   }
 
   static Future<void> _saveToHive(Map<String, double> prices) async {
     final box = Hive.box(_boxName);
     await box.put('prices', prices);
     await box.put('last_fetch', DateTime.now().toIso8601String());
+    await box.put('version', _version);
+  }
+
+  /// Sunucudaki fiyat sürümü (/prices_meta/updated_at). Okunamazsa null.
+  static Future<int?> _fetchRemoteVersion() async {
+    try {
+      if (kIsWeb) {
+        final url = Uri.parse(
+          'https://halkaarz-fb398-default-rtdb.europe-west1.firebasedatabase.app/prices_meta/updated_at.json',
+        );
+        final resp = await http.get(url).timeout(const Duration(seconds: 5));
+        if (resp.statusCode != 200 || resp.body == 'null') return null;
+        return (json.decode(resp.body) as num).toInt();
+      }
+      final ref = FirebaseDatabase.instance.ref('prices_meta/updated_at');
+      final snapshot = await ref.get().timeout(const Duration(seconds: 5));
+      if (!snapshot.exists || snapshot.value == null) return null;
+      return (snapshot.value as num).toInt();
+    } catch (e) {
+      debugPrint('[RTDB] Sürüm okunamadı: $e');
+      return null;
+    }
   }
 
   /// Tüm fiyatları döner. 3 dk cache — veritabanına yük düşürür.
@@ -54,16 +79,28 @@ class RealtimePriceService {
       }
     }
 
+    // Sürüm değişmediyse tüm /prices'ı indirmek yerine cache'i tazele
+    final remoteVersion = await _fetchRemoteVersion();
+    if (!forceRefresh &&
+        remoteVersion != null &&
+        remoteVersion == _version &&
+        _cache.isNotEmpty) {
+      debugPrint('[RTDB] Sürüm değişmedi ($remoteVersion) — /prices indirilmedi.');
+      _lastFetch = DateTime.now();
+      await Hive.box(_boxName).put('last_fetch', _lastFetch!.toIso8601String());
+      return Map.unmodifiable(_cache);
+    }
+
     // Web ise Firebase kurulmamış olabilir, doğrudan REST API kullanalım
     if (kIsWeb) {
       debugPrint('[RTDB] Web platformunda REST API kullanılıyor.');
-      return await _fetchFromRestApi();
+      return await _fetchFromRestApi(version: remoteVersion);
     }
 
-    return await _fetchFromRtdb();
+    return await _fetchFromRtdb(version: remoteVersion);
   }
 
-  static Future<Map<String, double>> _fetchFromRestApi() async {
+  static Future<Map<String, double>> _fetchFromRestApi({int? version}) async {
     try {
       debugPrint('[RTDB] REST API get() çağrısı → /prices.json');
       final url = Uri.parse(
@@ -92,6 +129,7 @@ class RealtimePriceService {
       debugPrint('[RTDB REST ✓] ${prices.length} fiyat alındı.');
       _cache = prices;
       _lastFetch = DateTime.now();
+      _version = version;
       await _saveToHive(prices);
       return Map.unmodifiable(prices);
     } on TimeoutException {
@@ -103,7 +141,7 @@ class RealtimePriceService {
     }
   }
 
-  static Future<Map<String, double>> _fetchFromRtdb() async {
+  static Future<Map<String, double>> _fetchFromRtdb({int? version}) async {
     try {
       debugPrint('[RTDB] Tek seferlik get() çağrısı → /prices');
 
@@ -127,6 +165,7 @@ class RealtimePriceService {
       debugPrint('[RTDB ✓] ${prices.length} fiyat alındı.');
       _cache = prices;
       _lastFetch = DateTime.now();
+      _version = version;
       await _saveToHive(prices);
       return Map.unmodifiable(prices);
     } on TimeoutException {
@@ -135,7 +174,7 @@ class RealtimePriceService {
     } catch (e) {
       debugPrint('[RTDB] SDK hatası: $e — REST API ile deneniyor...');
       // Firebase SDK başlatılamamışsa REST API'ye düş
-      return await _fetchFromRestApi();
+      return await _fetchFromRestApi(version: version);
     }
   }
 